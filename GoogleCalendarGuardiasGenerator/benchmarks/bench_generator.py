@@ -0,0 +1,113 @@
+"""
+Benchmark del motor de guardias (models.roster)
+
+Mide cómo escala la generación de guardias (fines de semana + festivos)
+con horizontes de 1, 5 y 20 años, comparando generate_roster (índice por
+técnico) con el recorrido lineal de la lista de guardias que se usaba
+antes, y el número de cuadrantes trimestrales que se generan por segundo.
+
+Uso:
+    python -m benchmarks.bench_generator
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from models.roster import asignar_tecnico_festivo, encontrar_sabado_siguiente, generate_roster
+
+NUM_TECNICOS = 36
+FESTIVOS_POR_AÑO = 40
+HORIZONTES = [1, 5, 20]
+
+
+class _ListaGuardias:
+    """Implementación de referencia: recorre todas las guardias en cada consulta"""
+    
+    def __init__(self):
+        self.guardias = []  # [(fecha_inicio, fecha_fin, tecnico)]
+    
+    def agregar(self, fecha_inicio, fecha_fin, tecnico):
+        self.guardias.append((fecha_inicio, fecha_fin, tecnico))
+    
+    def tiene_guardia_reciente(self, tecnico, fecha, dias=2):
+        for i in range(1, dias + 1):
+            fecha_verificar = fecha - timedelta(days=i)
+            for inicio, fin, guardia_tecnico in self.guardias:
+                if guardia_tecnico == tecnico and inicio <= fecha_verificar <= fin:
+                    return True
+        return False
+
+
+def _festivos_sinteticos(fecha_inicio, fecha_fin, rng):
+    """Genera festivos laborables aleatorios (y reproducibles) en el rango"""
+    festivos = {}
+    dias_totales = (fecha_fin - fecha_inicio).days
+    años = max(1, round((dias_totales + 1) / 365))
+    while len(festivos) < FESTIVOS_POR_AÑO * años:
+        fecha = fecha_inicio + timedelta(days=rng.randint(0, dias_totales))
+        if fecha.weekday() < 5:
+            festivos[fecha] = ""
+    return festivos
+
+
+def _generar_lineal(tecnicos, festivos, fecha_inicio, fecha_fin):
+    """Reproduce generate_roster con la lista de guardias de referencia"""
+    indice = _ListaGuardias()
+    guardias_fin_semana = {}
+    fecha_sabado = encontrar_sabado_siguiente(fecha_inicio)
+    indice_tecnico = 0
+    while fecha_sabado <= fecha_fin:
+        tecnico = tecnicos[indice_tecnico]
+        guardias_fin_semana[fecha_sabado] = tecnico
+        indice.agregar(fecha_sabado, fecha_sabado + timedelta(days=1), tecnico)
+        indice_tecnico = (indice_tecnico + 1) % len(tecnicos)
+        fecha_sabado += timedelta(weeks=1)
+    
+    for fecha in sorted(festivos):
+        if fecha.weekday() >= 5:
+            continue
+        tecnico = asignar_tecnico_festivo(fecha, guardias_fin_semana, indice, tecnicos)
+        if tecnico and tecnico != "???":
+            indice.agregar(fecha, fecha, tecnico)
+
+
+def _medir(funcion, *args, repeticiones=3):
+    """Devuelve el mejor tiempo (segundos) de varias repeticiones"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(*args)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    rng = random.Random(42)
+    tecnicos = [f"Tecnico{i:02d}" for i in range(NUM_TECNICOS)]
+    fecha_inicio = date(2026, 1, 1)
+    
+    print(f"{'Años':>5} {'Festivos':>9} {'Índice (ms)':>12} {'Lineal (ms)':>12} {'Mejora':>8}")
+    for años in HORIZONTES:
+        fecha_fin = fecha_inicio + timedelta(days=365 * años - 1)
+        festivos = _festivos_sinteticos(fecha_inicio, fecha_fin, rng)
+        args = (tecnicos, festivos, fecha_inicio, fecha_fin)
+        t_indice = _medir(generate_roster, *args)
+        t_lineal = _medir(_generar_lineal, *args, repeticiones=1)
+        print(f"{años:>5} {len(festivos):>9} {t_indice * 1000:>12.2f} {t_lineal * 1000:>12.2f} "
+              f"{t_lineal / t_indice:>7.1f}x")
+    
+    # Throughput de cuadrantes trimestrales (planificación what-if)
+    fecha_fin = fecha_inicio + timedelta(days=90)
+    festivos = _festivos_sinteticos(fecha_inicio, fecha_fin, rng)
+    tecnicos_equipo = tecnicos[:6]
+    iteraciones = 2000
+    inicio = time.perf_counter()
+    for i in range(iteraciones):
+        generate_roster(tecnicos_equipo, festivos, fecha_inicio, fecha_fin, indice_inicial=i)
+    duracion = time.perf_counter() - inicio
+    print(f"\nCuadrantes trimestrales por segundo: {iteraciones / duracion:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
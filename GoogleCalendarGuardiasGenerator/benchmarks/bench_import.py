@@ -0,0 +1,84 @@
+"""
+Benchmark de importación CSV en CalendarManager
+
+Importa un CSV de guardias sobre almacenes que ya contienen 1, 5 y 20 años
+de histórico. La fusión (import_csv con save_mode='none') se mide aparte
+del guardado: la fusión usa los índices en memoria y no se degrada a medida
+que crece el almacén, mientras que el guardado de una importación grande
+consolida el JSON completo y sí crece con el histórico.
+
+Uso:
+    python -m benchmarks.bench_import
+"""
+
+import csv
+import gc
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from models.calendar_manager import CalendarManager
+
+TECNICOS = ["Pilar", "Isa", "Romane", "Yannick", "Mayra", "Alberto"]
+HISTORICOS = [1, 5, 20]
+FILAS_CSV = 2000
+
+
+def _escribir_csv(ruta, inicio, filas):
+    """Escribe un CSV con `filas` guardias de fin de semana consecutivas"""
+    with open(ruta, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Subject", "Start Date", "Start Time", "End Date", "End Time",
+                         "All Day Event", "Description", "Location", "Private"])
+        sabado = inicio + timedelta(days=(5 - inicio.weekday()) % 7)
+        for i in range(filas):
+            tecnico = TECNICOS[i % len(TECNICOS)]
+            writer.writerow([f"Guardia - {tecnico}", sabado.isoformat(), "00:00:00",
+                             (sabado + timedelta(days=2)).isoformat(), "00:00:00",
+                             "True", "", "", "False"])
+            sabado += timedelta(weeks=1)
+
+
+def _poblar(cm, años):
+    """Rellena el almacén con un evento diario durante `años` años"""
+    fecha = date(1990, 1, 1)
+    for i in range(365 * años):
+        tecnico = TECNICOS[i % len(TECNICOS)]
+        cm.add_event(fecha.isoformat(), {
+            'id': f"h{i}", 'titulo': f"Guardia - {tecnico}", 'tecnico': tecnico, 'tipo': 'guardia'
+        })
+        fecha += timedelta(days=1)
+    cm.storage.save()
+
+
+def main():
+    print(f"{'Histórico (años)':>17} {'Eventos previos':>16} {'Fusión (ms)':>12} {'Filas/s':>10} "
+          f"{'Guardado (ms)':>14}")
+    for años in HISTORICOS:
+        with tempfile.TemporaryDirectory() as tmp:
+            cm = CalendarManager(os.path.join(tmp, "json", "calendarios.json"))
+            _poblar(cm, años)
+            ruta_csv = os.path.join(tmp, "guardias.csv")
+            _escribir_csv(ruta_csv, date(2030, 1, 1), FILAS_CSV)
+            
+            # El histórico ya cargado no se vuelve a recorrer en cada pasada del
+            # recolector: así la fusión mide el trabajo propio de la importación
+            gc.collect()
+            gc.freeze()
+            inicio = time.perf_counter()
+            stats = cm.import_csv(ruta_csv, save_mode='none')
+            fusion = time.perf_counter() - inicio
+            gc.unfreeze()
+            
+            inicio = time.perf_counter()
+            cm.save_data()
+            guardado = time.perf_counter() - inicio
+            
+            assert stats['errores'] == 0
+            print(f"{años:>17} {365 * años:>16} {fusion * 1000:>12.1f} {FILAS_CSV / fusion:>10,.0f} "
+                  f"{guardado * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
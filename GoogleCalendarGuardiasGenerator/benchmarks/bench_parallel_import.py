@@ -0,0 +1,59 @@
+"""
+Benchmark de importación masiva de CSV con hilos frente a procesos
+
+Genera varios CSV de histórico y los importa con CalendarManager.import_many
+parseando en un ThreadPoolExecutor y en un ProcessPoolExecutor con distinto
+número de workers. Comprueba además que el resultado es idéntico en todos
+los casos. La mejora con procesos solo se aprecia en equipos multinúcleo.
+
+Uso:
+    python -m benchmarks.bench_parallel_import
+"""
+
+import logging
+import os
+import tempfile
+import time
+from datetime import date
+
+from models.calendar_manager import CalendarManager
+from .bench_import import _escribir_csv
+
+ARCHIVOS = 8
+FILAS_POR_ARCHIVO = 5000
+CONFIGURACIONES = [(1, False), (2, True), (4, True), (os.cpu_count() or 1, True)]
+
+
+def main():
+    # Los conflictos de los rangos solapados se registran como warning
+    logging.disable(logging.WARNING)
+    print(f"CPUs: {os.cpu_count()}  Archivos: {ARCHIVOS} x {FILAS_POR_ARCHIVO} filas")
+    print(f"{'Modo':>10} {'Workers':>8} {'Importación (ms)':>17} {'Filas/s':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rutas = []
+        for i in range(ARCHIVOS):
+            ruta = os.path.join(tmp, f"historico-{i}.csv")
+            # Rangos solapados para que haya conflictos que resolver
+            _escribir_csv(ruta, date(1900 + i * 10, 1, 1), FILAS_POR_ARCHIVO)
+            rutas.append(ruta)
+
+        referencia = None
+        for workers, use_processes in CONFIGURACIONES:
+            cm = CalendarManager(os.path.join(tmp, f"json-{workers}-{use_processes}", "calendarios.json"))
+
+            inicio = time.perf_counter()
+            stats = cm.import_many(rutas, max_workers=workers, use_processes=use_processes)
+            duracion = time.perf_counter() - inicio
+
+            eventos = [(e['fecha'], e['id'], e['tecnico']) for e in cm.get_all_events()]
+            if referencia is None:
+                referencia = eventos
+            assert eventos == referencia, "El resultado depende del número de workers"
+
+            modo = "procesos" if use_processes else "hilos"
+            print(f"{modo:>10} {workers:>8} {duracion * 1000:>17.1f} {stats['total'] / duracion:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
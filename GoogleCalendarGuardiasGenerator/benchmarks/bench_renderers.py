@@ -0,0 +1,87 @@
+"""
+Benchmark de los renderers de MultiMonthViewer ("widgets" frente a "canvas")
+
+Carga un almacén con un año de guardias diarias y mide, para cada renderer,
+el número de widgets Tk y de items de Canvas creados, el tiempo del primer
+dibujado y el de un refresco tras cambiar un único día. Se mide con 7 y 36
+meses para comprobar que la vista virtualizada no depende del horizonte.
+Necesita un display (X11/Wayland o Xvfb).
+
+Uso:
+    python -m benchmarks.bench_renderers
+"""
+
+import os
+import tempfile
+import time
+import tkinter as tk
+from datetime import date, datetime, timedelta
+
+from models.calendar_manager import CalendarManager
+from ui.components.multi_month_viewer import MultiMonthViewer
+from ui.components.canvas_month import RENDERERS
+
+TECNICOS = ["Pilar", "Isa", "Romane", "Yannick", "Mayra", "Alberto"]
+HORIZONTES = [7, 36]
+COLORES = dict(zip(TECNICOS, ["#e74c3c", "#3498db", "#2ecc71", "#9b59b6", "#f39c12", "#1abc9c"]))
+
+
+def _contar(widget):
+    """Devuelve (widgets, items de canvas) bajo un widget"""
+    widgets, items = 1, 0
+    if isinstance(widget, tk.Canvas):
+        items += len(widget.find_all())
+    for hijo in widget.winfo_children():
+        w, i = _contar(hijo)
+        widgets += w
+        items += i
+    return widgets, items
+
+
+def _poblar(cm):
+    """Una guardia diaria desde 6 meses antes hasta 6 meses después de hoy"""
+    fecha = date.today().replace(day=1) - timedelta(days=180)
+    for i in range(365):
+        tecnico = TECNICOS[i % len(TECNICOS)]
+        cm.add_event(fecha.isoformat(), {
+            'id': f"b{i}", 'titulo': f"Guardia - {tecnico}", 'tecnico': tecnico, 'tipo': 'guardia'
+        })
+        fecha += timedelta(days=1)
+
+
+def main():
+    root = tk.Tk()
+    root.withdraw()
+    print(f"{'Renderer':>10} {'Meses':>6} {'Widgets':>8} {'Items':>7} {'Dibujado (ms)':>14} {'Refresco 1 día (ms)':>20}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cm = CalendarManager(os.path.join(tmp, "json", "calendarios.json"))
+        _poblar(cm)
+
+        for renderer, meses in [(r, m) for r in RENDERERS for m in HORIZONTES]:
+            inicio = time.perf_counter()
+            viewer = MultiMonthViewer(root, cm, colors=COLORES, num_months=meses, renderer=renderer)
+            viewer.pack()
+            root.update()
+            dibujado = time.perf_counter() - inicio
+
+            widgets, items = _contar(viewer)
+
+            # Cambiar un solo día y refrescar (como tras un drag-and-drop)
+            fecha = datetime.now().strftime('%Y-%m-15')
+            cm.remove_events(fecha)
+            cm.add_event(fecha, {'id': 'cambio', 'titulo': 'Guardia - Isa', 'tecnico': 'Isa',
+                                 'tipo': 'guardia'})
+            inicio = time.perf_counter()
+            viewer.refresh()
+            root.update()
+            refresco = time.perf_counter() - inicio
+
+            print(f"{renderer:>10} {meses:>6} {widgets:>8} {items:>7} {dibujado * 1000:>14.1f} {refresco * 1000:>20.1f}")
+            viewer.destroy()
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
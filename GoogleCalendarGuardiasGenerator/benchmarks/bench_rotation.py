@@ -0,0 +1,91 @@
+"""
+Benchmark del motor de rotación (models.rotation_engine)
+
+Compara el cálculo de bloques en una sola pasada (compute_duty_blocks) con
+el método anterior de las GUI (conjunto de días + ordenación + agrupación)
+y mide la asignación completa para horizontes de 1, 5 y 20 años, tanto en
+el modo de las GUI (assign_blocks) como en el del generador de consola
+(assign_weekend_rotation). Si NumPy está instalado incluye también la
+versión vectorizada (use_numpy=True).
+
+Uso:
+    python -m benchmarks.bench_rotation
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from models.rotation_engine import HAS_NUMPY, assign_blocks, assign_weekend_rotation, compute_duty_blocks
+
+TECNICOS = ["Pilar", "Isa", "Romane", "Yannick", "Mayra", "Alberto"]
+FESTIVOS_POR_AÑO = 14
+HORIZONTES = [1, 5, 20]
+
+
+def _bloques_por_conjunto(start, end, festivos):
+    """Implementación de referencia: la que usaban las GUI antes del motor común"""
+    dias_guardia = set()
+    fecha = start
+    while fecha <= end:
+        if fecha.weekday() in [5, 6]:
+            dias_guardia.add(fecha)
+        fecha += timedelta(days=1)
+    
+    for fecha_festivo in festivos.keys():
+        if start <= fecha_festivo <= end and fecha_festivo.weekday() < 5:
+            dias_guardia.add(fecha_festivo)
+    
+    bloques = []
+    bloque_actual = []
+    for dia in sorted(dias_guardia):
+        if bloque_actual and (dia - bloque_actual[-1]).days == 1:
+            bloque_actual.append(dia)
+        else:
+            if bloque_actual:
+                bloques.append(bloque_actual)
+            bloque_actual = [dia]
+    if bloque_actual:
+        bloques.append(bloque_actual)
+    return bloques
+
+
+def _medir(funcion, *args, repeticiones=5):
+    """Devuelve el mejor tiempo (segundos) de varias repeticiones"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(*args)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main():
+    rng = random.Random(42)
+    start = date(2026, 1, 1)
+    
+    print(f"{'Años':>5} {'Bloques':>8} {'Pasada única (ms)':>18} {'Conjunto (ms)':>14} "
+          f"{'NumPy (ms)':>11} {'Asignación (ms)':>16} {'Consola (ms)':>13}")
+    for años in HORIZONTES:
+        end = start + timedelta(days=365 * años - 1)
+        festivos = {start + timedelta(days=rng.randint(0, 365 * años - 1)): ""
+                    for _ in range(FESTIVOS_POR_AÑO * años)}
+        
+        bloques = compute_duty_blocks(start, end, festivos)
+        assert bloques == _bloques_por_conjunto(start, end, festivos)
+        
+        t_pasada = _medir(compute_duty_blocks, start, end, festivos)
+        t_conjunto = _medir(_bloques_por_conjunto, start, end, festivos)
+        t_asignacion = _medir(assign_blocks, bloques, TECNICOS, None)
+        t_consola = _medir(assign_weekend_rotation, TECNICOS, festivos, start, end)
+        if HAS_NUMPY:
+            assert bloques == compute_duty_blocks(start, end, festivos, use_numpy=True)
+            t_numpy = f"{_medir(compute_duty_blocks, start, end, festivos, True) * 1000:>11.2f}"
+        else:
+            t_numpy = f"{'n/d':>11}"
+        print(f"{años:>5} {len(bloques):>8} {t_pasada * 1000:>18.2f} {t_conjunto * 1000:>14.2f} "
+              f"{t_numpy} {t_asignacion * 1000:>16.2f} {t_consola * 1000:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark del almacén particionado por meses frente al JSON de un solo archivo
+
+Genera históricos de 1, 5 y 20 años de guardias diarias y mide el arranque
+(abrir el almacén y pedir las estadísticas y un mes), los meses que quedan en
+memoria y el guardado tras editar un único día (en JSON, entrada del diario).
+
+Uso:
+    python -m benchmarks.bench_sharded_storage
+"""
+
+import os
+import tempfile
+import time
+
+from benchmarks.bench_storage_format import HISTORICOS, _poblar
+from models.storage import JsonStorage, ShardedStorage
+
+
+def main():
+    print(f"{'Años':>5} {'Backend':>10} {'Arranque (ms)':>14} {'Meses en memoria':>17} {'Guardado 1 día (ms)':>20}")
+    for años in HISTORICOS:
+        with tempfile.TemporaryDirectory() as tmp:
+            backends = [("json", JsonStorage, os.path.join(tmp, "calendarios.json")),
+                        ("por meses", ShardedStorage, os.path.join(tmp, "calendarios"))]
+            for nombre, clase, ruta in backends:
+                storage = clase(ruta)
+                _poblar(storage, años)
+                storage.close()
+
+                inicio = time.perf_counter()
+                storage = clase(ruta)
+                storage.get_statistics()
+                storage.get_month("2000-06")
+                arranque = time.perf_counter() - inicio
+                meses = len(storage._cache) if clase is ShardedStorage else len(storage.data['meses'])
+
+                storage.remove_events("2000-06-15")
+                inicio = time.perf_counter()
+                storage.save()
+                guardado = time.perf_counter() - inicio
+                storage.close()
+
+                print(f"{años:>5} {nombre:>10} {arranque * 1000:>14.1f} {meses:>17} {guardado * 1000:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
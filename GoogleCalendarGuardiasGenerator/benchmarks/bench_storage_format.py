@@ -0,0 +1,70 @@
+"""
+Benchmark del formato en disco del histórico JSON (indentado frente a compacto)
+
+Genera almacenes con 1, 5 y 20 años de guardias diarias importadas desde CSV
+y compara tamaño en disco, tiempo de consolidación y tiempo de carga del
+formato histórico (JSON indentado) y del compacto (columnar + gzip). La
+carga es la mejor de REPETICIONES aperturas.
+
+Uso:
+    python -m benchmarks.bench_storage_format
+"""
+
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from models.storage import JsonStorage
+
+TECNICOS = ["Pilar", "Isa", "Romane", "Yannick", "Mayra", "Alberto"]
+HISTORICOS = [1, 5, 20]
+REPETICIONES = 7
+
+
+def _poblar(storage, años):
+    """Un evento diario con los campos que añade una importación CSV"""
+    fecha = date(2000, 1, 1)
+    for i in range(365 * años):
+        tecnico = TECNICOS[i % len(TECNICOS)]
+        storage.add_event(fecha.isoformat(), {
+            'id': f"{i:016x}",
+            'titulo': f"Guardia - {tecnico}",
+            'tecnico': tecnico,
+            'tipo': 'guardia',
+            'descripcion': '',
+            'all_day': True,
+            'origen': 'csv_import',
+            'fecha_importacion': f"2026-01-{1 + i // 4000:02d}T10:00:00",
+            'archivo_origen': f"guardias-{fecha.year}.csv"
+        })
+        fecha += timedelta(days=1)
+
+
+def main():
+    print(f"{'Años':>5} {'Formato':>9} {'Tamaño (KB)':>12} {'Guardado (ms)':>14} {'Carga (ms)':>11}")
+    for años in HISTORICOS:
+        with tempfile.TemporaryDirectory() as tmp:
+            for nombre, archivo in [("indentado", "calendarios.json"), ("compacto", "calendarios.json.gz")]:
+                ruta = os.path.join(tmp, archivo)
+                storage = JsonStorage(ruta)
+                _poblar(storage, años)
+
+                inicio = time.perf_counter()
+                storage.compact()
+                guardado = time.perf_counter() - inicio
+
+                # Mejor de varias cargas: una sola medida es demasiado ruidosa
+                carga = float('inf')
+                for _ in range(REPETICIONES):
+                    inicio = time.perf_counter()
+                    recargado = JsonStorage(ruta)
+                    carga = min(carga, time.perf_counter() - inicio)
+                assert recargado.get_statistics() == storage.get_statistics()
+
+                print(f"{años:>5} {nombre:>9} {os.path.getsize(ruta) / 1024:>12,.0f} "
+                      f"{guardado * 1000:>14.1f} {carga * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
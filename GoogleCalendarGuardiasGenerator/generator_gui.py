@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from datetime import datetime, timedelta
+from datetime import datetime
 import calendar
-import csv
 import os
+from models.csv_export import FORMATO_HORAS, iter_assignment_events, write_csv
+from models.rotation_engine import auto_assign
 
 class GuardiasGUI:
     def __init__(self, root):
@@ -507,105 +508,16 @@ class GuardiasGUI:
             messagebox.showerror("Error", "La fecha de fin debe ser posterior a la fecha de inicio")
             return
         
-        # Limpiar asignaciones actuales
-        self.asignaciones = {}
-        
-        # 1. Identificar todos los días que requieren guardia (fines de semana + festivos laborables)
-        dias_guardia = set()
-        
-        # Añadir todos los sábados y domingos en el rango de fechas
-        fecha = fecha_inicio
-        while fecha <= fecha_fin:
-            if fecha.weekday() in [5, 6]:  # Sábado o Domingo
-                dias_guardia.add(fecha)
-            fecha += timedelta(days=1)
-        
-        # Añadir festivos laborables (lunes a viernes) dentro del rango
-        for fecha_festivo in self.festivos.keys():
-            if fecha_inicio <= fecha_festivo <= fecha_fin and fecha_festivo.weekday() < 5:
-                dias_guardia.add(fecha_festivo)
-        
-        # 2. Agrupar días consecutivos en bloques
-        dias_ordenados = sorted(dias_guardia)
-        bloques = []
-        bloque_actual = []
-        
-        for i, dia in enumerate(dias_ordenados):
-            if not bloque_actual:
-                bloque_actual = [dia]
-            else:
-                # Verificar si es consecutivo al último día del bloque
-                if (dia - bloque_actual[-1]).days == 1:
-                    bloque_actual.append(dia)
-                else:
-                    # Guardar bloque anterior y empezar uno nuevo
-                    bloques.append(bloque_actual)
-                    bloque_actual = [dia]
-        
-        # Añadir el último bloque
-        if bloque_actual:
-            bloques.append(bloque_actual)
-        
-        # 3. Aplicar reglas de asignación
-        # Obtener el índice del siguiente técnico después del último seleccionado
-        ultimo_tecnico = self.ultimo_tecnico_var.get()
-        if ultimo_tecnico in self.tecnicos:
-            indice_ultimo = self.tecnicos.index(ultimo_tecnico)
-            indice_tecnico = (indice_ultimo + 1) % len(self.tecnicos)
-        else:
-            indice_tecnico = 0
+        # Calcular bloques (fines de semana + festivos laborables) y aplicar reglas de asignación
+        asignaciones, bloques = auto_assign(self.tecnicos, self.festivos, fecha_inicio, fecha_fin,
+                                            self.ultimo_tecnico_var.get())
         
-        ultimo_tecnico_asignado = None
-        
-        for bloque in bloques:
-            num_dias = len(bloque)
-            
-            # Verificar que no asignemos el mismo técnico que el bloque anterior
-            tecnico_inicial = indice_tecnico
-            if ultimo_tecnico_asignado is not None:
-                while self.tecnicos[indice_tecnico] == ultimo_tecnico_asignado:
-                    indice_tecnico = (indice_tecnico + 1) % len(self.tecnicos)
-                    # Evitar bucle infinito si solo hay un técnico
-                    if indice_tecnico == tecnico_inicial:
-                        break
-            
-            if num_dias <= 2:
-                # Bloque de 1-2 días: asignar al mismo técnico
-                tecnico = self.tecnicos[indice_tecnico]
-                color = ["#3498db", "#e74c3c", "#2ecc71", "#f39c12", "#9b59b6", "#1abc9c"][indice_tecnico % 6]
-                for dia in bloque:
-                    self.asignaciones[dia] = {'tecnico': tecnico, 'color': color}
-                ultimo_tecnico_asignado = tecnico
-                indice_tecnico = (indice_tecnico + 1) % len(self.tecnicos)
-            
-            elif num_dias == 3:
-                # Bloque de 3 días: mismo técnico para los 3
-                tecnico = self.tecnicos[indice_tecnico]
-                color = ["#3498db", "#e74c3c", "#2ecc71", "#f39c12", "#9b59b6", "#1abc9c"][indice_tecnico % 6]
-                for dia in bloque:
-                    self.asignaciones[dia] = {'tecnico': tecnico, 'color': color}
-                ultimo_tecnico_asignado = tecnico
-                indice_tecnico = (indice_tecnico + 1) % len(self.tecnicos)
-            
-            else:
-                # Bloque de 4+ días: dividir en sub-bloques de 2 días
-                i = 0
-                while i < num_dias:
-                    # Asegurar que no repetimos técnico del sub-bloque anterior
-                    if i > 0:
-                        # Cambiar de técnico para el siguiente sub-bloque
-                        indice_tecnico = (indice_tecnico + 1) % len(self.tecnicos)
-                    
-                    tecnico = self.tecnicos[indice_tecnico]
-                    color = ["#3498db", "#e74c3c", "#2ecc71", "#f39c12", "#9b59b6", "#1abc9c"][indice_tecnico % 6]
-                    
-                    # Asignar 2 días (o lo que quede si es menos)
-                    dias_asignar = min(2, num_dias - i)
-                    for j in range(dias_asignar):
-                        self.asignaciones[bloque[i + j]] = {'tecnico': tecnico, 'color': color}
-                    
-                    ultimo_tecnico_asignado = tecnico
-                    i += dias_asignar
+        colores = ["#3498db", "#e74c3c", "#2ecc71", "#f39c12", "#9b59b6", "#1abc9c"]
+        color_tecnico = {tecnico: colores[i % 6] for i, tecnico in enumerate(self.tecnicos)}
+        self.asignaciones = {
+            dia: {'tecnico': tecnico, 'color': color_tecnico[tecnico]}
+            for dia, tecnico in asignaciones.items()
+        }
         
         self.dibujar_calendario()
         messagebox.showinfo("Completado", 
@@ -619,71 +531,13 @@ class GuardiasGUI:
             messagebox.showwarning("Advertencia", "No hay asignaciones para exportar")
             return
         
-        # Ordenar asignaciones por fecha
-        asignaciones_ordenadas = sorted(self.asignaciones.items(), key=lambda x: x[0])
-        
-        # Agrupar fines de semana (sábado-domingo consecutivos del mismo técnico)
-        eventos = []
-        i = 0
-        while i < len(asignaciones_ordenadas):
-            fecha, datos = asignaciones_ordenadas[i]
-            tecnico = datos['tecnico']
-            
-            # Verificar si es sábado y el domingo siguiente tiene el mismo técnico
-            if fecha.weekday() == 5:  # Sábado
-                fecha_domingo = fecha + timedelta(days=1)
-                if i + 1 < len(asignaciones_ordenadas):
-                    siguiente_fecha, siguiente_datos = asignaciones_ordenadas[i + 1]
-                    if siguiente_fecha == fecha_domingo and siguiente_datos['tecnico'] == tecnico:
-                        # Guardia de fin de semana (sábado-domingo)
-                        eventos.append({
-                            'fecha_inicio': fecha,
-                            'fecha_fin': fecha_domingo,
-                            'tecnico': tecnico,
-                            'subject': f"Guardia - {tecnico}"
-                        })
-                        i += 2
-                        continue
-            
-            # Guardia individual
-            anotacion = self.festivos.get(fecha, "")
-            if anotacion:
-                subject = f"Guardia {anotacion} - {tecnico}"
-            else:
-                subject = f"Guardia - {tecnico}"
-            
-            eventos.append({
-                'fecha_inicio': fecha,
-                'fecha_fin': fecha,
-                'tecnico': tecnico,
-                'subject': subject
-            })
-            i += 1
-        
-        # Escribir CSV
+        # Agrupar fines de semana y escribir el CSV en streaming
         nombre_archivo = "guardias-support.csv"
-        with open(nombre_archivo, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file, delimiter=',')
-            writer.writerow([
-                "Subject", "Start Date", "Start Time", "End Date", "End Time",
-                "All Day Event", "Description", "Location", "Private"
-            ])
-            
-            for evento in eventos:
-                writer.writerow([
-                    evento['subject'],
-                    evento['fecha_inicio'].strftime("%Y-%m-%d"),
-                    "00:00:00",
-                    evento['fecha_fin'].strftime("%Y-%m-%d"),
-                    "23:59:59",
-                    "False",
-                    "",
-                    "",
-                    "False"
-                ])
+        num_eventos = write_csv(iter_assignment_events(self.asignaciones, self.festivos),
+                                [nombre_archivo], FORMATO_HORAS)
         
         messagebox.showinfo("Éxito", 
-            f"✅ CSV exportado correctamente\n\nArchivo: {nombre_archivo}\nEventos: {len(eventos)}")
+            f"✅ CSV exportado correctamente\n\nArchivo: {nombre_archivo}\nEventos: {num_eventos}")
 
 if __name__ == "__main__":
     root = tk.Tk()
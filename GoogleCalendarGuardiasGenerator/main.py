@@ -2,11 +2,24 @@
 Punto de entrada de la aplicación - Gestor de Guardias con pestañas
 """
 
+import os
 import tkinter as tk
 from tkinter import ttk
 from ui.generator_tab import GeneratorTab
 from ui.viewer_tab import ViewerTab
 
+# Renderer de los calendarios: "widgets" (por defecto) o "canvas"
+RENDERER = os.environ.get("GUARDIAS_RENDERER", "widgets")
+
+# Carpeta cuyos CSV se importan automáticamente (la misma donde exporta el
+# generador); GUARDIAS_CSV_DIR="" desactiva la vigilancia
+CSV_DIR = os.environ.get("GUARDIAS_CSV_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "csv"))
+
+# Archivos a partir de los que una importación manual parsea en procesos
+# (importaciones masivas de histórico en equipos multinúcleo); por defecto,
+# GUARDIAS_PROCESOS_DESDE=0, siempre con hilos
+PROCESS_MIN_FILES = int(os.environ.get("GUARDIAS_PROCESOS_DESDE", "0"))
+
 
 class GuardiasApplication:
     """Aplicación principal con pestañas"""
@@ -17,6 +30,14 @@ class GuardiasApplication:
         self.root.geometry("1600x850")
         
         self._create_notebook()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+    
+    def _on_close(self):
+        """Consolida los datos persistidos antes de cerrar"""
+        self.viewer_tab.stop_watcher()
+        self.viewer_tab.stop_import()
+        self.viewer_tab.calendar_manager.close()
+        self.root.destroy()
     
     def _create_notebook(self):
         """Crea el notebook con pestañas"""
@@ -46,11 +67,12 @@ class GuardiasApplication:
         self.notebook.pack(fill=tk.BOTH, expand=True)
         
         # Pestaña 1: Generador
-        self.generator_tab = GeneratorTab(self.notebook)
+        self.generator_tab = GeneratorTab(self.notebook, renderer=RENDERER)
         self.notebook.add(self.generator_tab, text="🔧 Generar Guardias")
         
         # Pestaña 2: Visor de calendarios
-        self.viewer_tab = ViewerTab(self.notebook)
+        self.viewer_tab = ViewerTab(self.notebook, renderer=RENDERER, watch_dir=CSV_DIR or None,
+                                  process_min_files=PROCESS_MIN_FILES)
         self.notebook.add(self.viewer_tab, text="📖 Ver Calendarios")
 
 
@@ -2,5 +2,6 @@
 Models package: Lógica de negocio y gestión de datos
 """
 from .calendar_manager import CalendarManager
+from .roster import generate_roster
 
-__all__ = ['CalendarManager']
+__all__ = ['CalendarManager', 'generate_roster']
@@ -1,186 +1,293 @@
 """
-Gestor de calendarios históricos y futuros con persistencia JSON
+Gestor de calendarios históricos y futuros con persistencia JSON o SQLite
 """
 
-import json
 import os
 import csv
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import hashlib
 import logging
+import multiprocessing
+import threading
+
+from utils.file_hash import file_digest, file_signature
+from .storage import StorageBackend, create_storage, empty_month
+from .write_behind import WriteBehindSaver
 
 logger = logging.getLogger(__name__)
 
 
+def parse_csv_row(row: dict) -> Tuple[str, str, str, bool, List[str]]:
+    """
+    Parsea una fila del CSV de Google Calendar.
+    
+    Args:
+        row: Fila leída con csv.DictReader
+        
+    Returns:
+        tuple: (subject, tecnico, descripcion, all_day, fechas YYYY-MM-DD cubiertas)
+    """
+    # Parsear fechas en formato YYYY-MM-DD
+    fecha_inicio_obj = datetime.strptime(row['Start Date'], '%Y-%m-%d')
+    fecha_fin_obj = datetime.strptime(row['End Date'], '%Y-%m-%d')
+    
+    # Extraer nombre del técnico del Subject (formato: "Guardia - Nombre" o "Guardia TARDE - Nombre")
+    subject = str(row['Subject'])
+    tecnico = subject.split(' - ')[-1].strip() if ' - ' in subject else subject
+    
+    # Para eventos All Day, el End Date es exclusivo (hasta el inicio de ese día, no lo incluye)
+    is_all_day = row.get('All Day Event', 'True') == 'True'
+    fecha_limite = fecha_fin_obj if not is_all_day else fecha_fin_obj - timedelta(days=1)
+    
+    # Una fecha por cada día del rango
+    fechas = []
+    fecha_actual = fecha_inicio_obj
+    while fecha_actual <= fecha_limite:
+        fechas.append(fecha_actual.strftime('%Y-%m-%d'))
+        fecha_actual += timedelta(days=1)
+    
+    return subject, tecnico, str(row.get('Description', '')), is_all_day, fechas
+
+
+def row_fingerprint(row: dict) -> str:
+    """
+    Huella de una fila del CSV (todas sus columnas).
+    
+    Permite saber qué filas se añadieron, cambiaron o desaparecieron entre dos
+    versiones del mismo export sin comparar los eventos día a día.
+    """
+    contenido = "\x1f".join(f"{clave}={row[clave]}" for clave in sorted(row, key=str))
+    return hashlib.md5(contenido.encode('utf-8')).hexdigest()
+
+
+def update_date_range(rango: list, row: dict):
+    """
+    Amplía rango ([Start Date mínima, End Date máxima], cadenas YYYY-MM-DD)
+    con las fechas de una fila del CSV.
+    """
+    inicio, fin = row.get('Start Date'), row.get('End Date')
+    if inicio and (rango[0] is None or inicio < rango[0]):
+        rango[0] = inicio
+    if fin and (rango[1] is None or fin > rango[1]):
+        rango[1] = fin
+
+
+def parse_csv_file(filepath: str, conocidas: Optional[set] = None) -> dict:
+    """
+    Parsea un CSV completo sin tocar el almacenamiento.
+    
+    Es una función de módulo para poder ejecutarse en un ProcessPoolExecutor:
+    solo devuelve tuplas con las fechas ya expandidas, baratas de serializar.
+    
+    Args:
+        filepath: Ruta al archivo CSV
+        conocidas: Huellas de filas ya importadas, que no se vuelven a parsear
+        
+    Returns:
+        dict: {'total': filas leídas, 'filas': [(num_fila, huella, fila parseada)],
+        'huellas': huellas de todas las filas, 'rango': fechas cubiertas (ver
+        update_date_range), 'errores_detalle': [{'fila', 'error'}]}
+    """
+    resultado = {'total': 0, 'filas': [], 'huellas': [], 'rango': [None, None],
+                 'errores_detalle': []}
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        for idx, row in enumerate(csv.DictReader(f)):
+            resultado['total'] += 1
+            huella = row_fingerprint(row)
+            resultado['huellas'].append(huella)
+            update_date_range(resultado['rango'], row)
+            if conocidas and huella in conocidas:
+                continue
+            try:
+                resultado['filas'].append((idx + 2, huella, parse_csv_row(row)))
+            except Exception as e:
+                resultado['errores_detalle'].append({'fila': idx + 2, 'error': str(e)})
+    return resultado
+
+
 class CalendarManager:
-    """Gestor de calendarios con soporte para importación CSV"""
+    """
+    Gestor de calendarios con soporte para importación CSV.
+    
+    Es seguro usarlo desde varios hilos: todas las operaciones sobre el
+    almacenamiento se serializan con `lock`. Las importaciones solo lo
+    retienen mientras fusionan cada lote, así que la interfaz puede seguir
+    leyendo meses durante una importación en segundo plano.
+    """
     
-    def __init__(self, data_file: str = "json/calendarios.json"):
+    def __init__(self, data_file: str = "json/calendarios.json",
+                 storage: Optional[StorageBackend] = None, save_delay: float = 1.0,
+                 **storage_options):
         """
         Inicializa el gestor de calendarios.
         
         Args:
-            data_file: Ruta al archivo JSON de persistencia
+            data_file: Ruta al archivo de persistencia. La extensión elige el
+                backend: .json (por defecto) o .db/.sqlite/.sqlite3 para SQLite
+            storage: Backend ya creado (tiene prioridad sobre data_file)
+            save_delay: Segundos sin cambios antes del guardado diferido
+                (ver request_save)
+            **storage_options: Opciones del backend (p. ej. compact_every para JSON)
         """
         self.data_file = data_file
-        self.data = self._load_data()
-        
-    def _load_data(self) -> dict:
-        """Carga datos desde JSON o crea estructura inicial"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                # Validar que tenga las claves necesarias
-                if 'meses' not in data or 'fuentes_csv' not in data:
-                    logger.warning(f"Estructura de datos incompleta en {self.data_file}, regenerando...")
-                    return self._get_empty_structure()
-                
-                return data
-            except Exception as e:
-                logger.error(f"Error cargando {self.data_file}: {e}")
-                return self._get_empty_structure()
-        else:
-            return self._get_empty_structure()
-            
-    def _get_empty_structure(self) -> dict:
-        """Retorna estructura vacía de datos"""
-        return {
-            "version": "1.0",
-            "last_updated": datetime.now().isoformat(),
-            "meses": {},
-            "fuentes_csv": []
-        }
+        self.storage = storage or create_storage(data_file, **storage_options)
+        self.lock = threading.RLock()
+        self.saver = WriteBehindSaver(self.save_data, delay=save_delay)
+        # {ruta absoluta: (firma, hash)} para no recalcular hashes de archivos sin cambios
+        self._hash_cache = None
         
     def save_data(self):
-        """Persiste datos a JSON"""
-        self.data["last_updated"] = datetime.now().isoformat()
+        """Persiste los cambios pendientes"""
+        with self.lock:
+            self.storage.save()
         
-        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+    def request_save(self):
+        """
+        Programa un guardado diferido en segundo plano.
         
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
-            
-        logger.info(f"Datos guardados en {self.data_file}")
+        Pensado para ediciones interactivas: varias llamadas seguidas se
+        agrupan en un único guardado cuando pasan `save_delay` segundos sin
+        cambios.
+        """
+        self.saver.mark_dirty()
+        
+    def flush(self):
+        """Guarda inmediatamente lo programado con request_save"""
+        self.saver.flush()
         
-    def import_csv(self, filepath: str) -> dict:
+    def close(self):
+        """Persiste y libera el almacenamiento (llamar al salir)"""
+        self.saver.stop()
+        with self.lock:
+            self.storage.close()
+        
+    def import_csv(self, filepath: str, batch_size: int = 500,
+                   progress_callback: Optional[Callable[[int, float], None]] = None,
+                   save_mode: str = 'end') -> dict:
         """
         Importa eventos desde archivo CSV generado por la aplicación.
         
+        El archivo se procesa fila a fila sin cargarlo entero en memoria, en
+        lotes de `batch_size` filas.
+        
+        Si el archivo es una versión nueva de un CSV ya importado desde la
+        misma ruta, la importación es incremental: se eliminan los eventos de
+        las filas que ya no están, se fusionan solo las filas nuevas o
+        cambiadas y las demás se saltan sin parsearlas (ver 'diff' en el
+        resultado).
+        
         Args:
             filepath: Ruta al archivo CSV
+            batch_size: Filas por lote
+            progress_callback: Función llamada tras cada lote con
+                (filas_procesadas, fracción del archivo leída entre 0 y 1)
+            save_mode: Cuándo persistir: 'end' (una vez al final), 'batch'
+                (tras cada lote) o 'none' (lo hace quien llama)
             
         Returns:
-            dict: Estadísticas de importación
+            dict: Estadísticas de importación, con 'diff' ({'añadidas',
+            'eliminadas', 'sin_cambios', 'historico', 'eventos_eliminados'})
+            en filas y 'meses' (conjunto de meses YYYY-MM modificados)
         """
         stats = {
             'total': 0,
             'importados': 0,
             'duplicados': 0,
             'errores': 0,
-            'errores_detalle': []
+            'errores_detalle': [],
+            'diff': self._empty_diff(),
+            'meses': set()
         }
         
         try:
             # Calcular hash del archivo para detección de duplicados
-            file_hash = self._calculate_file_hash(filepath)
+            file_hash, firma = self._calculate_file_hash(filepath)
             
             # Verificar si ya fue importado
-            if self._is_csv_imported(file_hash):
+            with self.lock:
+                ya_importado = self._is_csv_imported(file_hash)
+                previa = None if ya_importado else self._previous_version(filepath)
+                filas_previas = (self.storage.get_source_rows(previa['hash']) or {}) if previa else {}
+            if ya_importado:
                 logger.warning(f"CSV ya importado previamente: {filepath}")
                 return stats
             
-            # Leer CSV
-            with open(filepath, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-                
-            stats['total'] = len(rows)
+            archivo = os.path.basename(filepath)
+            fecha_importacion = datetime.now().isoformat()
             
-            # Procesar cada fila
-            for idx, row in enumerate(rows):
-                try:
-                    # Parsear fechas en formato YYYY-MM-DD
-                    fecha_inicio_str = row['Start Date']
-                    fecha_fin_str = row['End Date']
-                    
-                    fecha_inicio_obj = datetime.strptime(fecha_inicio_str, '%Y-%m-%d')
-                    fecha_fin_obj = datetime.strptime(fecha_fin_str, '%Y-%m-%d')
-                    
-                    # Extraer nombre del técnico del Subject (formato: "Guardia - Nombre" o "Guardia TARDE - Nombre")
-                    subject = str(row['Subject'])
-                    tecnico = subject.split(' - ')[-1].strip() if ' - ' in subject else subject
-                    
-                    # Para eventos All Day, el End Date es exclusivo (hasta el inicio de ese día, no lo incluye)
-                    is_all_day = row.get('All Day Event', 'True') == 'True'
-                    
-                    # Crear evento para cada día en el rango
-                    fecha_actual = fecha_inicio_obj
-                    # Para All Day events, End Date es exclusivo (no se incluye)
-                    fecha_limite = fecha_fin_obj if not is_all_day else fecha_fin_obj - timedelta(days=1)
+            # Versión nueva de un CSV ya importado: primero se quitan las filas
+            # que desaparecieron, para que las cambiadas no choquen con ellas
+            conocidas = {}
+            if previa:
+                actuales, rango = set(), [None, None]
+                with open(filepath, 'r', encoding='utf-8', newline='') as f:
+                    for row in csv.DictReader(f):
+                        actuales.add(row_fingerprint(row))
+                        update_date_range(rango, row)
+                with self.lock:
+                    conocidas = self._remove_rows(filas_previas, actuales, rango, archivo, stats)
+            nuevas = {}
+            
+            # Leer CSV en streaming
+            with open(filepath, 'r', encoding='utf-8', newline='') as f:
+                tamaño = os.fstat(f.fileno()).st_size or 1
+                leidos = 0
+                
+                def lineas():
+                    nonlocal leidos
+                    for linea in f:
+                        leidos += len(linea)
+                        yield linea
+                
+                for idx, row in enumerate(csv.DictReader(lineas())):
+                    stats['total'] += 1
+                    huella = row_fingerprint(row)
+                    if huella in conocidas:
+                        continue
+                    try:
+                        fila = parse_csv_row(row)
+                        with self.lock:
+                            nuevas[huella] = self._merge_row(fila, archivo, fecha_importacion, stats)
+                        stats['diff']['añadidas'] += 1
+                    except Exception as e:
+                        stats['errores'] += 1
+                        stats['errores_detalle'].append({
+                            'fila': idx + 2,
+                            'error': str(e)
+                        })
                     
-                    while fecha_actual <= fecha_limite:
-                        fecha = fecha_actual.strftime('%Y-%m-%d')
-                        
-                        # Verificar si ya existe un evento en esta fecha
-                        year_month = fecha[:7]
-                        day = fecha[8:10]
-                        existing_tecnico = None
-                        
-                        if year_month in self.data['meses']:
-                            if day in self.data['meses'][year_month]['dias']:
-                                eventos_dia = self.data['meses'][year_month]['dias'][day]['eventos']
-                                if eventos_dia:
-                                    existing_tecnico = eventos_dia[0].get('tecnico')
-                        
-                        # Solo añadir si no hay evento previo en esta fecha
-                        if not existing_tecnico:
-                            evento = {
-                                'id': self._generate_event_id(fecha, subject),
-                                'titulo': subject,
-                                'tecnico': tecnico,
-                                'tipo': 'guardia',
-                                'descripcion': str(row.get('Description', '')),
-                                'all_day': is_all_day,
-                                'origen': 'csv_import',
-                                'fecha_importacion': datetime.now().isoformat(),
-                                'archivo_origen': os.path.basename(filepath)
-                            }
-                            
-                            # Agregar evento
-                            if self.add_event(fecha, evento):
-                                stats['importados'] += 1
-                            else:
-                                stats['duplicados'] += 1
-                        else:
-                            logger.warning(f"Conflicto en {fecha}: ya existe guardia de {existing_tecnico}, ignorando {tecnico}")
-                            stats['duplicados'] += 1
-                        
-                        # Siguiente día
-                        fecha_actual += timedelta(days=1)
-                        
-                except Exception as e:
-                    stats['errores'] += 1
-                    stats['errores_detalle'].append({
-                        'fila': idx + 2,
-                        'error': str(e)
-                    })
+                    if stats['total'] % batch_size == 0:
+                        if save_mode == 'batch':
+                            self.save_data()
+                        if progress_callback:
+                            progress_callback(stats['total'], min(leidos / tamaño, 1.0))
                     
             # Registrar fuente CSV
-            self.data['fuentes_csv'].append({
-                'nombre': os.path.basename(filepath),
+            fuente = {
+                'nombre': archivo,
                 'ruta': filepath,
                 'fecha_carga': datetime.now().isoformat(),
                 'registros_importados': stats['importados'],
-                'hash': file_hash
-            })
+                'hash': file_hash,
+                'firma': list(firma),
+                'incremental': True
+            }
+            with self.lock:
+                self.storage.add_source(fuente, filas={**conocidas, **nuevas})
+                if previa:
+                    self.storage.remove_source(previa['hash'])
             
             # Guardar cambios
-            self.save_data()
+            if save_mode != 'none':
+                self.save_data()
+            if progress_callback:
+                progress_callback(stats['total'], 1.0)
             
             logger.info(f"CSV importado: {stats['importados']} eventos de {stats['total']} total")
+            if previa:
+                logger.info(f"Reimportación incremental de {archivo}: {stats['diff']}")
             
         except Exception as e:
             logger.error(f"Error importando CSV {filepath}: {e}")
@@ -189,20 +296,333 @@ class CalendarManager:
             
         return stats
         
-    def _calculate_file_hash(self, filepath: str) -> str:
-        """Calcula hash MD5 del archivo"""
-        hash_md5 = hashlib.md5()
-        with open(filepath, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+    def import_many(self, filepaths: List[str], max_workers: Optional[int] = None,
+                    progress_callback: Optional[Callable[[float, int], None]] = None,
+                    use_processes: bool = False, batch_size: int = 500,
+                    cancel_event: Optional[threading.Event] = None) -> dict:
+        """
+        Importa varios CSV en una sola operación.
+        
+        Calcula el hash de todos los archivos, descarta los ya importados (o
+        repetidos en la misma selección), parsea el resto en paralelo,
+        fusiona los eventos en el orden recibido y persiste una única vez.
+        Las versiones nuevas de CSV ya importados se procesan de forma
+        incremental, como en import_csv.
+        
+        La fusión siempre se hace en el proceso principal y en el orden de
+        filepaths, así que el resultado no depende del número de workers.
+        
+        Args:
+            filepaths: Rutas a los archivos CSV
+            max_workers: Workers para hash y parseo (None = por defecto)
+            progress_callback: Función llamada tras fusionar cada lote con
+                (archivos procesados incluida la fracción del actual,
+                archivos a importar)
+            use_processes: Parsear en un ProcessPoolExecutor (recomendado para
+                importaciones masivas de histórico en equipos multinúcleo)
+            batch_size: Filas fusionadas por cada adquisición del lock
+            cancel_event: Si se activa, la importación se detiene antes del
+                siguiente lote. Lo ya fusionado se conserva y se persiste, pero
+                el archivo interrumpido no se registra como importado
+            
+        Returns:
+            dict: Estadísticas combinadas (incluidos 'diff' y 'meses'), más
+            'archivos', 'omitidos', 'cancelado' y 'por_archivo' ({nombre:
+            estadísticas del archivo})
+        """
+        stats = {
+            'archivos': len(filepaths),
+            'omitidos': 0,
+            'total': 0,
+            'importados': 0,
+            'duplicados': 0,
+            'errores': 0,
+            'errores_detalle': [],
+            'diff': self._empty_diff(),
+            'meses': set(),
+            'cancelado': False,
+            'por_archivo': {}
+        }
+        
+        def hash_seguro(filepath):
+            try:
+                return self._calculate_file_hash(filepath), None
+            except Exception as e:
+                return (None, None), str(e)
+        
+        # 1. Hash de todos los archivos y descarte de los ya importados
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            hashes = list(pool.map(hash_seguro, filepaths))
+        
+        pendientes = []
+        vistos = set()
+        with self.lock:
+            for filepath, ((file_hash, firma), error) in zip(filepaths, hashes):
+                if error:
+                    stats['errores'] += 1
+                    stats['errores_detalle'].append({'archivo': os.path.basename(filepath), 'error': error})
+                elif file_hash in vistos or self._is_csv_imported(file_hash):
+                    logger.warning(f"CSV ya importado previamente: {filepath}")
+                    stats['omitidos'] += 1
+                else:
+                    vistos.add(file_hash)
+                    previa = self._previous_version(filepath)
+                    filas_previas = (self.storage.get_source_rows(previa['hash']) or {}) if previa else {}
+                    pendientes.append((filepath, file_hash, firma, previa, filas_previas))
+        
+        # El parseo de fechas es CPU puro: con procesos se evita el GIL. Los
+        # procesos se arrancan con "spawn": hacer fork de un proceso con hilos
+        # vivos (Tk, vigilancia, guardado diferido) puede bloquear al hijo en
+        # un lock heredado
+        if use_processes and len(pendientes) > 1:
+            executor = ProcessPoolExecutor(max_workers=max_workers,
+                                           mp_context=multiprocessing.get_context("spawn"))
+        else:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        
+        with executor as pool:
+            # 2. Parseo en paralelo; 3. fusión en el orden original
+            futuros = [pool.submit(parse_csv_file, filepath, set(filas_previas) if previa else None)
+                       for filepath, _, _, previa, filas_previas in pendientes]
+            fecha_importacion = datetime.now().isoformat()
+            
+            for num, ((filepath, file_hash, firma, previa, filas_previas), futuro) in \
+                    enumerate(zip(pendientes, futuros)):
+                if cancel_event is not None and cancel_event.is_set():
+                    stats['cancelado'] = True
+                    break
+                
+                archivo = os.path.basename(filepath)
+                file_stats = {'total': 0, 'importados': 0, 'duplicados': 0, 'errores': 0,
+                              'errores_detalle': [], 'diff': self._empty_diff(), 'meses': set()}
+                try:
+                    parseado = futuro.result()
+                except Exception as e:
+                    file_stats['errores'] += 1
+                    file_stats['errores_detalle'].append({'error': str(e)})
+                else:
+                    file_stats['total'] = parseado['total']
+                    file_stats['errores'] = len(parseado['errores_detalle'])
+                    file_stats['errores_detalle'] = parseado['errores_detalle']
+                    filas = parseado['filas']
+                    conocidas = {}
+                    if previa:
+                        with self.lock:
+                            conocidas = self._remove_rows(filas_previas, set(parseado['huellas']),
+                                                          parseado['rango'], archivo, file_stats)
+                    nuevas = {}
+                    
+                    for inicio in range(0, len(filas), batch_size):
+                        if cancel_event is not None and cancel_event.is_set():
+                            stats['cancelado'] = True
+                            break
+                        with self.lock:
+                            for _, huella, fila in filas[inicio:inicio + batch_size]:
+                                nuevas[huella] = self._merge_row(fila, archivo, fecha_importacion,
+                                                                 file_stats)
+                                file_stats['diff']['añadidas'] += 1
+                        if progress_callback:
+                            fraccion = min(inicio + batch_size, len(filas)) / len(filas)
+                            progress_callback(num + fraccion, len(pendientes))
+                    
+                    if not stats['cancelado']:
+                        with self.lock:
+                            self.storage.add_source({
+                                'nombre': archivo,
+                                'ruta': filepath,
+                                'fecha_carga': datetime.now().isoformat(),
+                                'registros_importados': file_stats['importados'],
+                                'hash': file_hash,
+                                'firma': list(firma),
+                                'incremental': True
+                            }, filas={**conocidas, **nuevas})
+                            if previa:
+                                self.storage.remove_source(previa['hash'])
+                
+                stats['por_archivo'][archivo] = file_stats
+                for clave in ('total', 'importados', 'duplicados', 'errores'):
+                    stats[clave] += file_stats[clave]
+                for clave, valor in file_stats['diff'].items():
+                    stats['diff'][clave] += valor
+                stats['meses'] |= file_stats['meses']
+                stats['errores_detalle'].extend(
+                    {'archivo': archivo, **detalle} for detalle in file_stats['errores_detalle'])
+                
+                if stats['cancelado']:
+                    break
+                if progress_callback:
+                    progress_callback(num + 1, len(pendientes))
+            
+            if stats['cancelado']:
+                logger.warning("Importación cancelada")
+                for futuro in futuros:
+                    futuro.cancel()
+        
+        # Persistir una sola vez
+        if pendientes:
+            self.save_data()
+            
+        logger.info(f"{len(pendientes)} CSV importados: {stats['importados']} eventos "
+                    f"({stats['omitidos']} archivos omitidos)")
+        return stats
+        
+    def _merge_row(self, fila: tuple, archivo: str, fecha_importacion: str,
+                   stats: dict) -> List[List[str]]:
+        """
+        Añade los eventos diarios de una fila ya parseada (ver parse_csv_row).
+        
+        Si una fecha ya tiene guardia, prevalece el técnico existente.
+        
+        Returns:
+            list: [primera fecha, número de días, subject] de la fila, de donde
+            se deducen los ids de sus eventos (ver _row_events) para poder
+            eliminarlos si la fila desaparece del CSV
+        """
+        subject, tecnico, descripcion, is_all_day, fechas = fila
+        
+        for fecha in fechas:
+            event_id = self._generate_event_id(fecha, subject)
+            
+            # Verificar si ya existe un evento en esta fecha (índice O(1))
+            existing_tecnico = self.storage.get_primary_tecnico(fecha)
+            
+            # Solo añadir si no hay evento previo en esta fecha
+            if existing_tecnico:
+                if not any(e.get('id') == event_id for e in self.storage.get_day_events(fecha)):
+                    logger.warning(f"Conflicto en {fecha}: ya existe guardia de {existing_tecnico}, ignorando {tecnico}")
+                stats['duplicados'] += 1
+                continue
+                
+            evento = {
+                'id': event_id,
+                'titulo': subject,
+                'tecnico': tecnico,
+                'tipo': 'guardia',
+                'descripcion': descripcion,
+                'all_day': is_all_day,
+                'origen': 'csv_import',
+                'fecha_importacion': fecha_importacion,
+                'archivo_origen': archivo
+            }
+            
+            # Agregar evento
+            if self.add_event(fecha, evento):
+                stats['importados'] += 1
+                stats['meses'].add(fecha[:7])
+            else:
+                stats['duplicados'] += 1
+            
+        return [fechas[0] if fechas else None, len(fechas), subject]
+        
+    def _row_events(self, entrada: list) -> List[Tuple[str, str]]:
+        """
+        Eventos (fecha, id) de una fila registrada en las huellas de una fuente.
+        
+        Args:
+            entrada: [primera fecha, número de días, subject] (ver _merge_row)
+                o, en fuentes anteriores, la lista [[fecha, id], ...]
+        """
+        if entrada and isinstance(entrada[0], list):
+            return [(fecha, event_id) for fecha, event_id in entrada]
+        inicio, dias, subject = entrada
+        if not dias:
+            return []
+        primera = datetime.strptime(inicio, '%Y-%m-%d')
+        fechas = [(primera + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(dias)]
+        return [(fecha, self._generate_event_id(fecha, subject)) for fecha in fechas]
+        
+    @staticmethod
+    def _empty_diff() -> dict:
+        """Contadores de una reimportación incremental (en filas del CSV)"""
+        return {'añadidas': 0, 'eliminadas': 0, 'sin_cambios': 0, 'historico': 0,
+                'eventos_eliminados': 0}
+        
+    def _previous_version(self, filepath: str) -> Optional[dict]:
+        """Última fuente importada desde la misma ruta con huellas por fila, o None"""
+        ruta = os.path.abspath(filepath)
+        for fuente in reversed(self.storage.get_sources()):
+            incremental = fuente.get('incremental') or fuente.get('filas') is not None
+            if incremental and os.path.abspath(fuente.get('ruta', '')) == ruta:
+                return fuente
+        return None
+        
+    def _remove_rows(self, filas_previas: dict, actuales: set, rango: list, archivo: str,
+                     stats: dict) -> Dict[str, list]:
+        """
+        Elimina los eventos de las filas de la versión anterior que ya no
+        están en el CSV.
+        
+        Los ids se deducen de fecha y título, así que otro CSV (o una edición
+        a mano) puede tener un evento con el mismo id: solo se elimina si su
+        archivo de origen es el CSV que se reimporta.
+        
+        Solo se eliminan las filas cuyas fechas caen dentro del rango que
+        cubre el CSV nuevo. Las que quedan fuera son histórico (el export
+        avanzó, o se exportó otro mes con el mismo nombre de archivo) y se
+        conservan ('historico' en el diff).
+        
+        Args:
+            filas_previas: Huellas por fila de la versión anterior
+            actuales: Huellas de las filas del CSV nuevo
+            rango: [inicio, fin] de las fechas del CSV nuevo
+            archivo: Nombre del CSV que se reimporta
+            stats: Estadísticas donde acumular el 'diff'
+            
+        Returns:
+            dict: Huellas de las filas que se mantienen ({huella: entrada})
+        """
+        inicio, fin = rango
+        conservadas = {}
+        for huella, entrada in filas_previas.items():
+            if huella in actuales:
+                conservadas[huella] = entrada
+                stats['diff']['sin_cambios'] += 1
+                continue
+            refs = self._row_events(entrada)
+            if refs and (inicio is None or not all(inicio <= fecha <= fin for fecha, _ in refs)):
+                conservadas[huella] = entrada
+                stats['diff']['historico'] += 1
+                continue
+            stats['diff']['eliminadas'] += 1
+            for fecha, event_id in refs:
+                propio = any(e.get('id') == event_id and e.get('archivo_origen') == archivo
+                             for e in self.storage.get_day_events(fecha))
+                if propio and self.storage.remove_event(fecha, event_id):
+                    stats['diff']['eventos_eliminados'] += 1
+                    stats['meses'].add(fecha[:7])
+        return conservadas
+        
+    def _calculate_file_hash(self, filepath: str) -> Tuple[str, Tuple[int, int, int]]:
+        """
+        Calcula el hash MD5 del archivo.
+        
+        Si la firma (tamaño, mtime, inodo) coincide con la de un cálculo
+        anterior o con la registrada en una fuente importada, se reutiliza el
+        hash sin leer el archivo.
+        
+        Returns:
+            Tuple: (hash, firma)
+        """
+        firma = file_signature(filepath)
+        ruta = os.path.abspath(filepath)
+        with self.lock:
+            if self._hash_cache is None:
+                self._hash_cache = {
+                    os.path.abspath(f['ruta']): (tuple(f['firma']), f['hash'])
+                    for f in self.storage.get_sources() if f.get('firma') and f.get('ruta')
+                }
+            previo = self._hash_cache.get(ruta)
+        if previo and previo[0] == firma:
+            return previo[1], firma
+            
+        file_hash = file_digest(filepath)
+        with self.lock:
+            self._hash_cache[ruta] = (firma, file_hash)
+        return file_hash, firma
         
     def _is_csv_imported(self, file_hash: str) -> bool:
         """Verifica si un CSV ya fue importado"""
-        for fuente in self.data['fuentes_csv']:
-            if fuente.get('hash') == file_hash:
-                return True
-        return False
+        return self.storage.has_source(file_hash)
         
     def _generate_event_id(self, fecha: str, titulo: str) -> str:
         """Genera ID único para evento"""
@@ -220,47 +640,21 @@ class CalendarManager:
         Returns:
             bool: True si se añadió, False si ya existía
         """
-        # Extraer año-mes
-        year_month = fecha[:7]  # "2026-02"
-        
-        # Crear estructura si no existe
-        if year_month not in self.data['meses']:
-            self.data['meses'][year_month] = {
-                'dias': {},
-                'estadisticas_mes': {
-                    'total_eventos': 0,
-                    'por_tipo': {}
-                }
-            }
-            
-        month_data = self.data['meses'][year_month]
-        
-        # Crear día si no existe
-        day = fecha[8:10]  # "15"
-        if day not in month_data['dias']:
-            month_data['dias'][day] = {
-                'eventos': [],
-                'metricas': {}
-            }
-            
-        # Verificar duplicados
-        event_id = evento.get('id')
-        existing_ids = [e.get('id') for e in month_data['dias'][day]['eventos']]
+        with self.lock:
+            return self.storage.add_event(fecha, evento)
         
-        if event_id in existing_ids:
-            logger.debug(f"Evento duplicado evitado: {evento.get('titulo')}")
-            return False
-            
-        # Agregar evento
-        month_data['dias'][day]['eventos'].append(evento)
-        
-        # Actualizar estadísticas
-        month_data['estadisticas_mes']['total_eventos'] += 1
-        tipo = evento.get('tipo', 'otro')
-        month_data['estadisticas_mes']['por_tipo'][tipo] = \
-            month_data['estadisticas_mes']['por_tipo'].get(tipo, 0) + 1
+    def remove_events(self, fecha: str) -> int:
+        """
+        Elimina todos los eventos de una fecha.
+        
+        Args:
+            fecha: Fecha en formato YYYY-MM-DD
             
-        return True
+        Returns:
+            int: Número de eventos eliminados
+        """
+        with self.lock:
+            return self.storage.remove_events(fecha)
         
     def get_month_view(self, year: int, month: int) -> dict:
         """
@@ -274,10 +668,8 @@ class CalendarManager:
             dict: Datos del mes
         """
         year_month = f"{year:04d}-{month:02d}"
-        return self.data['meses'].get(year_month, {
-            'dias': {},
-            'estadisticas_mes': {'total_eventos': 0}
-        })
+        with self.lock:
+            return self.storage.get_month(year_month) or empty_month()
         
     def get_multi_month_view(self, start_date: datetime, months: int) -> List[dict]:
         """
@@ -294,7 +686,14 @@ class CalendarManager:
         current = start_date
         
         for i in range(months):
-            month_data = self.get_month_view(current.year, current.month)
+            # Copia de días y listas de eventos: las claves de presentación no
+            # se persisten y otro hilo puede seguir importando mientras se pinta
+            with self.lock:
+                month_data = dict(self.get_month_view(current.year, current.month))
+                month_data['dias'] = {
+                    dia: dict(datos, eventos=list(datos.get('eventos', [])))
+                    for dia, datos in month_data['dias'].items()
+                }
             month_data['year'] = current.year
             month_data['month'] = current.month
             month_data['month_name'] = current.strftime('%B %Y')
@@ -317,39 +716,44 @@ class CalendarManager:
         """
         all_events = []
         
-        for year_month, month_data in self.data['meses'].items():
-            for day, day_data in month_data['dias'].items():
-                for evento in day_data['eventos']:
-                    event_copy = evento.copy()
-                    event_copy['fecha'] = f"{year_month}-{day}"
-                    all_events.append(event_copy)
+        with self.lock:
+            for fecha, evento in self.storage.iter_events():
+                event_copy = evento.copy()
+                event_copy['fecha'] = fecha
+                all_events.append(event_copy)
                     
         return all_events
         
+    def get_events_by_tecnico(self, tecnico: str, start: Optional[str] = None,
+                              end: Optional[str] = None) -> List[dict]:
+        """
+        Obtiene los eventos de un técnico en orden cronológico.
+        
+        Args:
+            tecnico: Nombre del técnico
+            start: Fecha inicial YYYY-MM-DD (incluida, opcional)
+            end: Fecha final YYYY-MM-DD (incluida, opcional)
+            
+        Returns:
+            list: Eventos del técnico con fecha
+        """
+        eventos = []
+        with self.lock:
+            for fecha, evento in self.storage.get_events_by_tecnico(tecnico, start, end):
+                event_copy = evento.copy()
+                event_copy['fecha'] = fecha
+                eventos.append(event_copy)
+        return eventos
+        
     def get_statistics(self) -> dict:
-        """Obtiene estadísticas globales"""
-        # Asegurar que la estructura existe
-        if 'meses' not in self.data:
-            self.data['meses'] = {}
-        if 'fuentes_csv' not in self.data:
-            self.data['fuentes_csv'] = []
-        
-        total_meses = len(self.data.get('meses', {}))
-        total_eventos = sum(
-            m.get('estadisticas_mes', {}).get('total_eventos', 0)
-            for m in self.data.get('meses', {}).values()
-        )
-        
-        # Eventos por tipo
-        eventos_por_tipo = {}
-        for month_data in self.data.get('meses', {}).values():
-            for tipo, count in month_data.get('estadisticas_mes', {}).get('por_tipo', {}).items():
-                eventos_por_tipo[tipo] = eventos_por_tipo.get(tipo, 0) + count
-                
-        return {
-            'total_meses_con_datos': total_meses,
-            'total_eventos': total_eventos,
-            'eventos_por_tipo': eventos_por_tipo,
-            'fuentes_csv': len(self.data.get('fuentes_csv', [])),
-            'ultima_actualizacion': self.data.get('last_updated', datetime.now().isoformat())
-        }
+        """
+        Obtiene estadísticas globales.
+        
+        Los backends mantienen los totales en cada add_event/remove_events, así
+        que la consulta no recorre el histórico (se puede llamar en cada refresco).
+        """
+        with self.lock:
+            stats = self.storage.get_statistics()
+            stats['fuentes_csv'] = self.storage.count_sources()
+            stats['ultima_actualizacion'] = self.storage.get_last_updated() or datetime.now().isoformat()
+        return stats
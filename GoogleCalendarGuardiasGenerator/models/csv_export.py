@@ -0,0 +1,151 @@
+"""
+Exportación en streaming de guardias a CSV de Google Calendar
+"""
+
+import csv
+import io
+import logging
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from utils.atomic_file import atomic_write, copy_atomic
+
+logger = logging.getLogger(__name__)
+
+CSV_HEADER = [
+    "Subject", "Start Date", "Start Time", "End Date", "End Time",
+    "All Day Event", "Description", "Location", "Private"
+]
+
+# Formatos de fila de los exportadores existentes
+FORMATO_HORAS = "horas"  # End Date = último día a las 23:59:59 (generator.py, GuardiasGUI)
+FORMATO_DIA_COMPLETO = "dia_completo"  # All Day con End Date exclusivo (GeneratorTab)
+
+FILAS_POR_BLOQUE = 1000  # Filas formateadas antes de volcar el buffer a los destinos
+
+
+def iter_assignment_events(asignaciones: Dict[date, dict],
+                           festivos: Dict[date, str]) -> Iterator[dict]:
+    """
+    Convierte asignaciones día a día en eventos, generándolos de uno en uno.
+
+    Un sábado y el domingo siguiente del mismo técnico forman una guardia de
+    fin de semana; el resto de días son guardias individuales (con la
+    anotación del festivo en el asunto, si la tiene).
+
+    Args:
+        asignaciones: {fecha: {'tecnico': ...}}
+        festivos: {fecha: anotación}
+
+    Yields:
+        dict: {'fecha_inicio', 'fecha_fin', 'tecnico', 'subject'}
+    """
+    fechas = sorted(asignaciones)
+    i = 0
+    while i < len(fechas):
+        fecha = fechas[i]
+        tecnico = asignaciones[fecha]['tecnico']
+
+        if fecha.weekday() == 5 and i + 1 < len(fechas):
+            fecha_domingo = fecha + timedelta(days=1)
+            if fechas[i + 1] == fecha_domingo and asignaciones[fecha_domingo]['tecnico'] == tecnico:
+                yield {
+                    'fecha_inicio': fecha,
+                    'fecha_fin': fecha_domingo,
+                    'tecnico': tecnico,
+                    'subject': f"Guardia - {tecnico}"
+                }
+                i += 2
+                continue
+
+        anotacion = festivos.get(fecha, "")
+        yield {
+            'fecha_inicio': fecha,
+            'fecha_fin': fecha,
+            'tecnico': tecnico,
+            'subject': f"Guardia {anotacion} - {tecnico}" if anotacion else f"Guardia - {tecnico}"
+        }
+        i += 1
+
+
+def iter_rows(eventos: Iterable[dict], formato: str = FORMATO_HORAS) -> Iterator[List[str]]:
+    """
+    Genera las filas CSV de los eventos (sin cabecera).
+
+    Args:
+        eventos: Eventos con 'subject', 'fecha_inicio' y 'fecha_fin' (date)
+        formato: FORMATO_HORAS o FORMATO_DIA_COMPLETO
+    """
+    if formato not in (FORMATO_HORAS, FORMATO_DIA_COMPLETO):
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+
+    for evento in eventos:
+        if formato == FORMATO_HORAS:
+            fin, hora_fin, all_day = evento['fecha_fin'], "23:59:59", "False"
+        else:
+            # End Date exclusivo: el día siguiente al último día de guardia
+            fin, hora_fin, all_day = evento['fecha_fin'] + timedelta(days=1), "00:00:00", "True"
+        yield [
+            evento['subject'],
+            evento['fecha_inicio'].strftime("%Y-%m-%d"),
+            "00:00:00",
+            fin.strftime("%Y-%m-%d"),
+            hora_fin,
+            all_day,
+            "",
+            "",
+            "False"
+        ]
+
+
+def write_csv(eventos: Iterable[dict], destinos: Sequence[str],
+              formato: str = FORMATO_HORAS, errores: Optional[Dict[str, str]] = None) -> int:
+    """
+    Escribe los eventos en uno o varios CSV formateando cada fila una sola vez.
+
+    Las filas se generan de forma perezosa y se acumulan en un buffer que, cada
+    FILAS_POR_BLOQUE filas, se codifica y se vuelca al primer destino: la
+    memoria no depende del número de eventos. El resto de destinos son copias
+    de ese archivo (ver copy_atomic): si una falla, el primero (p. ej. la
+    carpeta csv/ que vigila el visor) queda escrito igualmente. Cada destino
+    se sustituye de forma atómica, así que nadie lee un CSV a medio escribir.
+
+    Args:
+        eventos: Eventos (lista o generador)
+        destinos: Rutas de los archivos a escribir; la carpeta del primero se
+            crea si no existe, la de las copias no
+        formato: FORMATO_HORAS o FORMATO_DIA_COMPLETO
+        errores: Diccionario donde anotar {ruta: error} de las copias fallidas
+
+    Returns:
+        int: Número de eventos escritos
+
+    Raises:
+        OSError: Si no se puede escribir el primer destino
+    """
+    principal, *copias = destinos
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=',')
+    writer.writerow(CSV_HEADER)
+    escritos = 0
+
+    with atomic_write(principal, mode="wb") as archivo:
+
+        def volcar():
+            archivo.write(buffer.getvalue().encode("utf-8"))
+            buffer.seek(0)
+            buffer.truncate()
+
+        for fila in iter_rows(eventos, formato):
+            writer.writerow(fila)
+            escritos += 1
+            if escritos % FILAS_POR_BLOQUE == 0:
+                volcar()
+        volcar()
+
+    fallidos = copy_atomic(principal, copias)
+    for ruta, error in fallidos.items():
+        logger.warning(f"No se pudo copiar el CSV a {ruta}: {error}")
+    if errores is not None:
+        errores.update(fallidos)
+    return escritos
@@ -0,0 +1,159 @@
+"""
+Vigilancia de una carpeta de CSV para importarlos automáticamente
+"""
+
+import fnmatch
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+import logging
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # inotify_simple es opcional (solo Linux): sin él se usa sondeo
+    INotify = None
+
+HAS_INOTIFY = INotify is not None
+
+logger = logging.getLogger(__name__)
+
+Firma = Tuple[int, int, int]
+
+
+class FolderWatcher:
+    """
+    Detecta archivos nuevos o modificados en una carpeta y los entrega, ya
+    estables, a un callback desde un hilo en segundo plano.
+
+    Cada escaneo solo hace un os.scandir y compara (tamaño, mtime, inodo) con
+    el escaneo anterior: no se lee ningún archivo. Un archivo se entrega
+    cuando su firma no cambia durante `debounce` segundos, para no importar
+    un CSV a medio escribir. Con inotify_simple instalado, el hilo se
+    despierta con los eventos del sistema de archivos y el sondeo cada
+    `interval` segundos queda solo como respaldo.
+
+    Al arrancar, los archivos ya presentes también se entregan: así se
+    recogen los que llegaron con la aplicación cerrada (CalendarManager
+    descarta sin leerlos los ya importados).
+    """
+
+    def __init__(self, directory: str, callback: Callable[[List[str]], None],
+                 pattern: str = "*.csv", interval: float = 2.0, debounce: float = 1.0,
+                 use_inotify: bool = True):
+        """
+        Args:
+            directory: Carpeta a vigilar (se crea si no existe)
+            callback: Función llamada con la lista de rutas listas para importar
+            pattern: Patrón de nombres de archivo (fnmatch)
+            interval: Segundos entre escaneos por sondeo
+            debounce: Segundos que la firma de un archivo debe estar estable
+            use_inotify: Usar inotify si está disponible
+        """
+        self.directory = directory
+        self.callback = callback
+        self.pattern = pattern
+        self.interval = interval
+        self.debounce = debounce
+        self._known: Dict[str, Firma] = {}  # Firma ya entregada de cada archivo
+        self._pending: Dict[str, Tuple[Firma, float]] = {}  # {ruta: (firma, visto desde)}
+        self._stop = threading.Event()
+        self._thread = None
+        self._inotify = None
+        if use_inotify and HAS_INOTIFY:
+            self._inotify = INotify()
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def backend(self) -> str:
+        """'inotify' o 'polling'"""
+        return "inotify" if self._inotify is not None else "polling"
+
+    def start(self):
+        """Arranca el hilo de vigilancia"""
+        if self._thread is not None:
+            return
+        if self._inotify is not None:
+            self._inotify.add_watch(self.directory, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO
+                                    | inotify_flags.CREATE | inotify_flags.DELETE)
+        self._thread = threading.Thread(target=self._run, name="folder-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Vigilando {self.directory} ({self.backend})")
+
+    def stop(self, timeout: float = 10.0):
+        """Detiene el hilo (espera a que termine una entrega en curso)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                listos = self.scan()
+                if listos:
+                    self.callback(listos)
+            except Exception as e:
+                logger.error(f"Error vigilando {self.directory}: {e}")
+            self._wait()
+
+    def _wait(self):
+        """Espera al siguiente escaneo: intervalo, fin del debounce o evento de inotify"""
+        espera = self.interval
+        if self._pending:
+            ahora = time.monotonic()
+            espera = min(espera, max(0.05, min(desde + self.debounce - ahora
+                                               for _, desde in self._pending.values())))
+        if self._inotify is None:
+            self._stop.wait(espera)
+            return
+        # Con inotify el sondeo es solo un respaldo: se espera más entre escaneos
+        if not self._pending:
+            espera = max(espera, 30.0)
+        restante = espera
+        while restante > 0 and not self._stop.is_set():
+            # Tramos cortos para atender stop() a tiempo
+            if self._inotify.read(timeout=int(min(restante, 0.5) * 1000)):
+                return
+            restante -= 0.5
+
+    def scan(self) -> List[str]:
+        """
+        Escanea la carpeta una vez.
+
+        Returns:
+            list: Rutas nuevas o modificadas cuya firma lleva `debounce`
+            segundos estable (ordenadas por nombre)
+        """
+        ahora = time.monotonic()
+        vistos = set()
+        with os.scandir(self.directory) as entradas:
+            for entrada in entradas:
+                if not entrada.is_file() or not fnmatch.fnmatch(entrada.name, self.pattern):
+                    continue
+                st = entrada.stat()
+                firma = (st.st_size, st.st_mtime_ns, st.st_ino)
+                ruta = entrada.path
+                vistos.add(ruta)
+                if self._known.get(ruta) == firma:
+                    self._pending.pop(ruta, None)
+                    continue
+                previo = self._pending.get(ruta)
+                if previo is None or previo[0] != firma:
+                    # Nuevo o aún cambiando: reiniciar el debounce
+                    self._pending[ruta] = (firma, ahora)
+
+        # Archivos borrados
+        for ruta in [r for r in self._known if r not in vistos]:
+            del self._known[ruta]
+        for ruta in [r for r in self._pending if r not in vistos]:
+            del self._pending[ruta]
+
+        listos = sorted(ruta for ruta, (_, desde) in self._pending.items()
+                        if ahora - desde >= self.debounce)
+        for ruta in listos:
+            self._known[ruta] = self._pending.pop(ruta)[0]
+        return listos
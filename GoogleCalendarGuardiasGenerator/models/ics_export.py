@@ -0,0 +1,180 @@
+"""
+Exportación de guardias a iCalendar (.ics) con eventos recurrentes
+"""
+
+import hashlib
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from utils.atomic_file import atomic_write, copy_atomic
+
+logger = logging.getLogger(__name__)
+
+PRODID = "-//GoogleCalendarGuardiasGenerator//Guardias//ES"
+
+MIN_REPETICIONES = 3  # Ocurrencias mínimas para emitir una serie con RRULE
+MAX_SALTO = 3  # Hueco máximo (en pasos de la serie) que se cubre con EXDATE
+
+
+def _fecha_ics(fecha: date) -> str:
+    return fecha.strftime("%Y%m%d")
+
+
+def _escape(texto: str) -> str:
+    """Escapa un valor TEXT según RFC 5545"""
+    return (texto.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _fold(linea: str) -> str:
+    """Parte las líneas de más de 75 octetos (continuación con un espacio)"""
+    datos = linea.encode("utf-8")
+    if len(datos) <= 75:
+        return linea + "\r\n"
+    partes = []
+    inicio = 0
+    limite = 75
+    while inicio < len(datos):
+        fin = min(inicio + limite, len(datos))
+        # No cortar un carácter UTF-8 por la mitad
+        while fin < len(datos) and (datos[fin] & 0xC0) == 0x80:
+            fin -= 1
+        partes.append(datos[inicio:fin].decode("utf-8"))
+        inicio = fin
+        limite = 74  # Las continuaciones empiezan con un espacio
+    return "\r\n ".join(partes) + "\r\n"
+
+
+def plan_series(inicios: List[date]) -> List[Tuple[date, int, int, List[date]]]:
+    """
+    Agrupa fechas de inicio de un mismo evento en series semanales regulares.
+
+    Recorre las fechas ordenadas y prolonga cada serie mientras el siguiente
+    inicio cae a un múltiplo (hasta MAX_SALTO) del paso de la serie; los
+    huecos se convierten en excepciones. Las series con menos de
+    MIN_REPETICIONES ocurrencias se devuelven como eventos sueltos.
+
+    Args:
+        inicios: Fechas de inicio ordenadas y sin repetir
+
+    Returns:
+        list: (inicio, intervalo en semanas, número de ocurrencias, EXDATE);
+        un evento suelto tiene intervalo 0 y 1 ocurrencia
+    """
+    series = []
+    i = 0
+    while i < len(inicios):
+        paso = (inicios[i + 1] - inicios[i]).days if i + 1 < len(inicios) else 0
+        if paso == 0 or paso % 7:
+            series.append((inicios[i], 0, 1, []))
+            i += 1
+            continue
+
+        ocurrencias = [inicios[i], inicios[i + 1]]
+        j = i + 2
+        while j < len(inicios):
+            hueco = (inicios[j] - ocurrencias[-1]).days
+            if hueco % paso or hueco // paso > MAX_SALTO:
+                break
+            ocurrencias.append(inicios[j])
+            j += 1
+
+        if len(ocurrencias) < MIN_REPETICIONES:
+            series.append((inicios[i], 0, 1, []))
+            i += 1
+            continue
+
+        total = (ocurrencias[-1] - ocurrencias[0]).days // paso + 1
+        presentes = set(ocurrencias)
+        exdates = [ocurrencias[0] + timedelta(days=paso * k) for k in range(total)
+                   if ocurrencias[0] + timedelta(days=paso * k) not in presentes]
+        series.append((ocurrencias[0], paso // 7, total, exdates))
+        i = j
+    return series
+
+
+def iter_ics_lines(eventos: Iterable[dict], dtstamp: Optional[datetime] = None) -> Iterator[str]:
+    """
+    Genera las líneas (ya plegadas y con CRLF) de un calendario iCalendar.
+
+    Los eventos con el mismo asunto, duración y día de la semana se agrupan;
+    donde sus fechas siguen una rotación semanal regular (p. ej. el técnico k
+    cubre uno de cada N fines de semana) se emite un único VEVENT con RRULE y
+    EXDATE, y el resto se emite como eventos sueltos. Todos los eventos son
+    de día completo (DTEND exclusivo).
+
+    Args:
+        eventos: Eventos con 'subject', 'fecha_inicio' y 'fecha_fin' (date)
+        dtstamp: Marca de tiempo DTSTAMP (por defecto, ahora en UTC)
+    """
+    grupos: Dict[Tuple[str, int, int], set] = {}
+    for evento in eventos:
+        duracion = (evento['fecha_fin'] - evento['fecha_inicio']).days + 1
+        clave = (evento['subject'], duracion, evento['fecha_inicio'].weekday())
+        grupos.setdefault(clave, set()).add(evento['fecha_inicio'])
+
+    sello = (dtstamp or datetime.now(timezone.utc)).strftime("%Y%m%dT%H%M%SZ")
+    yield _fold("BEGIN:VCALENDAR")
+    yield _fold("VERSION:2.0")
+    yield _fold(f"PRODID:{PRODID}")
+    yield _fold("CALSCALE:GREGORIAN")
+
+    vevents = []
+    for (subject, duracion, _), inicios in grupos.items():
+        for inicio, intervalo, total, exdates in plan_series(sorted(inicios)):
+            vevents.append((inicio, subject, duracion, intervalo, total, exdates))
+    vevents.sort(key=lambda v: (v[0], v[1]))
+
+    for inicio, subject, duracion, intervalo, total, exdates in vevents:
+        uid = hashlib.md5(f"{subject}_{inicio.isoformat()}".encode("utf-8")).hexdigest()
+        yield _fold("BEGIN:VEVENT")
+        yield _fold(f"UID:{uid}@guardias")
+        yield _fold(f"DTSTAMP:{sello}")
+        yield _fold(f"DTSTART;VALUE=DATE:{_fecha_ics(inicio)}")
+        yield _fold(f"DTEND;VALUE=DATE:{_fecha_ics(inicio + timedelta(days=duracion))}")
+        yield _fold(f"SUMMARY:{_escape(subject)}")
+        if intervalo:
+            yield _fold(f"RRULE:FREQ=WEEKLY;INTERVAL={intervalo};COUNT={total}")
+        if exdates:
+            yield _fold("EXDATE;VALUE=DATE:" + ",".join(_fecha_ics(f) for f in exdates))
+        yield _fold("END:VEVENT")
+    yield _fold("END:VCALENDAR")
+
+
+def write_ics(eventos: Iterable[dict], destinos: Sequence[str],
+              dtstamp: Optional[datetime] = None,
+              errores: Optional[Dict[str, str]] = None) -> int:
+    """
+    Escribe los eventos en uno o varios archivos .ics (ver iter_ics_lines).
+
+    Como en write_csv, se escribe el primer destino y el resto son copias
+    independientes: una copia fallida no impide el primero.
+
+    Args:
+        eventos: Eventos (lista o generador)
+        destinos: Rutas de los archivos a escribir; la carpeta del primero se
+            crea si no existe, la de las copias no
+        dtstamp: Marca de tiempo DTSTAMP
+        errores: Diccionario donde anotar {ruta: error} de las copias fallidas
+
+    Returns:
+        int: Número de VEVENT escritos
+
+    Raises:
+        OSError: Si no se puede escribir el primer destino
+    """
+    principal, *copias = destinos
+    vevents = 0
+    with atomic_write(principal, mode="wb") as archivo:
+        for linea in iter_ics_lines(eventos, dtstamp):
+            if linea == "BEGIN:VEVENT\r\n":
+                vevents += 1
+            archivo.write(linea.encode("utf-8"))
+
+    fallidos = copy_atomic(principal, copias)
+    for ruta, error in fallidos.items():
+        logger.warning(f"No se pudo copiar el ICS a {ruta}: {error}")
+    if errores is not None:
+        errores.update(fallidos)
+    return vevents
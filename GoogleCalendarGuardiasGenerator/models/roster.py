@@ -0,0 +1,83 @@
+"""
+Motor de generación de guardias sin E/S (fines de semana + festivos)
+"""
+
+from datetime import date
+from typing import Dict, List, Sequence
+# Las reglas de rotación viven en el motor común; se reexportan aquí por compatibilidad
+from .rotation_engine import (IndiceGuardias, SIN_ASIGNAR, UN_DIA, asignar_tecnico_festivo,
+                              assign_weekend_rotation, encontrar_sabado_anterior,
+                              encontrar_sabado_siguiente)
+
+
+def _subject(tecnico: str, anotacion: str = "") -> str:
+    """Título del evento de guardia en Google Calendar"""
+    if anotacion:
+        return f"Guardia {anotacion} - {tecnico}"
+    return f"Guardia - {tecnico}"
+
+
+def generate_roster(tecnicos: Sequence[str], festivos: Dict[date, str],
+                    start: date, end: date, indice_inicial: int = 0) -> List[dict]:
+    """
+    Genera las guardias de fines de semana y festivos de un rango de fechas.
+
+    No realiza ninguna E/S: recibe los datos ya cargados y devuelve las
+    guardias como registros ordenados cronológicamente.
+
+    Args:
+        tecnicos: Técnicos en orden de rotación
+        festivos: Diccionario {fecha: anotacion}
+        start: Primer día del rango (incluido)
+        end: Último día del rango (incluido)
+        indice_inicial: Posición en la rotación del técnico del primer fin de semana
+
+    Returns:
+        list: Guardias con las claves 'fecha_inicio', 'fecha_fin', 'tecnico',
+        'tipo' ('fin_semana' o 'festivo'), 'anotacion', 'subject' y
+        'cuenta_para_rotacion'
+
+    Raises:
+        ValueError: Si no hay técnicos, el rango está invertido o no contiene
+        ningún fin de semana
+    """
+    if not tecnicos:
+        raise ValueError("La lista de técnicos está vacía")
+    if end < start:
+        raise ValueError("La fecha de fin debe ser posterior a la fecha de inicio")
+
+    primer_sabado = encontrar_sabado_siguiente(start)
+    if primer_sabado > end:
+        raise ValueError("No hay ningún fin de semana en el rango especificado")
+
+    guardias_fin_semana, guardias_festivos = assign_weekend_rotation(
+        tecnicos, festivos, start, end, indice_inicial)
+
+    # Guardias de fin de semana (sábado-domingo) en rotación
+    guardias = [{
+        'fecha_inicio': sabado,
+        'fecha_fin': sabado + UN_DIA,
+        'tecnico': tecnico,
+        'tipo': 'fin_semana',
+        'anotacion': '',
+        'subject': _subject(tecnico),
+        'cuenta_para_rotacion': True
+    } for sabado, tecnico in guardias_fin_semana.items()]
+
+    # Guardias de festivos laborables dentro del rango
+    for fecha, tecnico in guardias_festivos.items():
+        anotacion = festivos[fecha]
+        guardias.append({
+            'fecha_inicio': fecha,
+            'fecha_fin': fecha,
+            'tecnico': tecnico,
+            'tipo': 'festivo',
+            'anotacion': anotacion,
+            'subject': _subject(tecnico, anotacion),
+            'cuenta_para_rotacion': tecnico != SIN_ASIGNAR
+        })
+
+    if guardias_festivos:
+        guardias.sort(key=lambda g: g['fecha_inicio'])
+
+    return guardias
@@ -0,0 +1,348 @@
+"""
+Motor de rotación de guardias compartido por el generador de consola y las GUI
+"""
+
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usa la versión en Python puro
+    np = None
+
+HAS_NUMPY = np is not None
+
+logger = logging.getLogger(__name__)
+
+UN_DIA = timedelta(days=1)
+UNA_SEMANA = timedelta(weeks=1)
+
+SIN_ASIGNAR = "???"
+
+
+def iter_saturdays(start: date, end: date) -> Iterator[date]:
+    """
+    Recorre los sábados del rango.
+
+    Args:
+        start: Primer día del rango (incluido)
+        end: Último día del rango (incluido)
+
+    Yields:
+        date: Cada sábado entre start y end
+    """
+    sabado = start + timedelta(days=(5 - start.weekday()) % 7)
+    while sabado <= end:
+        yield sabado
+        sabado += UNA_SEMANA
+
+
+def compute_duty_blocks(start: date, end: date, festivos: Dict[date, str],
+                        use_numpy: bool = False) -> List[List[date]]:
+    """
+    Calcula los días de guardia (fines de semana + festivos laborables)
+    agrupados en bloques de días consecutivos.
+
+    Recorre el rango una sola vez: cada día se clasifica y se añade al bloque
+    en curso sin construir conjuntos intermedios ni ordenar.
+
+    Args:
+        start: Primer día del rango (incluido)
+        end: Último día del rango (incluido)
+        festivos: Diccionario {fecha: anotacion}
+        use_numpy: Usar la versión vectorizada con NumPy (horizontes largos
+            o muchos escenarios). Se ignora si NumPy no está instalado.
+
+    Returns:
+        list: Bloques de fechas consecutivas en orden cronológico
+    """
+    if use_numpy and HAS_NUMPY:
+        return _compute_duty_blocks_numpy(start, end, festivos)
+
+    bloques = []
+    bloque_actual = []
+    fecha = start
+    dia_semana = start.weekday()
+
+    while fecha <= end:
+        if dia_semana >= 5 or fecha in festivos:
+            bloque_actual.append(fecha)
+        elif bloque_actual:
+            bloques.append(bloque_actual)
+            bloque_actual = []
+        fecha += UN_DIA
+        dia_semana = 0 if dia_semana == 6 else dia_semana + 1
+
+    if bloque_actual:
+        bloques.append(bloque_actual)
+
+    return bloques
+
+
+def _compute_duty_blocks_numpy(start: date, end: date, festivos: Dict[date, str]) -> List[List[date]]:
+    """Versión vectorizada de compute_duty_blocks sobre un rango datetime64[D]"""
+    if end < start:
+        return []
+
+    dias = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+    # El 01/01/1970 (día 0 de datetime64) fue jueves: weekday() == 3
+    es_guardia = (dias.astype(np.int64) + 3) % 7 >= 5
+    if festivos:
+        es_guardia |= np.isin(dias, np.array(list(festivos), dtype='datetime64[D]'))
+
+    indices = np.flatnonzero(es_guardia)
+    if indices.size == 0:
+        return []
+
+    # Un bloque termina donde el siguiente día de guardia no es consecutivo
+    cortes = (np.flatnonzero(np.diff(indices) > 1) + 1).tolist()
+    fechas = dias[indices].tolist()  # datetime64[D] -> datetime.date
+    limites = [0] + cortes + [len(fechas)]
+    return [fechas[a:b] for a, b in zip(limites, limites[1:])]
+
+
+def assign_blocks(bloques: List[List[date]], tecnicos: Sequence[str],
+                  ultimo_tecnico: Optional[str] = None,
+                  indice_inicial: Optional[int] = None) -> Dict[date, str]:
+    """
+    Asigna técnicos a los bloques de guardia siguiendo la rotación.
+
+    Reglas:
+    - No se asigna el mismo técnico a bloques separados consecutivos
+    - Bloques de 1-3 días: mismo técnico
+    - Bloques de 4+ días: se dividen en sub-bloques de 2 días
+
+    Args:
+        bloques: Bloques de fechas consecutivas (ver compute_duty_blocks)
+        tecnicos: Técnicos en orden de rotación
+        ultimo_tecnico: Último técnico del período anterior; la rotación
+            empieza por el siguiente
+        indice_inicial: Posición en la rotación del técnico del primer
+            bloque (tiene prioridad sobre ultimo_tecnico)
+
+    Returns:
+        dict: Diccionario {fecha: tecnico}
+    """
+    asignaciones = {}
+    if not tecnicos:
+        return asignaciones
+
+    num_tecnicos = len(tecnicos)
+    if indice_inicial is not None:
+        indice_tecnico = indice_inicial % num_tecnicos
+    elif ultimo_tecnico in tecnicos:
+        indice_tecnico = (tecnicos.index(ultimo_tecnico) + 1) % num_tecnicos
+    else:
+        indice_tecnico = 0
+
+    ultimo_tecnico_asignado = None
+
+    for bloque in bloques:
+        num_dias = len(bloque)
+
+        # Evitar repetir el técnico del bloque anterior
+        tecnico_inicial = indice_tecnico
+        if ultimo_tecnico_asignado is not None:
+            while tecnicos[indice_tecnico] == ultimo_tecnico_asignado:
+                indice_tecnico = (indice_tecnico + 1) % num_tecnicos
+                if indice_tecnico == tecnico_inicial:
+                    break
+
+        if num_dias <= 3:
+            # Bloque de 1-3 días: mismo técnico
+            tecnico = tecnicos[indice_tecnico]
+            for dia in bloque:
+                asignaciones[dia] = tecnico
+            ultimo_tecnico_asignado = tecnico
+            indice_tecnico = (indice_tecnico + 1) % num_tecnicos
+        else:
+            # Bloque de 4+ días: sub-bloques de 2 días
+            for i in range(0, num_dias, 2):
+                if i > 0:
+                    indice_tecnico = (indice_tecnico + 1) % num_tecnicos
+                tecnico = tecnicos[indice_tecnico]
+                for dia in bloque[i:i + 2]:
+                    asignaciones[dia] = tecnico
+                ultimo_tecnico_asignado = tecnico
+
+    return asignaciones
+
+
+def auto_assign(tecnicos: Sequence[str], festivos: Dict[date, str], start: date, end: date,
+                ultimo_tecnico: Optional[str] = None,
+                use_numpy: bool = False) -> Tuple[Dict[date, str], List[List[date]]]:
+    """
+    Calcula los bloques de guardia del rango y les asigna técnicos.
+
+    Args:
+        tecnicos: Técnicos en orden de rotación
+        festivos: Diccionario {fecha: anotacion}
+        start: Primer día del rango (incluido)
+        end: Último día del rango (incluido)
+        ultimo_tecnico: Último técnico del período anterior
+        use_numpy: Calcular los bloques con NumPy si está disponible
+
+    Returns:
+        tuple: ({fecha: tecnico}, bloques)
+    """
+    bloques = compute_duty_blocks(start, end, festivos, use_numpy=use_numpy)
+    return assign_blocks(bloques, tecnicos, ultimo_tecnico), bloques
+
+
+class IndiceGuardias:
+    """
+    Índice por técnico de los días que ya tienen guardia asignada.
+
+    Se actualiza de forma incremental a medida que se añaden guardias de fin
+    de semana y de festivos, de modo que comprobar si un técnico tiene guardia
+    en una fecha concreta es O(1) en lugar de recorrer todas las guardias.
+    """
+
+    def __init__(self):
+        self._dias_por_tecnico = {}  # {tecnico: {fecha, ...}}
+
+    def agregar(self, fecha_inicio: date, fecha_fin: date, tecnico: str):
+        """Registra una guardia de fecha_inicio a fecha_fin (ambas incluidas)"""
+        dias = self._dias_por_tecnico.setdefault(tecnico, set())
+        fecha = fecha_inicio
+        while fecha <= fecha_fin:
+            dias.add(fecha)
+            fecha += UN_DIA
+
+    def tiene_guardia(self, tecnico: str, fecha: date) -> bool:
+        """Indica si el técnico tiene guardia en la fecha dada"""
+        return fecha in self._dias_por_tecnico.get(tecnico, ())
+
+    def tiene_guardia_reciente(self, tecnico: str, fecha: date, dias: int = 2) -> bool:
+        """Verifica si el técnico tiene guardia en los `dias` días previos a fecha"""
+        dias_tecnico = self._dias_por_tecnico.get(tecnico)
+        if not dias_tecnico:
+            return False
+        for i in range(1, dias + 1):
+            if fecha - timedelta(days=i) in dias_tecnico:
+                return True
+        return False
+
+
+def encontrar_sabado_anterior(fecha: date) -> date:
+    """Encuentra el sábado anterior o igual a la fecha dada"""
+    dias_hasta_sabado = (fecha.weekday() - 5) % 7
+    return fecha - timedelta(days=dias_hasta_sabado)
+
+
+def encontrar_sabado_siguiente(fecha: date) -> date:
+    """Encuentra el sábado siguiente o igual a la fecha dada"""
+    dias_hasta_sabado = (5 - fecha.weekday()) % 7
+    if dias_hasta_sabado == 0 and fecha.weekday() == 5:
+        return fecha
+    return fecha + timedelta(days=dias_hasta_sabado if dias_hasta_sabado > 0 else 7)
+
+
+def asignar_tecnico_festivo(fecha: date, guardias_fin_semana: Dict[date, str],
+                            indice_guardias: IndiceGuardias,
+                            tecnicos: Sequence[str]) -> Optional[str]:
+    """
+    Determina a qué técnico asignar un festivo según su proximidad al fin de semana.
+
+    Reglas:
+    - Lunes/Martes: técnico del fin de semana ANTERIOR
+    - Jueves/Viernes: técnico del fin de semana SIGUIENTE
+    - Miércoles: sin asignar (???)
+    - NO se puede asignar a un técnico que ya tiene guardia en los 2 días previos
+
+    Returns:
+        Nombre del técnico, SIN_ASIGNAR para miércoles o None si el festivo
+        cae en fin de semana o no hay guardia de fin de semana de referencia
+    """
+    dia_semana = fecha.weekday()  # 0=Lunes, 1=Martes, ..., 6=Domingo
+
+    # Sábado o Domingo ya están cubiertos en guardias de fin de semana
+    if dia_semana in [5, 6]:
+        return None
+
+    # Miércoles: sin asignar
+    if dia_semana == 2:
+        return SIN_ASIGNAR
+
+    tecnico_sugerido = None
+
+    # Lunes o Martes: fin de semana ANTERIOR
+    if dia_semana in [0, 1]:
+        sabado_anterior = encontrar_sabado_anterior(fecha - UN_DIA)
+        tecnico_sugerido = guardias_fin_semana.get(sabado_anterior)
+
+    # Jueves o Viernes: fin de semana SIGUIENTE
+    if dia_semana in [3, 4]:
+        sabado_siguiente = encontrar_sabado_siguiente(fecha)
+        tecnico_sugerido = guardias_fin_semana.get(sabado_siguiente)
+
+    # Verificar si el técnico sugerido tiene guardia reciente
+    if tecnico_sugerido and indice_guardias.tiene_guardia_reciente(tecnico_sugerido, fecha):
+        # Buscar el siguiente técnico en la rotación que no tenga guardia reciente
+        indice_actual = tecnicos.index(tecnico_sugerido) if tecnico_sugerido in tecnicos else 0
+        for i in range(len(tecnicos)):
+            tecnico_alternativo = tecnicos[(indice_actual + i + 1) % len(tecnicos)]
+            if not indice_guardias.tiene_guardia_reciente(tecnico_alternativo, fecha):
+                logger.debug(f"{fecha}: {tecnico_sugerido} tiene guardia reciente, "
+                             f"se asigna a {tecnico_alternativo}")
+                return tecnico_alternativo
+
+        # Si todos tienen guardia reciente (caso extremo), devolver el sugerido
+        logger.debug(f"{fecha}: todos los técnicos tienen guardia reciente, "
+                     f"se asigna a {tecnico_sugerido}")
+
+    return tecnico_sugerido
+
+
+def assign_weekend_rotation(tecnicos: Sequence[str], festivos: Dict[date, str],
+                            start: date, end: date,
+                            indice_inicial: int = 0) -> Tuple[Dict[date, str], Dict[date, str]]:
+    """
+    Modo del generador de consola: fines de semana en rotación estricta y
+    festivos asignados según el fin de semana más cercano.
+
+    Los fines de semana se calculan con compute_duty_blocks (sin festivos,
+    así que cada bloque es un sábado-domingo) y se reparten con
+    assign_blocks; después cada festivo laborable del rango se asigna con
+    asignar_tecnico_festivo. A diferencia del modo de las GUI (auto_assign),
+    un festivo no alarga ni divide el bloque del fin de semana contiguo.
+
+    Args:
+        tecnicos: Técnicos en orden de rotación
+        festivos: Diccionario {fecha: anotacion}
+        start: Primer día del rango (incluido)
+        end: Último día del rango (incluido); un sábado final incluye su domingo
+        indice_inicial: Posición en la rotación del técnico del primer fin de semana
+
+    Returns:
+        tuple: ({sabado: tecnico}, {festivo: tecnico o SIN_ASIGNAR}); los
+        festivos sin fin de semana de referencia no aparecen
+    """
+    primer_sabado = encontrar_sabado_siguiente(start)
+    if not tecnicos or primer_sabado > end:
+        return {}, {}
+
+    ultimo_domingo = encontrar_sabado_anterior(end) + UN_DIA
+    bloques = compute_duty_blocks(primer_sabado, ultimo_domingo, {})
+    asignaciones = assign_blocks(bloques, tecnicos, indice_inicial=indice_inicial)
+
+    guardias_fin_semana = {}
+    indice_guardias = IndiceGuardias()
+    for bloque in bloques:
+        tecnico = asignaciones[bloque[0]]
+        guardias_fin_semana[bloque[0]] = tecnico
+        indice_guardias.agregar(bloque[0], bloque[-1], tecnico)
+
+    guardias_festivos = {}
+    for fecha in sorted(festivos):
+        if fecha < start or fecha > end or fecha.weekday() >= 5:
+            continue
+        tecnico = asignar_tecnico_festivo(fecha, guardias_fin_semana, indice_guardias, tecnicos)
+        if not tecnico:
+            continue
+        if tecnico != SIN_ASIGNAR:
+            indice_guardias.agregar(fecha, fecha, tecnico)
+        guardias_festivos[fecha] = tecnico
+
+    return guardias_fin_semana, guardias_festivos
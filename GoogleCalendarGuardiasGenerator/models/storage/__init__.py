@@ -0,0 +1,58 @@
+"""
+Storage package: Backends de persistencia para CalendarManager
+"""
+import os
+
+from .base import CorruptDataError, StatsCounter, StorageBackend, empty_month
+from .json_storage import JsonStorage
+from .sharded_storage import ShardedStorage
+from .sqlite_storage import SqliteStorage
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+
+def create_storage(data_file: str, **kwargs) -> StorageBackend:
+    """
+    Crea el backend adecuado según la extensión del archivo.
+    
+    Args:
+        data_file: Ruta al archivo de datos (.json, o .db/.sqlite/.sqlite3 para SQLite).
+            Una carpeta (ruta acabada en '/' o sin extensión) usa el almacén
+            particionado por meses
+        **kwargs: Opciones específicas del backend JSON o particionado
+        
+    Returns:
+        StorageBackend: Backend inicializado
+    """
+    if os.path.splitext(data_file)[1].lower() in SQLITE_EXTENSIONS:
+        return SqliteStorage(data_file)
+    if data_file.endswith(('/', os.sep)) or os.path.isdir(data_file) \
+            or not os.path.splitext(data_file)[1]:
+        return ShardedStorage(data_file, **kwargs)
+    return JsonStorage(data_file, **kwargs)
+
+
+def migrate_storage(origen: StorageBackend, destino: StorageBackend) -> int:
+    """
+    Copia todos los eventos y fuentes de un backend a otro.
+    
+    Returns:
+        int: Número de eventos copiados
+    """
+    copiados = 0
+    for fecha, evento in origen.iter_events():
+        if destino.add_event(fecha, dict(evento)):
+            copiados += 1
+    for fuente in origen.get_sources():
+        if not destino.has_source(fuente.get('hash')):
+            filas = origen.get_source_rows(fuente.get('hash'))
+            fuente = {clave: valor for clave, valor in fuente.items() if clave != 'filas'}
+            if filas is not None:
+                fuente['incremental'] = True
+            destino.add_source(fuente, filas=filas)
+    destino.save()
+    return copiados
+
+
+__all__ = ['StorageBackend', 'JsonStorage', 'ShardedStorage', 'SqliteStorage', 'create_storage',
+           'migrate_storage', 'empty_month', 'CorruptDataError', 'StatsCounter']
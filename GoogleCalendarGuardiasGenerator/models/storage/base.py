@@ -0,0 +1,154 @@
+"""
+Interfaz común de los backends de almacenamiento de CalendarManager
+"""
+
+from typing import Iterator, List, Optional, Tuple
+
+
+class CorruptDataError(Exception):
+    """El archivo de datos existe pero no se puede leer (ni ninguna de sus copias)"""
+
+
+def empty_month() -> dict:
+    """Estructura de un mes sin eventos"""
+    return {
+        'dias': {},
+        'estadisticas_mes': {
+            'total_eventos': 0,
+            'por_tipo': {}
+        }
+    }
+
+
+class StatsCounter:
+    """
+    Agregados globales (total de eventos y eventos por tipo) que los backends
+    mantienen en cada alta y baja, para que get_statistics() sea O(1).
+    """
+    
+    def __init__(self):
+        self.total_eventos = 0
+        self.por_tipo = {}
+        
+    def add(self, tipo: str, n: int = 1):
+        """Suma n eventos de un tipo"""
+        self.total_eventos += n
+        self.por_tipo[tipo] = self.por_tipo.get(tipo, 0) + n
+        
+    def remove(self, tipo: str, n: int = 1):
+        """Resta n eventos de un tipo"""
+        self.total_eventos -= n
+        restantes = self.por_tipo.get(tipo, 0) - n
+        if restantes > 0:
+            self.por_tipo[tipo] = restantes
+        else:
+            self.por_tipo.pop(tipo, None)
+            
+    def add_month_stats(self, estadisticas: dict):
+        """Suma las estadísticas de un mes ('por_tipo' de estadisticas_mes)"""
+        for tipo, count in estadisticas.get('por_tipo', {}).items():
+            self.add(tipo, count)
+            
+    def as_dict(self, total_meses: int) -> dict:
+        """Resultado de get_statistics() (copia, se puede modificar)"""
+        return {
+            'total_meses_con_datos': total_meses,
+            'total_eventos': self.total_eventos,
+            'eventos_por_tipo': dict(self.por_tipo)
+        }
+
+
+class StorageBackend:
+    """
+    Backend de almacenamiento de eventos y fuentes CSV.
+    
+    Las fechas se manejan como cadenas YYYY-MM-DD y los meses como YYYY-MM.
+    Los meses se devuelven con la estructura histórica del JSON:
+    {'dias': {'DD': {'eventos': [...], 'metricas': {}}}, 'estadisticas_mes': {...}}
+    """
+    
+    def get_month(self, year_month: str) -> Optional[dict]:
+        """Devuelve los datos de un mes o None si no tiene datos"""
+        raise NotImplementedError
+        
+    def get_day_events(self, fecha: str) -> List[dict]:
+        """Devuelve los eventos de un día (no modificar la lista devuelta)"""
+        raise NotImplementedError
+        
+    def get_primary_tecnico(self, fecha: str) -> Optional[str]:
+        """Técnico del primer evento del día (el que prevalece en conflictos)"""
+        eventos = self.get_day_events(fecha)
+        return eventos[0].get('tecnico') if eventos else None
+        
+    def add_event(self, fecha: str, evento: dict) -> bool:
+        """Añade un evento; devuelve False si ese día ya tenía un evento con el mismo id"""
+        raise NotImplementedError
+        
+    def remove_events(self, fecha: str) -> int:
+        """Elimina todos los eventos de un día; devuelve cuántos había"""
+        raise NotImplementedError
+        
+    def remove_event(self, fecha: str, event_id: str) -> bool:
+        """Elimina un evento concreto de un día; devuelve False si no existía"""
+        raise NotImplementedError
+        
+    def iter_events(self) -> Iterator[Tuple[str, dict]]:
+        """Recorre todos los eventos como pares (fecha, evento)"""
+        raise NotImplementedError
+        
+    def get_events_by_tecnico(self, tecnico: str, start: Optional[str] = None,
+                              end: Optional[str] = None) -> List[Tuple[str, dict]]:
+        """Eventos de un técnico, opcionalmente entre start y end (incluidos)"""
+        raise NotImplementedError
+        
+    def get_statistics(self) -> dict:
+        """Devuelve 'total_meses_con_datos', 'total_eventos' y 'eventos_por_tipo'"""
+        raise NotImplementedError
+        
+    def get_sources(self) -> List[dict]:
+        """Devuelve las fuentes CSV importadas"""
+        raise NotImplementedError
+        
+    def count_sources(self) -> int:
+        """Número de fuentes CSV importadas"""
+        return len(self.get_sources())
+        
+    def add_source(self, fuente: dict, filas: Optional[dict] = None):
+        """
+        Registra una fuente CSV importada.
+        
+        Args:
+            fuente: Registro de la fuente (nombre, ruta, hash, firma...)
+            filas: Huellas por fila para reimportaciones incrementales
+                ({huella: eventos de la fila}); se leen con get_source_rows
+        """
+        raise NotImplementedError
+        
+    def get_source_rows(self, file_hash: str) -> Optional[dict]:
+        """Huellas por fila de la fuente con ese hash, o None si no tiene"""
+        fuente = self.get_source(file_hash)
+        return fuente.get('filas') if fuente else None
+        
+    def remove_source(self, file_hash: str):
+        """Elimina del registro la fuente CSV con ese hash y sus huellas (p. ej. al sustituirla por una versión nueva)"""
+        raise NotImplementedError
+        
+    def has_source(self, file_hash: str) -> bool:
+        """Indica si ya se importó un CSV con ese hash"""
+        raise NotImplementedError
+        
+    def get_source(self, file_hash: str) -> Optional[dict]:
+        """Fuente CSV registrada con ese hash, o None"""
+        raise NotImplementedError
+        
+    def get_last_updated(self) -> Optional[str]:
+        """Fecha ISO de la última modificación persistida"""
+        raise NotImplementedError
+        
+    def save(self):
+        """Persiste los cambios pendientes"""
+        raise NotImplementedError
+        
+    def close(self):
+        """Persiste y libera recursos (llamar al salir)"""
+        raise NotImplementedError
@@ -0,0 +1,148 @@
+"""
+Formato compacto (columnar con cadenas internadas) del histórico JSON
+"""
+
+from typing import Dict, List
+
+from .base import empty_month
+
+FORMATO_COLUMNAR = "columnar-1"
+
+_AUSENTE = object()  # Marca de clave ausente al decodificar
+
+
+def is_columnar(payload: dict) -> bool:
+    """Indica si un JSON cargado usa el formato columnar"""
+    return payload.get('formato') == FORMATO_COLUMNAR
+
+
+def encode(data: dict) -> dict:
+    """
+    Convierte la estructura meses → días → eventos a un formato columnar.
+
+    Cada clave de evento se guarda una sola vez como columna. Las columnas de
+    texto se internan en una tabla común de cadenas (técnicos, tipos,
+    archivos de origen y fechas de importación se repiten mucho) y guardan
+    solo índices. Las estadísticas por mes no se guardan: se recalculan al
+    cargar.
+
+    Args:
+        data: Estructura en memoria de JsonStorage
+
+    Returns:
+        dict: Estructura serializable en formato columnar
+    """
+    cadenas: List[str] = []
+    indices: Dict[str, int] = {}
+
+    def internar(valor: str) -> int:
+        if valor not in indices:
+            indices[valor] = len(cadenas)
+            cadenas.append(valor)
+        return indices[valor]
+
+    dias = []  # [[fecha, número de eventos], ...] en orden de almacenamiento
+    metricas = {}
+    eventos = []
+    for year_month, month_data in data['meses'].items():
+        for day, day_data in month_data['dias'].items():
+            fecha = f"{year_month}-{day}"
+            dias.append([fecha, len(day_data['eventos'])])
+            if day_data.get('metricas'):
+                metricas[fecha] = day_data['metricas']
+            eventos.extend(day_data['eventos'])
+
+    claves = []
+    for evento in eventos:
+        for clave in evento:
+            if clave not in claves:
+                claves.append(clave)
+
+    columnas = {}
+    for clave in claves:
+        valores = [evento[clave] for evento in eventos if clave in evento]
+        if all(isinstance(v, str) for v in valores):
+            # Columna de texto: índices en la tabla de cadenas, -1 si falta
+            columnas[clave] = {'t': 's', 'v': [internar(e[clave]) if clave in e else -1
+                                               for e in eventos]}
+        else:
+            # Otros tipos: valores tal cual y lista de filas sin la clave
+            columnas[clave] = {'t': 'v', 'v': [e.get(clave) for e in eventos],
+                               'ausentes': [i for i, e in enumerate(eventos) if clave not in e]}
+
+    return {
+        'formato': FORMATO_COLUMNAR,
+        'version': data.get('version', '1.0'),
+        'last_updated': data.get('last_updated'),
+        'fuentes_csv': data['fuentes_csv'],
+        'meses': list(data['meses']),
+        'dias': dias,
+        'metricas': metricas,
+        'cadenas': cadenas,
+        'columnas': columnas
+    }
+
+
+def decode(payload: dict) -> dict:
+    """
+    Reconstruye la estructura meses → días → eventos desde el formato columnar.
+
+    Args:
+        payload: JSON cargado en formato columnar
+
+    Returns:
+        dict: Estructura en memoria de JsonStorage
+    """
+    cadenas = payload['cadenas']
+    num_eventos = sum(n for _, n in payload['dias'])
+
+    # Reconstruir columna a columna y montar cada evento con un único zip
+    nombres = list(payload['columnas'])
+    columnas = []
+    hay_ausentes = False
+    for columna in payload['columnas'].values():
+        if columna['t'] == 's':
+            valores = [cadenas[i] if i >= 0 else _AUSENTE for i in columna['v']]
+            hay_ausentes = hay_ausentes or -1 in columna['v']
+        else:
+            valores = list(columna['v'])
+            for i in columna['ausentes']:
+                valores[i] = _AUSENTE
+            hay_ausentes = hay_ausentes or bool(columna['ausentes'])
+        columnas.append(valores)
+
+    if not nombres:
+        eventos = [{} for _ in range(num_eventos)]
+    elif hay_ausentes:
+        eventos = [{k: v for k, v in zip(nombres, fila) if v is not _AUSENTE}
+                   for fila in zip(*columnas)]
+    else:
+        eventos = [dict(zip(nombres, fila)) for fila in zip(*columnas)]
+
+    meses = {year_month: empty_month() for year_month in payload['meses']}
+    metricas = payload.get('metricas', {})
+    posicion = 0
+    for fecha, n in payload['dias']:
+        month_data = meses.get(fecha[:7])
+        if month_data is None:
+            month_data = meses[fecha[:7]] = empty_month()
+        eventos_dia = eventos[posicion:posicion + n]
+        posicion += n
+        month_data['dias'][fecha[8:10]] = {
+            'eventos': eventos_dia,
+            'metricas': metricas.get(fecha, {})
+        }
+
+        estadisticas = month_data['estadisticas_mes']
+        estadisticas['total_eventos'] += n
+        por_tipo = estadisticas['por_tipo']
+        for evento in eventos_dia:
+            tipo = evento.get('tipo', 'otro')
+            por_tipo[tipo] = por_tipo.get(tipo, 0) + 1
+
+    return {
+        'version': payload.get('version', '1.0'),
+        'last_updated': payload.get('last_updated'),
+        'meses': meses,
+        'fuentes_csv': payload['fuentes_csv']
+    }
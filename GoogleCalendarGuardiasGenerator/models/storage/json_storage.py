@@ -0,0 +1,426 @@
+"""
+Backend JSON con diario de cambios de solo-añadir
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+import logging
+
+from utils.atomic_file import atomic_write, backup_paths
+from . import compact_format
+from .base import CorruptDataError, StatsCounter, StorageBackend, empty_month
+from .source_rows import SourceRowsFiles
+
+logger = logging.getLogger(__name__)
+
+
+class JsonStorage(StorageBackend):
+    """
+    Almacena todo el histórico en un único JSON (meses → días → eventos).
+    
+    Los cambios se guardan en un diario de solo-añadir (data_file + ".journal")
+    y se consolidan en el JSON principal cada `compact_every` entradas o al
+    llamar a close(). La consolidación es atómica (archivo temporal + fsync +
+    os.replace), así que un cierre inesperado nunca deja el JSON truncado.
+    
+    El archivo puede escribirse en el formato histórico (JSON indentado) o en
+    formato compacto: columnar con cadenas internadas y comprimido con gzip
+    (ver compact_format). La carga detecta el formato, de modo que abrir un
+    archivo histórico con compact=True lo migra en la siguiente consolidación.
+    
+    Las huellas por fila de cada fuente no van al JSON ni al diario: se
+    guardan en data_file + ".filas/<hash>.json" (ver SourceRowsFiles).
+    """
+    
+    def __init__(self, data_file: str, compact_every: int = 500, backups: int = 0,
+                 compact: Optional[bool] = None):
+        """
+        Args:
+            data_file: Ruta al archivo JSON de persistencia
+            compact_every: Entradas del diario a partir de las que se consolida
+            backups: Copias anteriores del JSON a conservar (data_file.1, ...)
+            compact: Guardar en formato compacto (por defecto, si data_file
+                termina en .gz)
+        """
+        self.data_file = data_file
+        self.journal_file = data_file + ".journal"
+        self.compact_every = compact_every
+        self.backups = backups
+        self.compact_format = data_file.endswith(".gz") if compact is None else compact
+        self._pending_ops = []  # Cambios aún no escritos en el diario
+        self._journal_entries = 0  # Entradas ya escritas en el diario
+        self._event_ids = set()  # {(fecha, id)} para detectar duplicados en O(1)
+        self._primary_tecnico = {}  # {fecha: técnico del primer evento del día}
+        self._stats = StatsCounter()  # Totales globales, sin recorrer los meses
+        self._sources_by_hash = {}  # {hash: fuente}, registro de importaciones en O(1)
+        self._rows = SourceRowsFiles(data_file + ".filas")
+        self._needs_compact = False  # Fuentes migradas que aún llevan las huellas en el JSON
+        self.data = self._load_data()
+        self._build_indexes()
+        self._replay_journal()
+        
+    def _load_data(self) -> dict:
+        """
+        Carga datos desde JSON o crea estructura inicial si no existe.
+        
+        Si el archivo está dañado se recurre a la copia de seguridad más
+        reciente que sea válida.
+        
+        Raises:
+            CorruptDataError: Si el archivo existe pero ni él ni sus copias
+            se pueden leer (nunca se sustituye en silencio por datos vacíos)
+        """
+        if not os.path.exists(self.data_file):
+            return self._get_empty_structure()
+        
+        errores = []
+        for ruta in [self.data_file] + backup_paths(self.data_file, self.backups):
+            if not os.path.exists(ruta):
+                continue
+            try:
+                data = self._read_file(ruta)
+                    
+                # Validar que tenga las claves necesarias
+                if 'meses' not in data or 'fuentes_csv' not in data:
+                    raise ValueError("estructura de datos incompleta")
+            except Exception as e:
+                logger.error(f"Error cargando {ruta}: {e}")
+                errores.append(f"{ruta}: {e}")
+                continue
+            
+            if ruta != self.data_file:
+                logger.warning(f"{self.data_file} dañado, se usa la copia de seguridad {ruta}")
+            return data
+        
+        raise CorruptDataError(f"No se pudo cargar {self.data_file} ni sus copias de seguridad: "
+                               + "; ".join(errores))
+            
+    @staticmethod
+    def _read_file(ruta: str) -> dict:
+        """Lee un archivo en cualquiera de los formatos (histórico o compacto)"""
+        with open(ruta, 'rb') as f:
+            comprimido = f.read(2) == b'\x1f\x8b'  # Cabecera gzip
+        abrir = gzip.open if comprimido else open
+        with abrir(ruta, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if compact_format.is_columnar(data):
+            data = compact_format.decode(data)
+        return data
+        
+    def _get_empty_structure(self) -> dict:
+        """Retorna estructura vacía de datos"""
+        return {
+            "version": "1.0",
+            "last_updated": datetime.now().isoformat(),
+            "meses": {},
+            "fuentes_csv": []
+        }
+        
+    def _build_indexes(self):
+        """Construye los índices en memoria a partir de self.data (una vez al cargar)"""
+        self._event_ids = set()
+        self._primary_tecnico = {}
+        self._stats = StatsCounter()
+        # Fuentes de versiones anteriores con las huellas dentro del registro
+        for num, fuente in enumerate(self.data['fuentes_csv']):
+            if 'filas' in fuente:
+                self.data['fuentes_csv'][num] = self._split_rows(fuente)
+                self._needs_compact = True
+        self._sources_by_hash = {f.get('hash'): f for f in self.data['fuentes_csv']}
+        # Archivos antiguos pueden tener días o meses vaciados: no cuentan como meses con datos
+        for year_month, month_data in list(self.data['meses'].items()):
+            for day in [d for d, datos in month_data['dias'].items() if not datos['eventos']]:
+                del month_data['dias'][day]
+            if not month_data['dias']:
+                del self.data['meses'][year_month]
+        for month_data in self.data['meses'].values():
+            self._stats.add_month_stats(month_data.get('estadisticas_mes', {}))
+        for fecha, eventos in self._iter_days():
+            if eventos:
+                self._primary_tecnico[fecha] = eventos[0].get('tecnico')
+            for evento in eventos:
+                self._event_ids.add((fecha, evento.get('id')))
+                
+    def _iter_days(self) -> Iterator[Tuple[str, List[dict]]]:
+        """Recorre los días como pares (fecha, eventos)"""
+        for year_month, month_data in self.data['meses'].items():
+            for day, day_data in month_data['dias'].items():
+                yield f"{year_month}-{day}", day_data['eventos']
+                
+    def _replay_journal(self):
+        """Aplica sobre self.data los cambios del diario pendientes de consolidar"""
+        if not os.path.exists(self.journal_file):
+            return
+            
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for num_linea, linea in enumerate(f, 1):
+                if not linea.strip():
+                    continue
+                try:
+                    op = json.loads(linea)
+                except ValueError:
+                    # Última línea cortada por un cierre inesperado
+                    logger.warning(f"Entrada inválida en {self.journal_file}:{num_linea}, se ignora")
+                    continue
+                self._apply_op(op)
+                self._journal_entries += 1
+                
+        # Los cambios recuperados pasan a ser del diario, no pendientes
+        self._pending_ops = []
+        
+    def _apply_op(self, op: dict):
+        """Aplica una entrada del diario"""
+        if op['op'] == 'add':
+            self.add_event(op['fecha'], op['evento'])
+        elif op['op'] == 'remove':
+            self.remove_events(op['fecha'])
+        elif op['op'] == 'remove_id':
+            self.remove_event(op['fecha'], op['id'])
+        elif op['op'] == 'source':
+            self.add_source(op['fuente'])
+        elif op['op'] == 'remove_source':
+            self.remove_source(op['hash'])
+        if 'ts' in op:
+            self.data['last_updated'] = op['ts']
+            
+    def _record(self, op: str, **campos):
+        """Registra un cambio para escribirlo en el diario en el próximo save()"""
+        self._pending_ops.append({'op': op, **campos})
+        
+    def get_month(self, year_month: str) -> Optional[dict]:
+        return self.data['meses'].get(year_month)
+        
+    def get_day_events(self, fecha: str) -> List[dict]:
+        month_data = self.data['meses'].get(fecha[:7])
+        if not month_data:
+            return []
+        day_data = month_data['dias'].get(fecha[8:10])
+        return day_data['eventos'] if day_data else []
+        
+    def get_primary_tecnico(self, fecha: str) -> Optional[str]:
+        return self._primary_tecnico.get(fecha)
+        
+    def add_event(self, fecha: str, evento: dict) -> bool:
+        # Verificar duplicados
+        clave = (fecha, evento.get('id'))
+        if clave in self._event_ids:
+            logger.debug(f"Evento duplicado evitado: {evento.get('titulo')}")
+            return False
+            
+        # Extraer año-mes
+        year_month = fecha[:7]  # "2026-02"
+        
+        # Crear estructura si no existe
+        if year_month not in self.data['meses']:
+            self.data['meses'][year_month] = empty_month()
+            
+        month_data = self.data['meses'][year_month]
+        
+        # Crear día si no existe
+        day = fecha[8:10]  # "15"
+        if day not in month_data['dias']:
+            month_data['dias'][day] = {
+                'eventos': [],
+                'metricas': {}
+            }
+            
+        # Agregar evento
+        eventos = month_data['dias'][day]['eventos']
+        if not eventos:
+            self._primary_tecnico[fecha] = evento.get('tecnico')
+        eventos.append(evento)
+        self._event_ids.add(clave)
+        self._record('add', fecha=fecha, evento=evento)
+        
+        # Actualizar estadísticas
+        month_data['estadisticas_mes']['total_eventos'] += 1
+        tipo = evento.get('tipo', 'otro')
+        month_data['estadisticas_mes']['por_tipo'][tipo] = \
+            month_data['estadisticas_mes']['por_tipo'].get(tipo, 0) + 1
+        self._stats.add(tipo)
+            
+        return True
+        
+    def remove_events(self, fecha: str) -> int:
+        month_data = self.data['meses'].get(fecha[:7])
+        if not month_data:
+            return 0
+            
+        day_data = month_data['dias'].get(fecha[8:10])
+        if not day_data or not day_data['eventos']:
+            return 0
+            
+        eventos = day_data['eventos']
+        day_data['eventos'] = []
+        self._prune(fecha)
+        self._primary_tecnico.pop(fecha, None)
+        for evento in eventos:
+            self._event_ids.discard((fecha, evento.get('id')))
+        self._record('remove', fecha=fecha)
+        
+        # Actualizar estadísticas
+        estadisticas = month_data['estadisticas_mes']
+        estadisticas['total_eventos'] -= len(eventos)
+        for evento in eventos:
+            tipo = evento.get('tipo', 'otro')
+            estadisticas['por_tipo'][tipo] = estadisticas['por_tipo'].get(tipo, 0) - 1
+            if estadisticas['por_tipo'][tipo] <= 0:
+                del estadisticas['por_tipo'][tipo]
+            self._stats.remove(tipo)
+                
+        return len(eventos)
+        
+    def remove_event(self, fecha: str, event_id: str) -> bool:
+        if (fecha, event_id) not in self._event_ids:
+            return False
+            
+        month_data = self.data['meses'][fecha[:7]]
+        eventos = month_data['dias'][fecha[8:10]]['eventos']
+        evento = next(e for e in eventos if e.get('id') == event_id)
+        eventos.remove(evento)
+        self._event_ids.discard((fecha, event_id))
+        if eventos:
+            self._primary_tecnico[fecha] = eventos[0].get('tecnico')
+        else:
+            self._primary_tecnico.pop(fecha, None)
+            self._prune(fecha)
+        self._record('remove_id', fecha=fecha, id=event_id)
+        
+        # Actualizar estadísticas
+        estadisticas = month_data['estadisticas_mes']
+        estadisticas['total_eventos'] -= 1
+        tipo = evento.get('tipo', 'otro')
+        estadisticas['por_tipo'][tipo] = estadisticas['por_tipo'].get(tipo, 0) - 1
+        if estadisticas['por_tipo'][tipo] <= 0:
+            del estadisticas['por_tipo'][tipo]
+        self._stats.remove(tipo)
+        return True
+        
+    def _prune(self, fecha: str):
+        """Elimina el día y, si se queda vacío, el mes (los meses guardados siempre tienen eventos)"""
+        month_data = self.data['meses'][fecha[:7]]
+        month_data['dias'].pop(fecha[8:10], None)
+        if not month_data['dias']:
+            del self.data['meses'][fecha[:7]]
+            
+    def iter_events(self) -> Iterator[Tuple[str, dict]]:
+        for fecha, eventos in self._iter_days():
+            for evento in eventos:
+                yield fecha, evento
+                    
+    def get_events_by_tecnico(self, tecnico: str, start: Optional[str] = None,
+                              end: Optional[str] = None) -> List[Tuple[str, dict]]:
+        eventos = []
+        for fecha, evento in self.iter_events():
+            if evento.get('tecnico') != tecnico:
+                continue
+            if (start and fecha < start) or (end and fecha > end):
+                continue
+            eventos.append((fecha, evento))
+        eventos.sort(key=lambda e: e[0])
+        return eventos
+        
+    def get_statistics(self) -> dict:
+        return self._stats.as_dict(len(self.data['meses']))
+        
+    def get_sources(self) -> List[dict]:
+        return self.data['fuentes_csv']
+        
+    def _split_rows(self, fuente: dict, filas: Optional[dict] = None) -> dict:
+        """Saca las huellas de un registro de fuente de versiones anteriores"""
+        fuente = dict(fuente)
+        anteriores = fuente.pop('filas', None)
+        if anteriores is not None:
+            fuente['incremental'] = True
+            if filas is None:
+                self._rows.put(fuente.get('hash'), anteriores)
+        return fuente
+        
+    def add_source(self, fuente: dict, filas: Optional[dict] = None):
+        if 'filas' in fuente:  # Entrada del diario de versiones anteriores
+            fuente = self._split_rows(fuente, filas)
+            self._needs_compact = True
+        if filas is not None:
+            self._rows.put(fuente.get('hash'), filas)
+        self.data['fuentes_csv'].append(fuente)
+        self._sources_by_hash[fuente.get('hash')] = fuente
+        self._record('source', fuente=fuente)
+        
+    def get_source_rows(self, file_hash: str) -> Optional[dict]:
+        return self._rows.get(file_hash) if file_hash in self._sources_by_hash else None
+        
+    def remove_source(self, file_hash: str):
+        if self._sources_by_hash.pop(file_hash, None) is None:
+            return
+        self.data['fuentes_csv'] = [f for f in self.data['fuentes_csv'] if f.get('hash') != file_hash]
+        self._rows.delete(file_hash)
+        self._record('remove_source', hash=file_hash)
+        
+    def has_source(self, file_hash: str) -> bool:
+        return file_hash in self._sources_by_hash
+        
+    def get_source(self, file_hash: str) -> Optional[dict]:
+        return self._sources_by_hash.get(file_hash)
+        
+    def get_last_updated(self) -> Optional[str]:
+        return self.data.get('last_updated')
+        
+    def save(self):
+        """
+        Persiste los cambios pendientes.
+        
+        Solo añade los cambios al diario, así que su coste no depende del
+        tamaño del histórico. El JSON completo se reescribe cuando todavía no
+        existe o cuando el diario alcanza `compact_every` entradas.
+        """
+        self.data["last_updated"] = datetime.now().isoformat()
+        # Las huellas se escriben antes que las fuentes que las referencian
+        self._rows.flush()
+        
+        if not os.path.exists(self.data_file) or self._needs_compact or \
+                self._journal_entries + len(self._pending_ops) >= self.compact_every:
+            self.compact()
+            return
+            
+        if not self._pending_ops:
+            return
+            
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            for op in self._pending_ops:
+                op['ts'] = self.data["last_updated"]
+                f.write(json.dumps(op, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+                
+        self._journal_entries += len(self._pending_ops)
+        self._pending_ops = []
+        logger.debug(f"Cambios añadidos a {self.journal_file}")
+        
+    def compact(self):
+        """Reescribe el JSON completo de forma atómica y vacía el diario"""
+        self._rows.flush()
+        if self.compact_format:
+            contenido = json.dumps(compact_format.encode(self.data), ensure_ascii=False,
+                                   separators=(',', ':')).encode('utf-8')
+            with atomic_write(self.data_file, mode='wb', backups=self.backups) as f:
+                with gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as gz:
+                    gz.write(contenido)
+        else:
+            with atomic_write(self.data_file, backups=self.backups) as f:
+                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self._journal_entries = 0
+        self._pending_ops = []
+        self._needs_compact = False
+            
+        logger.info(f"Datos guardados en {self.data_file}")
+        
+    def close(self):
+        """Consolida el diario en el JSON principal"""
+        if self._pending_ops or self._journal_entries or self._needs_compact:
+            self.compact()
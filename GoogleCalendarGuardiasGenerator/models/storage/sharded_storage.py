@@ -0,0 +1,343 @@
+"""
+Backend JSON particionado por meses con carga bajo demanda
+"""
+
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+import logging
+
+from utils.atomic_file import atomic_write
+from .base import CorruptDataError, StatsCounter, StorageBackend, empty_month
+from .source_rows import SourceRowsFiles
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+FUENTES = "fuentes.json"
+FILAS = "filas"
+
+
+class ShardedStorage(StorageBackend):
+    """
+    Guarda cada mes en su propio archivo (YYYY-MM.json) más un manifiesto.
+
+    El manifiesto solo contiene las estadísticas de cada mes y los hashes de
+    las fuentes CSV, así que al arrancar solo se lee ese archivo. Los meses se
+    cargan al primer acceso y se mantienen en una caché LRU de `cache_size`
+    meses; save() solo reescribe los meses modificados. Los registros de las
+    fuentes (fuentes.json) y sus huellas por fila (filas/<hash>.json) se
+    leen solo al importar. El arranque y la memoria no dependen de los años
+    de histórico ni del número de importaciones.
+    """
+
+    def __init__(self, directory: str, cache_size: int = 24):
+        """
+        Args:
+            directory: Carpeta del almacén (se crea si no existe)
+            cache_size: Meses que se mantienen en memoria como máximo
+        """
+        self.directory = directory
+        self.cache_size = max(1, cache_size)
+        self._cache = OrderedDict()  # {YYYY-MM: datos del mes}, el más reciente al final
+        self._dirty_months = set()
+        self._deleted_months = set()  # Meses vaciados cuyo archivo se borra en save()
+        self._manifest_dirty = False
+        self._sources = None  # Registros de fuentes.json, cargados al primer uso
+        self._sources_by_hash = {}
+        self._sources_dirty = False
+        self._rows = SourceRowsFiles(os.path.join(directory, FILAS))
+        self.manifest = self._load_manifest()
+        self._source_hashes = set(self.manifest['fuentes'])
+        self._stats = StatsCounter()
+        for estadisticas in self.manifest['meses'].values():
+            self._stats.add_month_stats(estadisticas)
+
+    def _month_file(self, year_month: str) -> str:
+        return os.path.join(self.directory, f"{year_month}.json")
+
+    def _load_manifest(self) -> dict:
+        """Carga el manifiesto o crea uno vacío"""
+        ruta = os.path.join(self.directory, MANIFEST)
+        if not os.path.exists(ruta):
+            return {
+                "version": "2.0",
+                "last_updated": datetime.now().isoformat(),
+                "meses": {},  # {YYYY-MM: estadisticas_mes}
+                "fuentes": []  # Hashes de las fuentes CSV importadas
+            }
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            raise CorruptDataError(f"No se pudo cargar {ruta}: {e}")
+        if 'fuentes_csv' in manifest:
+            self._migrate_sources(manifest)
+        return manifest
+
+    def _migrate_sources(self, manifest: dict):
+        """Saca del manifiesto de la versión 1.0 los registros de fuentes y sus huellas"""
+        self._sources = manifest.pop('fuentes_csv')
+        for fuente in self._sources:
+            filas = fuente.pop('filas', None)
+            if filas is not None:
+                fuente['incremental'] = True
+                self._rows.put(fuente.get('hash'), filas)
+        self._sources_by_hash = {f.get('hash'): f for f in self._sources}
+        manifest['fuentes'] = [f.get('hash') for f in self._sources]
+        manifest['version'] = "2.0"
+        self._sources_dirty = True
+        self._manifest_dirty = True
+
+    def _load_sources(self) -> List[dict]:
+        """Registros de las fuentes CSV (se leen de disco la primera vez)"""
+        if self._sources is None:
+            ruta = os.path.join(self.directory, FUENTES)
+            self._sources = []
+            if os.path.exists(ruta):
+                try:
+                    with open(ruta, 'r', encoding='utf-8') as f:
+                        self._sources = json.load(f)
+                except Exception as e:
+                    raise CorruptDataError(f"No se pudo cargar {ruta}: {e}")
+            self._sources_by_hash = {f.get('hash'): f for f in self._sources}
+        return self._sources
+
+    def _load_month(self, year_month: str, crear: bool = False) -> Optional[dict]:
+        """
+        Devuelve un mes desde la caché o desde disco.
+
+        Args:
+            year_month: Mes YYYY-MM
+            crear: Crear el mes vacío si no existe
+        """
+        month_data = self._cache.get(year_month)
+        if month_data is not None:
+            self._cache.move_to_end(year_month)
+            return month_data
+
+        if year_month in self.manifest['meses']:
+            ruta = self._month_file(year_month)
+            try:
+                with open(ruta, 'r', encoding='utf-8') as f:
+                    month_data = json.load(f)
+            except Exception as e:
+                raise CorruptDataError(f"No se pudo cargar {ruta}: {e}")
+        elif crear:
+            month_data = empty_month()
+            self._deleted_months.discard(year_month)
+            self.manifest['meses'][year_month] = month_data['estadisticas_mes']
+            self._dirty_months.add(year_month)
+            self._manifest_dirty = True
+        else:
+            return None
+
+        # Las estadísticas del manifiesto y las del mes son el mismo objeto
+        self.manifest['meses'][year_month] = month_data['estadisticas_mes']
+        self._cache[year_month] = month_data
+        self._evict()
+        return month_data
+
+    def _evict(self):
+        """Libera los meses menos usados, escribiendo antes los modificados"""
+        while len(self._cache) > self.cache_size:
+            year_month, month_data = self._cache.popitem(last=False)
+            if year_month in self._dirty_months:
+                self._write_month(year_month, month_data)
+                self._dirty_months.discard(year_month)
+
+    def _write_month(self, year_month: str, month_data: dict):
+        with atomic_write(self._month_file(year_month)) as f:
+            json.dump(month_data, f, ensure_ascii=False, separators=(',', ':'))
+
+    def _mark_dirty(self, year_month: str):
+        self._dirty_months.add(year_month)
+        self._manifest_dirty = True
+
+    def _prune(self, fecha: str):
+        """Elimina el día vacío y, si el mes se queda sin días, el mes entero"""
+        year_month = fecha[:7]
+        month_data = self._cache[year_month]
+        month_data['dias'].pop(fecha[8:10], None)
+        if month_data['dias']:
+            self._mark_dirty(year_month)
+            return
+        del self._cache[year_month]
+        del self.manifest['meses'][year_month]
+        self._dirty_months.discard(year_month)
+        self._deleted_months.add(year_month)
+        self._manifest_dirty = True
+
+    def get_month(self, year_month: str) -> Optional[dict]:
+        return self._load_month(year_month)
+
+    def get_day_events(self, fecha: str) -> List[dict]:
+        month_data = self._load_month(fecha[:7])
+        if not month_data:
+            return []
+        day_data = month_data['dias'].get(fecha[8:10])
+        return day_data['eventos'] if day_data else []
+
+    def add_event(self, fecha: str, evento: dict) -> bool:
+        month_data = self._load_month(fecha[:7], crear=True)
+        day_data = month_data['dias'].setdefault(fecha[8:10], {'eventos': [], 'metricas': {}})
+
+        # Verificar duplicados (solo dentro del día)
+        id_evento = evento.get('id')
+        if any(e.get('id') == id_evento for e in day_data['eventos']):
+            logger.debug(f"Evento duplicado evitado: {evento.get('titulo')}")
+            return False
+
+        day_data['eventos'].append(evento)
+        estadisticas = month_data['estadisticas_mes']
+        estadisticas['total_eventos'] += 1
+        tipo = evento.get('tipo', 'otro')
+        estadisticas['por_tipo'][tipo] = estadisticas['por_tipo'].get(tipo, 0) + 1
+        self._stats.add(tipo)
+        self._mark_dirty(fecha[:7])
+        return True
+
+    def remove_events(self, fecha: str) -> int:
+        month_data = self._load_month(fecha[:7])
+        if not month_data:
+            return 0
+        day_data = month_data['dias'].get(fecha[8:10])
+        if not day_data or not day_data['eventos']:
+            return 0
+
+        eventos = day_data['eventos']
+        day_data['eventos'] = []
+        estadisticas = month_data['estadisticas_mes']
+        estadisticas['total_eventos'] -= len(eventos)
+        for evento in eventos:
+            tipo = evento.get('tipo', 'otro')
+            estadisticas['por_tipo'][tipo] = estadisticas['por_tipo'].get(tipo, 0) - 1
+            if estadisticas['por_tipo'][tipo] <= 0:
+                del estadisticas['por_tipo'][tipo]
+            self._stats.remove(tipo)
+        self._prune(fecha)
+        return len(eventos)
+
+    def remove_event(self, fecha: str, event_id: str) -> bool:
+        month_data = self._load_month(fecha[:7])
+        day_data = month_data['dias'].get(fecha[8:10]) if month_data else None
+        if not day_data:
+            return False
+        evento = next((e for e in day_data['eventos'] if e.get('id') == event_id), None)
+        if evento is None:
+            return False
+
+        day_data['eventos'].remove(evento)
+        estadisticas = month_data['estadisticas_mes']
+        estadisticas['total_eventos'] -= 1
+        tipo = evento.get('tipo', 'otro')
+        estadisticas['por_tipo'][tipo] = estadisticas['por_tipo'].get(tipo, 0) - 1
+        if estadisticas['por_tipo'][tipo] <= 0:
+            del estadisticas['por_tipo'][tipo]
+        self._stats.remove(tipo)
+        if day_data['eventos']:
+            self._mark_dirty(fecha[:7])
+        else:
+            self._prune(fecha)
+        return True
+
+    def iter_events(self) -> Iterator[Tuple[str, dict]]:
+        # Recorrido completo: los meses pasan por la caché de uno en uno
+        for year_month in sorted(self.manifest['meses']):
+            month_data = self._load_month(year_month)
+            for day in sorted(month_data['dias']):
+                for evento in list(month_data['dias'][day]['eventos']):
+                    yield f"{year_month}-{day}", evento
+
+    def get_events_by_tecnico(self, tecnico: str, start: Optional[str] = None,
+                              end: Optional[str] = None) -> List[Tuple[str, dict]]:
+        eventos = []
+        for year_month in sorted(self.manifest['meses']):
+            # Saltar meses fuera del rango sin cargarlos
+            if (start and year_month < start[:7]) or (end and year_month > end[:7]):
+                continue
+            month_data = self._load_month(year_month)
+            for day in sorted(month_data['dias']):
+                fecha = f"{year_month}-{day}"
+                if (start and fecha < start) or (end and fecha > end):
+                    continue
+                for evento in month_data['dias'][day]['eventos']:
+                    if evento.get('tecnico') == tecnico:
+                        eventos.append((fecha, evento))
+        return eventos
+
+    def get_statistics(self) -> dict:
+        return self._stats.as_dict(len(self.manifest['meses']))
+
+    def get_sources(self) -> List[dict]:
+        return self._load_sources()
+
+    def count_sources(self) -> int:
+        return len(self.manifest['fuentes'])
+
+    def add_source(self, fuente: dict, filas: Optional[dict] = None):
+        self._load_sources().append(fuente)
+        self._sources_by_hash[fuente.get('hash')] = fuente
+        self._source_hashes.add(fuente.get('hash'))
+        self.manifest['fuentes'].append(fuente.get('hash'))
+        if filas is not None:
+            self._rows.put(fuente.get('hash'), filas)
+        self._sources_dirty = True
+        self._manifest_dirty = True
+
+    def get_source_rows(self, file_hash: str) -> Optional[dict]:
+        return self._rows.get(file_hash) if file_hash in self._source_hashes else None
+
+    def remove_source(self, file_hash: str):
+        if file_hash not in self._source_hashes:
+            return
+        self._sources = [f for f in self._load_sources() if f.get('hash') != file_hash]
+        self._sources_by_hash.pop(file_hash, None)
+        self._source_hashes.discard(file_hash)
+        self.manifest['fuentes'] = [h for h in self.manifest['fuentes'] if h != file_hash]
+        self._rows.delete(file_hash)
+        self._sources_dirty = True
+        self._manifest_dirty = True
+
+    def has_source(self, file_hash: str) -> bool:
+        return file_hash in self._source_hashes
+
+    def get_source(self, file_hash: str) -> Optional[dict]:
+        if file_hash not in self._source_hashes:
+            return None
+        self._load_sources()
+        return self._sources_by_hash.get(file_hash)
+
+    def get_last_updated(self) -> Optional[str]:
+        return self.manifest.get('last_updated')
+
+    def save(self):
+        """Escribe las huellas y los meses modificados y, después, las fuentes y el manifiesto"""
+        if not self._manifest_dirty and not self._dirty_months and not self._sources_dirty:
+            return
+        self._rows.flush()
+        for year_month in sorted(self._dirty_months):
+            if year_month in self._cache:
+                self._write_month(year_month, self._cache[year_month])
+        self._dirty_months.clear()
+        for year_month in self._deleted_months:
+            if os.path.exists(self._month_file(year_month)):
+                os.remove(self._month_file(year_month))
+        self._deleted_months.clear()
+
+        if self._sources_dirty:
+            with atomic_write(os.path.join(self.directory, FUENTES)) as f:
+                json.dump(self._sources, f, ensure_ascii=False, separators=(',', ':'))
+            self._sources_dirty = False
+
+        self.manifest['last_updated'] = datetime.now().isoformat()
+        with atomic_write(os.path.join(self.directory, MANIFEST)) as f:
+            json.dump(self.manifest, f, ensure_ascii=False, separators=(',', ':'))
+        self._manifest_dirty = False
+        logger.info(f"Datos guardados en {self.directory}")
+
+    def close(self):
+        self.save()
+        self._cache.clear()
@@ -0,0 +1,70 @@
+"""
+Huellas por fila de las fuentes CSV, en un archivo por fuente
+"""
+
+import json
+import os
+from typing import Dict, Optional
+
+from utils.atomic_file import atomic_write
+from .base import CorruptDataError
+
+
+class SourceRowsFiles:
+    """
+    Guarda las huellas por fila de cada fuente en <directory>/<hash>.json.
+
+    Solo se necesitan al reimportar una versión nueva de la misma fuente,
+    así que no forman parte del archivo principal ni del diario: se leen
+    bajo demanda y los cambios se escriben en flush(). Los backends llaman a
+    flush() al principio de save(), antes de registrar las fuentes, para que
+    una fuente registrada nunca apunte a huellas que aún no están en disco.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Carpeta de los archivos de huellas (se crea al escribir)
+        """
+        self.directory = directory
+        self._pending: Dict[str, dict] = {}  # {hash: huellas} pendientes de escribir
+        self._deleted = set()  # Hashes cuyos archivos se borran en flush()
+
+    def _path(self, file_hash: str) -> str:
+        return os.path.join(self.directory, f"{file_hash}.json")
+
+    def get(self, file_hash: str) -> Optional[dict]:
+        """Huellas de una fuente, o None si no tiene"""
+        if file_hash in self._pending:
+            return self._pending[file_hash]
+        ruta = self._path(file_hash)
+        if file_hash in self._deleted or not os.path.exists(ruta):
+            return None
+        try:
+            with open(ruta, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            raise CorruptDataError(f"No se pudo cargar {ruta}: {e}")
+
+    def put(self, file_hash: str, filas: dict):
+        """Programa la escritura de las huellas de una fuente"""
+        self._pending[file_hash] = filas
+        self._deleted.discard(file_hash)
+
+    def delete(self, file_hash: str):
+        """Programa el borrado de las huellas de una fuente"""
+        self._pending.pop(file_hash, None)
+        self._deleted.add(file_hash)
+
+    def flush(self):
+        """Escribe las huellas pendientes y borra las eliminadas"""
+        if self._pending:
+            os.makedirs(self.directory, exist_ok=True)
+        for file_hash, filas in self._pending.items():
+            with atomic_write(self._path(file_hash)) as f:
+                json.dump(filas, f, ensure_ascii=False, separators=(',', ':'))
+        for file_hash in self._deleted:
+            if os.path.exists(self._path(file_hash)):
+                os.remove(self._path(file_hash))
+        self._pending = {}
+        self._deleted = set()
@@ -0,0 +1,244 @@
+"""
+Backend SQLite con índices por fecha, técnico, tipo y archivo de origen
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+import logging
+
+from .base import StatsCounter, StorageBackend, empty_month
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS eventos (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha TEXT NOT NULL,
+    id TEXT,
+    tecnico TEXT,
+    tipo TEXT NOT NULL,
+    archivo_origen TEXT,
+    datos TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_eventos_fecha_id ON eventos (fecha, id);
+CREATE INDEX IF NOT EXISTS idx_eventos_tecnico ON eventos (tecnico, fecha);
+CREATE INDEX IF NOT EXISTS idx_eventos_tipo ON eventos (tipo);
+CREATE INDEX IF NOT EXISTS idx_eventos_archivo ON eventos (archivo_origen);
+
+CREATE TABLE IF NOT EXISTS fuentes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    hash TEXT,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fuentes_hash ON fuentes (hash);
+
+CREATE TABLE IF NOT EXISTS filas_fuente (
+    hash TEXT PRIMARY KEY,
+    datos TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+
+class SqliteStorage(StorageBackend):
+    """
+    Almacena los eventos en una base de datos SQLite.
+
+    Al arrancar solo se abre la conexión: las consultas de mes, día o técnico
+    usan índices y su coste depende del resultado, no del tamaño del
+    histórico. Los cambios se confirman en una transacción al llamar a save().
+    """
+
+    def __init__(self, db_file: str):
+        """
+        Args:
+            db_file: Ruta al archivo de base de datos SQLite
+        """
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+        # El acceso desde varios hilos lo serializa CalendarManager.lock
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._migrate_source_rows()
+        self._load_stats()
+
+    def _load_stats(self):
+        """Calcula una vez los totales globales; después se mantienen en cada cambio"""
+        self._stats = StatsCounter()
+        for tipo, count in self.conn.execute("SELECT tipo, COUNT(*) FROM eventos GROUP BY tipo"):
+            self._stats.add(tipo, count)
+        # {YYYY-MM: eventos}, para contar los meses con datos sin consultar
+        self._eventos_por_mes = dict(self.conn.execute(
+            "SELECT substr(fecha, 1, 7), COUNT(*) FROM eventos GROUP BY substr(fecha, 1, 7)"
+        ).fetchall())
+
+    def _migrate_source_rows(self):
+        """Pasa a filas_fuente las huellas guardadas dentro del registro de la fuente"""
+        antiguas = self.conn.execute(
+            "SELECT seq, datos FROM fuentes WHERE datos LIKE '%\"filas\":%'").fetchall()
+        for seq, datos in antiguas:
+            fuente = json.loads(datos)
+            filas = fuente.pop('filas', None)
+            if filas is None:
+                continue
+            fuente['incremental'] = True
+            self.conn.execute("UPDATE fuentes SET datos = ? WHERE seq = ?",
+                              (json.dumps(fuente, ensure_ascii=False), seq))
+            self.conn.execute("INSERT OR REPLACE INTO filas_fuente (hash, datos) VALUES (?, ?)",
+                              (fuente.get('hash'), json.dumps(filas, ensure_ascii=False, separators=(',', ':'))))
+        if antiguas:
+            self.conn.commit()
+
+    def _rows_to_month(self, rows) -> dict:
+        """Construye la estructura de mes a partir de filas (fecha, datos)"""
+        month_data = empty_month()
+        estadisticas = month_data['estadisticas_mes']
+        for fecha, datos in rows:
+            evento = json.loads(datos)
+            day_data = month_data['dias'].setdefault(fecha[8:10], {'eventos': [], 'metricas': {}})
+            day_data['eventos'].append(evento)
+            estadisticas['total_eventos'] += 1
+            tipo = evento.get('tipo', 'otro')
+            estadisticas['por_tipo'][tipo] = estadisticas['por_tipo'].get(tipo, 0) + 1
+        return month_data
+
+    def get_month(self, year_month: str) -> Optional[dict]:
+        rows = self.conn.execute(
+            "SELECT fecha, datos FROM eventos WHERE fecha BETWEEN ? AND ? ORDER BY fecha, seq",
+            (f"{year_month}-01", f"{year_month}-31")
+        ).fetchall()
+        return self._rows_to_month(rows) if rows else None
+
+    def get_day_events(self, fecha: str) -> List[dict]:
+        rows = self.conn.execute(
+            "SELECT datos FROM eventos WHERE fecha = ? ORDER BY seq", (fecha,)
+        ).fetchall()
+        return [json.loads(datos) for (datos,) in rows]
+
+    def get_primary_tecnico(self, fecha: str) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT tecnico FROM eventos WHERE fecha = ? ORDER BY seq LIMIT 1", (fecha,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def add_event(self, fecha: str, evento: dict) -> bool:
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO eventos (fecha, id, tecnico, tipo, archivo_origen, datos) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (fecha, evento.get('id'), evento.get('tecnico'), evento.get('tipo', 'otro'),
+             evento.get('archivo_origen'), json.dumps(evento, ensure_ascii=False))
+        )
+        if cursor.rowcount == 0:
+            logger.debug(f"Evento duplicado evitado: {evento.get('titulo')}")
+            return False
+        self._stats.add(evento.get('tipo', 'otro'))
+        self._eventos_por_mes[fecha[:7]] = self._eventos_por_mes.get(fecha[:7], 0) + 1
+        return True
+
+    def remove_events(self, fecha: str) -> int:
+        tipos = self.conn.execute(
+            "SELECT tipo, COUNT(*) FROM eventos WHERE fecha = ? GROUP BY tipo", (fecha,)
+        ).fetchall()
+        cursor = self.conn.execute("DELETE FROM eventos WHERE fecha = ?", (fecha,))
+        for tipo, count in tipos:
+            self._stats.remove(tipo, count)
+        if cursor.rowcount:
+            restantes = self._eventos_por_mes.get(fecha[:7], 0) - cursor.rowcount
+            if restantes > 0:
+                self._eventos_por_mes[fecha[:7]] = restantes
+            else:
+                self._eventos_por_mes.pop(fecha[:7], None)
+        return cursor.rowcount
+
+    def remove_event(self, fecha: str, event_id: str) -> bool:
+        row = self.conn.execute(
+            "SELECT tipo FROM eventos WHERE fecha = ? AND id = ?", (fecha, event_id)
+        ).fetchone()
+        if row is None:
+            return False
+        self.conn.execute("DELETE FROM eventos WHERE fecha = ? AND id = ?", (fecha, event_id))
+        self._stats.remove(row[0])
+        restantes = self._eventos_por_mes.get(fecha[:7], 0) - 1
+        if restantes > 0:
+            self._eventos_por_mes[fecha[:7]] = restantes
+        else:
+            self._eventos_por_mes.pop(fecha[:7], None)
+        return True
+
+    def iter_events(self) -> Iterator[Tuple[str, dict]]:
+        cursor = self.conn.execute("SELECT fecha, datos FROM eventos ORDER BY fecha, seq")
+        for fecha, datos in cursor:
+            yield fecha, json.loads(datos)
+
+    def get_events_by_tecnico(self, tecnico: str, start: Optional[str] = None,
+                              end: Optional[str] = None) -> List[Tuple[str, dict]]:
+        rows = self.conn.execute(
+            "SELECT fecha, datos FROM eventos WHERE tecnico = ? AND fecha BETWEEN ? AND ? "
+            "ORDER BY fecha, seq",
+            (tecnico, start or "0000-00-00", end or "9999-99-99")
+        ).fetchall()
+        return [(fecha, json.loads(datos)) for fecha, datos in rows]
+
+    def get_statistics(self) -> dict:
+        return self._stats.as_dict(len(self._eventos_por_mes))
+
+    def get_sources(self) -> List[dict]:
+        rows = self.conn.execute("SELECT datos FROM fuentes ORDER BY seq").fetchall()
+        return [json.loads(datos) for (datos,) in rows]
+
+    def count_sources(self) -> int:
+        (total,) = self.conn.execute("SELECT COUNT(*) FROM fuentes").fetchone()
+        return total
+
+    def add_source(self, fuente: dict, filas: Optional[dict] = None):
+        self.conn.execute(
+            "INSERT INTO fuentes (hash, datos) VALUES (?, ?)",
+            (fuente.get('hash'), json.dumps(fuente, ensure_ascii=False))
+        )
+        if filas is not None:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO filas_fuente (hash, datos) VALUES (?, ?)",
+                (fuente.get('hash'), json.dumps(filas, ensure_ascii=False, separators=(',', ':')))
+            )
+
+    def get_source_rows(self, file_hash: str) -> Optional[dict]:
+        row = self.conn.execute("SELECT datos FROM filas_fuente WHERE hash = ?", (file_hash,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def remove_source(self, file_hash: str):
+        self.conn.execute("DELETE FROM fuentes WHERE hash = ?", (file_hash,))
+        self.conn.execute("DELETE FROM filas_fuente WHERE hash = ?", (file_hash,))
+
+    def has_source(self, file_hash: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM fuentes WHERE hash = ? LIMIT 1", (file_hash,)).fetchone()
+        return row is not None
+
+    def get_source(self, file_hash: str) -> Optional[dict]:
+        row = self.conn.execute(
+            "SELECT datos FROM fuentes WHERE hash = ? ORDER BY seq LIMIT 1", (file_hash,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_last_updated(self) -> Optional[str]:
+        row = self.conn.execute("SELECT valor FROM meta WHERE clave = 'last_updated'").fetchone()
+        return row[0] if row else None
+
+    def save(self):
+        """Confirma la transacción en curso"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO meta (clave, valor) VALUES ('last_updated', ?)",
+            (datetime.now().isoformat(),)
+        )
+        self.conn.commit()
+        logger.info(f"Datos guardados en {self.db_file}")
+
+    def close(self):
+        self.save()
+        self.conn.close()
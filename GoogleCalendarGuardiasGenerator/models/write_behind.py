@@ -0,0 +1,103 @@
+"""
+Persistencia diferida (write-behind) con agrupación de cambios
+"""
+
+import threading
+import time
+from typing import Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindSaver:
+    """
+    Ejecuta una función de guardado en un hilo en segundo plano cuando pasa
+    `delay` segundos sin nuevos cambios.
+
+    Una ráfaga de ediciones (p. ej. varias asignaciones seguidas con
+    drag-and-drop) se persiste con un único guardado. flush() y stop()
+    permiten forzar el guardado pendiente, por ejemplo al cerrar.
+    """
+
+    def __init__(self, save_fn: Callable[[], None], delay: float = 1.0):
+        """
+        Args:
+            save_fn: Función que persiste los cambios
+            delay: Segundos sin cambios antes de guardar
+        """
+        self.save_fn = save_fn
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._dirty = False
+        self._deadline = 0.0
+        self._stopping = False
+        self._thread = None
+
+    def mark_dirty(self):
+        """Registra un cambio y reprograma el guardado"""
+        with self._cond:
+            self._dirty = True
+            self._deadline = time.monotonic() + self.delay
+            if self._thread is None and not self._stopping:
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    @property
+    def pending(self) -> bool:
+        """Indica si hay cambios sin guardar"""
+        with self._cond:
+            return self._dirty
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    if self._dirty:
+                        espera = self._deadline - time.monotonic()
+                        if espera <= 0:
+                            break
+                        self._cond.wait(espera)
+                    else:
+                        self._cond.wait()
+                self._dirty = False
+            self._save()
+
+    def _save(self):
+        """Guardado en segundo plano; si falla, se reintenta tras `delay`"""
+        try:
+            self.save_fn()
+        except Exception as e:
+            logger.error(f"Error en el guardado diferido: {e}")
+            self.mark_dirty()
+
+    def flush(self):
+        """
+        Guarda ya los cambios pendientes, si los hay.
+
+        A diferencia del guardado en segundo plano, los errores se propagan
+        (y el cambio sigue pendiente).
+        """
+        with self._cond:
+            pendiente = self._dirty
+            self._dirty = False
+        if pendiente:
+            try:
+                self.save_fn()
+            except Exception:
+                with self._cond:
+                    self._dirty = True
+                raise
+
+    def stop(self):
+        """Detiene el hilo y guarda lo pendiente (llamar al salir)"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
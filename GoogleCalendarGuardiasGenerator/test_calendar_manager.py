@@ -3,8 +3,14 @@ Script de prueba para validar CalendarManager
 """
 
 from models.calendar_manager import CalendarManager
+from models.storage import CorruptDataError, JsonStorage, ShardedStorage
+from utils.atomic_file import atomic_write
 from datetime import datetime
+import json
 import os
+import tempfile
+import threading
+import time
 
 def test_calendar_manager():
     """Prueba básica del CalendarManager"""
@@ -63,5 +69,501 @@ def test_calendar_manager():
     print("✅ Todas las pruebas pasaron correctamente")
     print("=" * 60)
 
+def _evento(id_evento, tecnico):
+    """Evento de guardia mínimo para las pruebas"""
+    return {'id': id_evento, 'titulo': f'Guardia - {tecnico}', 'tecnico': tecnico, 'tipo': 'guardia'}
+
+
+def test_journal_persistence():
+    """Los cambios van al diario, se recuperan al recargar y close() los consolida"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "json", "calendarios.json")
+        
+        cm = CalendarManager(data_file)
+        cm.add_event('2026-03-07', _evento('a', 'Pilar'))
+        cm.save_data()  # Primera escritura: JSON completo
+        assert os.path.exists(data_file)
+        size_inicial = os.path.getsize(data_file)
+        
+        cm.add_event('2026-03-08', _evento('b', 'Isa'))
+        cm.remove_events('2026-03-07')
+        cm.save_data()
+        assert os.path.getsize(data_file) == size_inicial  # Solo se escribe el diario
+        assert os.path.exists(cm.storage.journal_file)
+        
+        recargado = CalendarManager(data_file)
+        assert '07' not in recargado.get_month_view(2026, 3)['dias']
+        assert recargado.get_month_view(2026, 3)['dias']['08']['eventos'][0]['tecnico'] == 'Isa'
+        assert recargado.get_statistics()['total_eventos'] == 1
+        
+        recargado.close()
+        assert not os.path.exists(recargado.storage.journal_file)
+        assert CalendarManager(data_file).get_statistics()['total_eventos'] == 1
+
+
+def _escribir_csv(ruta, filas):
+    """Escribe un CSV de Google Calendar con filas (subject, inicio, fin exclusivo)"""
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write("Subject,Start Date,Start Time,End Date,End Time,All Day Event,Description,Location,Private\n")
+        for subject, inicio, fin in filas:
+            f.write(f"{subject},{inicio},00:00:00,{fin},00:00:00,True,,,False\n")
+
+
+def test_import_csv_conflictos():
+    """En conflicto prevalece el primer técnico, también tras recargar el almacén"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "json", "calendarios.json")
+        primero = os.path.join(tmp, "primero.csv")
+        segundo = os.path.join(tmp, "segundo.csv")
+        _escribir_csv(primero, [("Guardia - Pilar", "2026-03-07", "2026-03-09")])
+        _escribir_csv(segundo, [("Guardia - Isa", "2026-03-08", "2026-03-10")])
+        
+        cm = CalendarManager(data_file)
+        assert cm.import_csv(primero)['importados'] == 2
+        cm.close()
+        
+        cm = CalendarManager(data_file)
+        stats = cm.import_csv(segundo)
+        assert stats['importados'] == 1  # 09/03
+        assert stats['duplicados'] == 1  # 08/03 ya es de Pilar
+        assert cm.get_month_view(2026, 3)['dias']['08']['eventos'][0]['tecnico'] == 'Pilar'
+        
+        # Tras borrar el día, vuelve a aceptar eventos en esa fecha
+        cm.remove_events('2026-03-08')
+        assert cm.add_event('2026-03-08', _evento('x', 'Isa'))
+
+
+def test_import_csv_streaming():
+    """La importación por lotes informa del progreso y respeta save_mode"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "json", "calendarios.json")
+        ruta = os.path.join(tmp, "guardias.csv")
+        _escribir_csv(ruta, [(f"Guardia - T{i}", f"2026-01-{i:02d}", f"2026-01-{i + 1:02d}")
+                             for i in range(1, 26)])
+        
+        progreso = []
+        cm = CalendarManager(data_file)
+        stats = cm.import_csv(ruta, batch_size=10, save_mode='none',
+                              progress_callback=lambda filas, fraccion: progreso.append((filas, fraccion)))
+        
+        assert stats['total'] == 25 and stats['importados'] == 25
+        assert [filas for filas, _ in progreso] == [10, 20, 25]
+        assert progreso[-1][1] == 1.0
+        assert not os.path.exists(data_file)  # save_mode='none': persiste quien llama
+
+
+def test_import_many():
+    """Importa varios CSV, omite los ya importados y persiste una vez"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "json", "calendarios.json")
+        rutas = []
+        for mes, tecnico in [(1, "Pilar"), (2, "Isa"), (3, "Romane")]:
+            ruta = os.path.join(tmp, f"guardias-{mes}.csv")
+            _escribir_csv(ruta, [(f"Guardia - {tecnico}", f"2026-{mes:02d}-07", f"2026-{mes:02d}-09")])
+            rutas.append(ruta)
+        
+        cm = CalendarManager(data_file)
+        cm.import_csv(rutas[0])
+        
+        stats = cm.import_many(rutas + [rutas[1]])
+        assert stats['omitidos'] == 2  # Ya importado + repetido en la selección
+        assert stats['importados'] == 4
+        assert set(stats['por_archivo']) == {"guardias-2.csv", "guardias-3.csv"}
+        
+        recargado = CalendarManager(data_file)
+        assert recargado.get_statistics()['total_eventos'] == 6
+        assert recargado.get_statistics()['fuentes_csv'] == 3
+
+
+def test_import_many_procesos():
+    """El resultado con procesos es idéntico al secuencial (primer técnico gana)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        rutas = []
+        for i, tecnico in enumerate(["Pilar", "Isa", "Romane"]):
+            ruta = os.path.join(tmp, f"guardias-{i}.csv")
+            _escribir_csv(ruta, [(f"Guardia - {tecnico}", "2026-01-07", "2026-01-09"),
+                                 (f"Guardia - {tecnico}", f"2026-0{i + 2}-07", f"2026-0{i + 2}-08")])
+            rutas.append(ruta)
+        
+        vistas = []
+        for n, use_processes in [(1, False), (3, True)]:
+            cm = CalendarManager(os.path.join(tmp, f"json-{n}", "calendarios.json"))
+            stats = cm.import_many(rutas, max_workers=n, use_processes=use_processes)
+            assert stats['importados'] == 5
+            vistas.append([(e['fecha'], e['id'], e['tecnico']) for e in cm.get_all_events()])
+        
+        assert vistas[0] == vistas[1]
+        assert {tecnico for fecha, _, tecnico in vistas[0] if fecha.startswith("2026-01")} == {"Pilar"}
+
+
+def test_import_many_cancelado():
+    """Al cancelar se conserva lo fusionado y el archivo no queda registrado"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "guardias.csv")
+        _escribir_csv(ruta, [("Guardia - Pilar", f"2026-{mes:02d}-07", f"2026-{mes:02d}-08")
+                             for mes in range(1, 13)])
+        
+        cm = CalendarManager(os.path.join(tmp, "json", "calendarios.json"))
+        cancelar = threading.Event()
+        stats = cm.import_many([ruta], batch_size=4, cancel_event=cancelar,
+                               progress_callback=lambda procesados, total: cancelar.set())
+        
+        assert stats['cancelado']
+        assert stats['importados'] == 4
+        assert cm.get_statistics()['fuentes_csv'] == 0
+        
+        # Puede reimportarse completo más tarde
+        stats = cm.import_many([ruta])
+        assert stats['importados'] == 8 and stats['duplicados'] == 4
+
+
+def test_request_save_agrupa_cambios():
+    """Una ráfaga de ediciones se guarda una sola vez; close() guarda lo pendiente"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "json", "calendarios.json")
+        cm = CalendarManager(data_file, save_delay=0.05)
+        guardados = []
+        guardar = cm.storage.save
+        cm.storage.save = lambda: (guardados.append(1), guardar())
+        
+        for dia in range(1, 11):
+            cm.add_event(f"2026-03-{dia:02d}", _evento(f"r{dia}", "Pilar"))
+            cm.request_save()
+        time.sleep(0.3)
+        assert len(guardados) == 1
+        
+        cm.add_event("2026-03-20", _evento("r20", "Isa"))
+        cm.request_save()
+        cm.close()  # No espera al retardo: guarda al cerrar
+        assert len(guardados) == 2
+        assert CalendarManager(data_file).get_statistics()['total_eventos'] == 11
+
+
+def test_json_guardado_atomico_y_copias():
+    """Un JSON dañado no se sustituye por datos vacíos: se usa la copia o se avisa"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "json", "calendarios.json")
+        cm = CalendarManager(data_file, backups=2)
+        cm.add_event("2026-03-07", _evento("a1", "Pilar"))
+        cm.close()
+        cm = CalendarManager(data_file, backups=2)
+        cm.add_event("2026-03-08", _evento("a2", "Pilar"))
+        cm.close()
+        assert os.path.exists(data_file + ".1")
+        assert not [f for f in os.listdir(os.path.dirname(data_file)) if f.endswith(".tmp")]
+        
+        # Un error durante la escritura deja intacto el archivo anterior
+        try:
+            with atomic_write(data_file) as f:
+                f.write('{"meses": ')
+                raise RuntimeError("corte simulado")
+        except RuntimeError:
+            pass
+        assert CalendarManager(data_file).get_statistics()['total_eventos'] == 2
+        
+        # Archivo truncado: se recupera la copia más reciente
+        with open(data_file, 'w', encoding='utf-8') as f:
+            f.write('{"meses": {"2026-03"')
+        assert CalendarManager(data_file, backups=2).get_statistics()['total_eventos'] == 1
+        
+        # Sin copias válidas: error explícito
+        try:
+            CalendarManager(data_file)
+            assert False, "Debería lanzar CorruptDataError"
+        except CorruptDataError:
+            pass
+
+
+def test_formato_compacto():
+    """El formato compacto conserva los datos y migra un JSON histórico al consolidar"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_csv = os.path.join(tmp, "guardias.csv")
+        _escribir_csv(ruta_csv, [("Guardia - Pilar", "2026-03-07", "2026-03-09"),
+                                 ("Guardia - Isa", "2026-03-14", "2026-03-16")])
+        data_file = os.path.join(tmp, "json", "calendarios.json")
+        cm = CalendarManager(data_file)
+        cm.import_csv(ruta_csv)
+        cm.add_event("2026-04-01", {'id': 'm1', 'titulo': 'Manual', 'tipo': 'otro'})
+        cm.remove_events("2026-03-15")
+        cm.close()
+        original = JsonStorage(data_file).data
+        
+        # Migración en el sitio: se lee el histórico y se reescribe compacto
+        JsonStorage(data_file, compact=True).compact()
+        with open(data_file, 'rb') as f:
+            assert f.read(2) == b'\x1f\x8b'
+        assert JsonStorage(data_file).data == original
+        
+        # Archivo .json.gz: formato compacto por defecto a través de CalendarManager
+        gz_file = os.path.join(tmp, "json", "calendarios.json.gz")
+        cm = CalendarManager(gz_file)
+        cm.import_csv(ruta_csv)
+        cm.close()
+        assert CalendarManager(gz_file).get_statistics()['total_eventos'] == 4
+
+
+def test_sqlite_storage():
+    """El backend SQLite sirve las mismas vistas desde consultas indexadas"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "calendarios.db")
+        
+        cm = CalendarManager(db_file)
+        assert cm.add_event('2026-03-07', _evento('a', 'Pilar'))
+        assert not cm.add_event('2026-03-07', _evento('a', 'Pilar'))  # Duplicado
+        cm.add_event('2026-03-08', _evento('b', 'Isa'))
+        cm.add_event('2026-04-04', _evento('c', 'Pilar'))
+        cm.close()
+        
+        cm = CalendarManager(db_file)
+        mes = cm.get_month_view(2026, 3)
+        assert mes['estadisticas_mes']['total_eventos'] == 2
+        assert mes['dias']['07']['eventos'][0]['tecnico'] == 'Pilar'
+        assert [e['fecha'] for e in cm.get_events_by_tecnico('Pilar')] == ['2026-03-07', '2026-04-04']
+        
+        assert cm.remove_events('2026-03-07') == 1
+        stats = cm.get_statistics()
+        assert stats['total_eventos'] == 2
+        assert stats['total_meses_con_datos'] == 2
+        assert stats['eventos_por_tipo'] == {'guardia': 2}
+        cm.close()
+
+
+def test_almacen_por_meses():
+    """El almacén particionado carga meses bajo demanda y solo reescribe los modificados"""
+    with tempfile.TemporaryDirectory() as tmp:
+        carpeta = os.path.join(tmp, "calendarios") + os.sep
+        cm = CalendarManager(carpeta)
+        assert isinstance(cm.storage, ShardedStorage)
+        for mes in range(1, 13):
+            cm.add_event(f"2025-{mes:02d}-10", _evento(f"e{mes}", 'Pilar'))
+        cm.close()
+        assert len([n for n in os.listdir(carpeta) if n.startswith("2025-")]) == 12
+        
+        # Al arrancar solo se lee el manifiesto
+        storage = ShardedStorage(carpeta, cache_size=3)
+        assert storage.get_statistics()['total_eventos'] == 12
+        assert len(storage._cache) == 0
+        assert len(storage.get_events_by_tecnico('Pilar')) == 12
+        assert len(storage._cache) == 3  # La caché LRU no crece con el histórico
+        
+        # Solo se reescriben el mes modificado y el manifiesto
+        mtimes = {n: os.stat(os.path.join(carpeta, n)).st_mtime_ns for n in os.listdir(carpeta)}
+        time.sleep(0.01)
+        storage.remove_events("2025-05-10")
+        storage.add_event("2025-05-11", _evento('nuevo', 'Isa'))
+        storage.save()
+        cambiados = {n for n in os.listdir(carpeta)
+                     if os.stat(os.path.join(carpeta, n)).st_mtime_ns != mtimes.get(n)}
+        assert cambiados == {"2025-05.json", "manifest.json"}
+        
+        cm = CalendarManager(carpeta)
+        assert cm.get_month_view(2025, 5)['dias']['11']['eventos'][0]['tecnico'] == 'Isa'
+        assert cm.get_statistics()['total_eventos'] == 12
+        
+        # Las fuentes y sus huellas por fila quedan fuera del manifiesto
+        ruta_csv = os.path.join(tmp, "guardias.csv")
+        _escribir_csv(ruta_csv, [("Guardia - Isa", "2025-06-07", "2025-06-09")])
+        assert cm.import_csv(ruta_csv)['importados'] == 2
+        cm.close()
+        with open(os.path.join(carpeta, "manifest.json"), encoding='utf-8') as f:
+            contenido = f.read()
+        assert "\n" not in contenido and "filas" not in contenido
+        storage = ShardedStorage(carpeta)
+        assert storage.count_sources() == 1 and storage._sources is None  # Sin leer fuentes.json
+        assert storage.has_source(storage.manifest['fuentes'][0])
+        assert len(storage.get_source_rows(storage.manifest['fuentes'][0])) == 1
+
+
+def test_estadisticas_incrementales():
+    """Los totales globales se mantienen al añadir y borrar, en todos los backends"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for nombre in ("calendarios.json", "calendarios.db", "calendarios"):
+            data_file = os.path.join(tmp, nombre)
+            cm = CalendarManager(data_file)
+            cm.add_event('2026-03-07', _evento('a', 'Pilar'))
+            cm.add_event('2026-03-07', {'id': 'n', 'titulo': 'Nota', 'tipo': 'nota'})
+            cm.add_event('2026-04-04', _evento('b', 'Isa'))
+            assert cm.remove_events('2026-03-07') == 2
+            assert cm.remove_events('2026-03-07') == 0
+            cm.add_event('2026-03-08', _evento('c', 'Isa'))
+            cm.add_event('2026-05-02', _evento('d', 'Isa'))
+            assert not cm.add_event('2026-05-02', _evento('d', 'Isa'))
+            assert cm.storage.remove_event('2026-05-02', 'd')  # Mes vaciado: deja de contar
+            
+            stats = cm.get_statistics()
+            assert stats['total_eventos'] == 2 == len(cm.get_all_events())
+            assert stats['eventos_por_tipo'] == {'guardia': 2}
+            assert stats['total_meses_con_datos'] == 2
+            stats['eventos_por_tipo']['guardia'] = 0  # Copia: no altera los totales
+            cm.close()
+            
+            # Los totales recalculados al abrir coinciden con los mantenidos
+            cm = CalendarManager(data_file)
+            assert cm.get_statistics()['eventos_por_tipo'] == {'guardia': 2}
+            assert cm.get_statistics()['total_meses_con_datos'] == 2
+            assert cm.get_month_view(2026, 5)['dias'] == {}
+            cm.close()
+
+
+def test_registro_fuentes_sin_rehash():
+    """Un CSV sin cambios (misma firma) no se vuelve a leer para calcular su hash"""
+    import hashlib
+    import models.calendar_manager as calendar_manager
+    from utils.file_hash import file_digest
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_csv = os.path.join(tmp, "guardias.csv")
+        _escribir_csv(ruta_csv, [("Guardia - Pilar", "2026-03-07", "2026-03-09")])
+        with open(ruta_csv, 'rb') as f:
+            assert file_digest(ruta_csv) == hashlib.md5(f.read()).hexdigest()
+        
+        data_file = os.path.join(tmp, "calendarios.json")
+        cm = CalendarManager(data_file)
+        assert cm.import_csv(ruta_csv)['importados'] == 2
+        cm.close()
+        assert JsonStorage(data_file).get_sources()[0]['firma']
+        
+        leidos = []
+        original = calendar_manager.file_digest
+        calendar_manager.file_digest = lambda ruta: leidos.append(ruta) or original(ruta)
+        try:
+            cm = CalendarManager(data_file)
+            assert cm.import_many([ruta_csv])['omitidos'] == 1
+            assert leidos == []  # Firma registrada al importar: sin leer el archivo
+            
+            # Contenido nuevo: cambia la firma y se calcula el hash
+            _escribir_csv(ruta_csv, [("Guardia - Isa", "2026-03-14", "2026-03-16")])
+            assert cm.import_csv(ruta_csv)['importados'] == 2
+            assert leidos == [ruta_csv]
+            cm.close()
+        finally:
+            calendar_manager.file_digest = original
+
+
+def test_reimportacion_incremental():
+    """Una versión nueva del mismo CSV solo aplica las filas añadidas, cambiadas o eliminadas"""
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta_csv = os.path.join(tmp, "guardias.csv")
+        semanas = [("Guardia - Pilar", "2026-03-07", "2026-03-09"),
+                   ("Guardia - Isa", "2026-03-14", "2026-03-16"),
+                   ("Guardia - Romane", "2026-03-21", "2026-03-23")]
+        for nombre in ("calendarios.json", "calendarios.db", "calendarios"):
+            data_file = os.path.join(tmp, nombre)
+            _escribir_csv(ruta_csv, semanas)
+            cm = CalendarManager(data_file)
+            assert cm.import_csv(ruta_csv)['importados'] == 6
+            
+            # Nuevo export: cambia el técnico de una semana, desaparece otra y se añade una
+            _escribir_csv(ruta_csv, [semanas[0], ("Guardia - Yannick", "2026-03-14", "2026-03-16"),
+                                     ("Guardia - Mayra", "2026-03-28", "2026-03-30")])
+            stats = cm.import_many([ruta_csv]) if data_file.endswith(".db") else cm.import_csv(ruta_csv)
+            assert stats['diff'] == {'añadidas': 2, 'eliminadas': 2, 'sin_cambios': 1,
+                                     'historico': 0, 'eventos_eliminados': 4}
+            assert stats['importados'] == 4
+            
+            por_fecha = {e['fecha']: e['tecnico'] for e in cm.get_all_events()}
+            assert por_fecha == {'2026-03-07': 'Pilar', '2026-03-08': 'Pilar',
+                                 '2026-03-14': 'Yannick', '2026-03-15': 'Yannick',
+                                 '2026-03-28': 'Mayra', '2026-03-29': 'Mayra'}
+            assert cm.get_statistics()['total_eventos'] == 6
+            assert cm.get_statistics()['fuentes_csv'] == 1  # La versión nueva sustituye a la anterior
+            cm.close()
+            
+            # El registro por filas sobrevive a la recarga. Las filas fuera del
+            # rango del CSV nuevo (el export avanzó) se conservan como histórico
+            cm = CalendarManager(data_file)
+            _escribir_csv(ruta_csv, [("Guardia - Mayra", "2026-03-28", "2026-03-30"),
+                                     ("Guardia - Alberto", "2026-04-04", "2026-04-06")])
+            diff = cm.import_csv(ruta_csv)['diff']
+            assert (diff['historico'], diff['eliminadas'], diff['añadidas']) == (2, 0, 1)
+            assert len(cm.get_all_events()) == 8
+            cm.close()
+
+
+def test_huellas_fuera_del_diario():
+    """Las huellas por fila no van al JSON ni al diario y se borran al sustituir la fuente"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "calendarios.json")
+        ruta_csv = os.path.join(tmp, "guardias.csv")
+        _escribir_csv(ruta_csv, [("Guardia - Pilar", "2026-03-07", "2026-03-09"),
+                                 ("Guardia - Isa", "2026-03-14", "2026-03-16")])
+        cm = CalendarManager(data_file)
+        cm.import_csv(ruta_csv)  # Primera escritura: JSON completo
+        _escribir_csv(ruta_csv, [("Guardia - Pilar", "2026-03-07", "2026-03-09"),
+                                 ("Guardia - Romane", "2026-03-14", "2026-03-16")])
+        assert cm.import_csv(ruta_csv)['diff']['eliminadas'] == 1  # Cambios al diario
+        for ruta in (data_file, cm.storage.journal_file):
+            with open(ruta, encoding='utf-8') as f:
+                assert '"filas"' not in f.read()
+        assert len(os.listdir(data_file + ".filas")) == 1  # Solo la versión vigente
+        cm.close()
+        
+        # Almacén de una versión anterior: huellas [[fecha, id], ...] dentro de la fuente
+        with open(data_file, encoding='utf-8') as f:
+            data = json.load(f)
+        fuente = data['fuentes_csv'][0]
+        filas = JsonStorage(data_file).get_source_rows(fuente['hash'])
+        fuente['filas'] = {huella: [list(ref) for ref in cm._row_events(entrada)]
+                           for huella, entrada in filas.items()}
+        del fuente['incremental']
+        with open(data_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.remove(os.path.join(data_file + ".filas", f"{fuente['hash']}.json"))
+        
+        cm = CalendarManager(data_file)
+        _escribir_csv(ruta_csv, [("Guardia - Yannick", "2026-03-07", "2026-03-09"),
+                                 ("Guardia - Romane", "2026-03-14", "2026-03-16")])
+        stats = cm.import_csv(ruta_csv)
+        assert (stats['diff']['eliminadas'], stats['diff']['eventos_eliminados']) == (1, 2)
+        assert {e['fecha']: e['tecnico'] for e in cm.get_all_events()}['2026-03-07'] == 'Yannick'
+        cm.close()
+        with open(data_file, encoding='utf-8') as f:
+            assert '"filas"' not in f.read()
+
+
+def test_reimportacion_no_borra_eventos_de_otro_csv():
+    """Quitar una semana de un CSV no borra el mismo evento importado desde otro CSV"""
+    with tempfile.TemporaryDirectory() as tmp:
+        compartida = ("Guardia - Pilar", "2026-03-07", "2026-03-09")
+        for nombre in ("calendarios.json", "calendarios.db", "calendarios"):
+            data_file = os.path.join(tmp, nombre)
+            ruta_a = os.path.join(tmp, "guardias-a.csv")
+            ruta_b = os.path.join(tmp, "guardias-b.csv")
+            _escribir_csv(ruta_a, [compartida])
+            semanas_b = [("Guardia - Isa", "2026-02-28", "2026-03-02"), compartida,
+                         ("Guardia - Romane", "2026-03-14", "2026-03-16")]
+            _escribir_csv(ruta_b, semanas_b)
+            cm = CalendarManager(data_file)
+            assert cm.import_csv(ruta_a)['importados'] == 2
+            assert cm.import_csv(ruta_b)['duplicados'] == 2  # Mismos ids: los eventos son de A
+            
+            # B deja de tener la semana compartida (dentro de su rango); A la sigue teniendo
+            _escribir_csv(ruta_b, [semanas_b[0], semanas_b[2]])
+            stats = cm.import_many([ruta_b]) if data_file.endswith(".db") else cm.import_csv(ruta_b)
+            assert (stats['diff']['eliminadas'], stats['diff']['eventos_eliminados']) == (1, 0)
+            
+            origen = {e['fecha']: e['archivo_origen'] for e in cm.get_all_events()}
+            assert origen == {'2026-02-28': 'guardias-b.csv', '2026-03-01': 'guardias-b.csv',
+                              '2026-03-07': 'guardias-a.csv', '2026-03-08': 'guardias-a.csv',
+                              '2026-03-14': 'guardias-b.csv', '2026-03-15': 'guardias-b.csv'}
+            cm.close()
+
+
 if __name__ == "__main__":
     test_calendar_manager()
+    test_journal_persistence()
+    test_import_csv_conflictos()
+    test_import_csv_streaming()
+    test_import_many()
+    test_import_many_procesos()
+    test_import_many_cancelado()
+    test_request_save_agrupa_cambios()
+    test_json_guardado_atomico_y_copias()
+    test_formato_compacto()
+    test_sqlite_storage()
+    test_almacen_por_meses()
+    test_estadisticas_incrementales()
+    test_registro_fuentes_sin_rehash()
+    test_reimportacion_incremental()
+    test_huellas_fuera_del_diario()
+    test_reimportacion_no_borra_eventos_de_otro_csv()
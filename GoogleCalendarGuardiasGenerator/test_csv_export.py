@@ -0,0 +1,83 @@
+"""
+Pruebas de la exportación CSV compartida (models.csv_export)
+"""
+
+import os
+import tempfile
+from datetime import date, timedelta
+
+import models.csv_export as csv_export
+from models.csv_export import (FORMATO_DIA_COMPLETO, FORMATO_HORAS, iter_assignment_events,
+                               write_csv)
+
+CABECERA = "Subject,Start Date,Start Time,End Date,End Time,All Day Event,Description,Location,Private\r\n"
+
+
+def test_formatos_de_los_exportadores():
+    """Sábado y domingo del mismo técnico se agrupan; cada formato mantiene sus columnas"""
+    asignaciones = {
+        date(2026, 3, 7): {'tecnico': 'Pilar'},   # Sábado
+        date(2026, 3, 8): {'tecnico': 'Pilar'},   # Domingo
+        date(2026, 3, 14): {'tecnico': 'Isa'},    # Sábado sin el domingo
+        date(2026, 3, 19): {'tecnico': 'Romane'}  # Festivo
+    }
+    festivos = {date(2026, 3, 19): "San José"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = os.path.join(tmp, "guardias.csv")
+        eventos = iter_assignment_events(asignaciones, festivos)
+        assert write_csv(eventos, [ruta], FORMATO_HORAS) == 3
+        with open(ruta, 'rb') as f:
+            assert f.read().decode('utf-8') == CABECERA + (
+                "Guardia - Pilar,2026-03-07,00:00:00,2026-03-08,23:59:59,False,,,False\r\n"
+                "Guardia - Isa,2026-03-14,00:00:00,2026-03-14,23:59:59,False,,,False\r\n"
+                "Guardia San José - Romane,2026-03-19,00:00:00,2026-03-19,23:59:59,False,,,False\r\n")
+
+        write_csv(iter_assignment_events(asignaciones, festivos), [ruta], FORMATO_DIA_COMPLETO)
+        with open(ruta, 'rb') as f:
+            assert f.read().decode('utf-8').splitlines()[1] == \
+                "Guardia - Pilar,2026-03-07,00:00:00,2026-03-09,00:00:00,True,,,False"
+
+
+def test_destinos_multiples_en_bloques():
+    """Varios destinos reciben los mismos bytes aunque la exportación ocupe varios bloques"""
+    inicio = date(2020, 1, 1)
+    asignaciones = {inicio + timedelta(days=i): {'tecnico': f"T{i % 5}"} for i in range(2500)}
+
+    original = csv_export.FILAS_POR_BLOQUE
+    csv_export.FILAS_POR_BLOQUE = 100
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            rutas = [os.path.join(tmp, "proyecto", "guardias.csv"), os.path.join(tmp, "copia.csv")]
+            escritos = write_csv(iter_assignment_events(asignaciones, {}), rutas, FORMATO_DIA_COMPLETO)
+            contenidos = []
+            for ruta in rutas:
+                with open(ruta, 'rb') as f:
+                    contenidos.append(f.read())
+            assert contenidos[0] == contenidos[1]
+            assert contenidos[0].count(b"\r\n") == escritos + 1
+            assert escritos == 2500
+    finally:
+        csv_export.FILAS_POR_BLOQUE = original
+
+
+def test_copia_secundaria_fallida():
+    """Si una copia falla, el primer destino se escribe igual y no se crean carpetas para la copia"""
+    asignaciones = {date(2026, 3, 7): {'tecnico': 'Pilar'}, date(2026, 3, 8): {'tecnico': 'Pilar'}}
+    with tempfile.TemporaryDirectory() as tmp:
+        principal = os.path.join(tmp, "csv", "guardias.csv")
+        escritorio = os.path.join(tmp, "Desktop", "guardias.csv")  # Carpeta inexistente
+        errores = {}
+        assert write_csv(iter_assignment_events(asignaciones, {}), [principal, escritorio],
+                         FORMATO_DIA_COMPLETO, errores) == 1
+        with open(principal, 'rb') as f:
+            assert f.read().decode('utf-8').startswith(CABECERA + "Guardia - Pilar,")
+        assert list(errores) == [escritorio]
+        assert not os.path.exists(os.path.join(tmp, "Desktop"))
+
+
+if __name__ == "__main__":
+    test_formatos_de_los_exportadores()
+    test_destinos_multiples_en_bloques()
+    test_copia_secundaria_fallida()
+    print("✅ Todas las pruebas pasaron correctamente")
@@ -0,0 +1,72 @@
+"""
+Pruebas de la vigilancia de la carpeta de CSV (models.folder_watcher)
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from models.calendar_manager import CalendarManager
+from models.folder_watcher import FolderWatcher
+
+
+def _escribir(ruta, texto):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(texto)
+
+
+def test_scan_debounce():
+    """Un archivo se entrega cuando su firma lleva `debounce` segundos estable, y una sola vez"""
+    with tempfile.TemporaryDirectory() as tmp:
+        watcher = FolderWatcher(tmp, callback=lambda rutas: None, debounce=0.2, use_inotify=False)
+        ruta = os.path.join(tmp, "guardias.csv")
+        _escribir(ruta, "a")
+        _escribir(os.path.join(tmp, "notas.txt"), "ignorado")
+
+        assert watcher.scan() == []  # Recién visto: aún en debounce
+        _escribir(ruta, "ab")  # Sigue cambiando: se reinicia el debounce
+        time.sleep(0.15)
+        assert watcher.scan() == []
+        time.sleep(0.25)
+        assert watcher.scan() == [ruta]
+        time.sleep(0.25)
+        assert watcher.scan() == []  # Sin cambios: no se vuelve a entregar
+
+        _escribir(ruta, "abc")
+        watcher.scan()
+        time.sleep(0.25)
+        assert watcher.scan() == [ruta]  # Modificado: se entrega de nuevo
+
+
+def test_importacion_automatica():
+    """El hilo de vigilancia importa los CSV que aparecen en la carpeta"""
+    with tempfile.TemporaryDirectory() as tmp:
+        carpeta = os.path.join(tmp, "csv")
+        cm = CalendarManager(os.path.join(tmp, "calendarios.json"))
+        importado = threading.Event()
+        resultados = []
+
+        def importar(rutas):
+            resultados.append(cm.import_many(rutas))
+            importado.set()
+
+        watcher = FolderWatcher(carpeta, importar, interval=0.05, debounce=0.1)
+        watcher.start()
+        try:
+            _escribir(os.path.join(carpeta, "guardias-support.csv"),
+                      "Subject,Start Date,Start Time,End Date,End Time,All Day Event,Description,Location,Private\n"
+                      "Guardia - Pilar,2026-03-07,00:00:00,2026-03-09,00:00:00,True,,,False\n")
+            assert importado.wait(5)
+        finally:
+            watcher.stop()
+
+        assert resultados[0]['importados'] == 2
+        assert resultados[0]['meses'] == {'2026-03'}
+        cm.close()
+
+
+if __name__ == "__main__":
+    test_scan_debounce()
+    test_importacion_automatica()
+    print("✅ Todas las pruebas pasaron correctamente")
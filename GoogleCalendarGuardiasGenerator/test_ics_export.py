@@ -0,0 +1,72 @@
+"""
+Pruebas de la exportación iCalendar (models.ics_export)
+"""
+
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+from models.ics_export import iter_ics_lines, plan_series, write_ics
+from models.roster import generate_roster
+
+TECNICOS = ["Pilar", "Isa", "Romane", "Yannick", "Mayra", "Alberto"]
+
+
+def _expandir(lineas):
+    """Expande los VEVENT (RRULE semanal + EXDATE) a {(asunto, inicio, fin exclusivo)}"""
+    texto = "".join(lineas).replace("\r\n ", "")
+    eventos = set()
+    for bloque in texto.split("BEGIN:VEVENT\r\n")[1:]:
+        campos = {}
+        for linea in bloque.split("\r\n"):
+            if ":" in linea:
+                clave, valor = linea.split(":", 1)
+                campos[clave.split(";")[0]] = valor
+        inicio = datetime.strptime(campos['DTSTART'], "%Y%m%d").date()
+        duracion = datetime.strptime(campos['DTEND'], "%Y%m%d").date() - inicio
+        paso, total = timedelta(0), 1
+        if 'RRULE' in campos:
+            regla = dict(p.split("=") for p in campos['RRULE'].split(";"))
+            paso, total = timedelta(weeks=int(regla['INTERVAL'])), int(regla['COUNT'])
+        excluidas = {datetime.strptime(f, "%Y%m%d").date()
+                     for f in campos.get('EXDATE', "").split(",") if f}
+        for k in range(total):
+            fecha = inicio + paso * k
+            if fecha not in excluidas:
+                eventos.add((campos['SUMMARY'].replace("\\,", ","), fecha, fecha + duracion))
+    return eventos
+
+
+def test_rotacion_regular_comprimida():
+    """Una rotación fija de varios años se reduce a una serie por técnico sin perder guardias"""
+    festivos = {date(2027, 4, 14): "", date(2028, 5, 1): "Fiesta, trabajo"}
+    guardias = generate_roster(TECNICOS, festivos, date(2026, 1, 1), date(2031, 1, 1))
+    lineas = list(iter_ics_lines(guardias, dtstamp=datetime(2026, 1, 1)))
+
+    esperados = {(g['subject'], g['fecha_inicio'], g['fecha_fin'] + timedelta(days=1)) for g in guardias}
+    assert _expandir(lineas) == esperados
+    assert sum(l == "BEGIN:VEVENT\r\n" for l in lineas) <= len(TECNICOS) + len(festivos)
+    assert all(len(l.encode("utf-8")) <= 77 for l in lineas)  # 75 octetos + CRLF
+
+
+def test_plan_series_con_huecos():
+    """Los huecos cortos se cubren con EXDATE y lo irregular queda como eventos sueltos"""
+    inicio = date(2026, 1, 3)
+    semanas = [0, 4, 8, 16, 20, 21]  # Falta la semana 12; la 21 rompe el ritmo
+    series = plan_series([inicio + timedelta(weeks=s) for s in semanas])
+    assert series[0] == (inicio, 4, 6, [inicio + timedelta(weeks=12)])
+    assert series[1] == (inicio + timedelta(weeks=21), 0, 1, [])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rutas = [os.path.join(tmp, "a.ics"), os.path.join(tmp, "b.ics")]
+        eventos = [{'subject': "Guardia - Pilar", 'fecha_inicio': d, 'fecha_fin': d}
+                   for d in [inicio + timedelta(weeks=s) for s in semanas]]
+        assert write_ics(eventos, rutas) == 2
+        with open(rutas[0], 'rb') as a, open(rutas[1], 'rb') as b:
+            assert a.read() == b.read()
+
+
+if __name__ == "__main__":
+    test_rotacion_regular_comprimida()
+    test_plan_series_con_huecos()
+    print("✅ Todas las pruebas pasaron correctamente")
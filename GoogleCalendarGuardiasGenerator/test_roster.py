@@ -0,0 +1,74 @@
+"""
+Pruebas del motor de generación de guardias (models.roster)
+"""
+
+from datetime import date
+
+from models.roster import IndiceGuardias, asignar_tecnico_festivo, generate_roster, SIN_ASIGNAR
+
+
+def test_indice_guardias():
+    """El índice detecta guardias en los 2 días previos"""
+    indice = IndiceGuardias()
+    indice.agregar(date(2026, 3, 7), date(2026, 3, 8), "Pilar")  # Sábado-Domingo
+    
+    assert indice.tiene_guardia("Pilar", date(2026, 3, 8))
+    assert not indice.tiene_guardia("Isa", date(2026, 3, 8))
+    assert indice.tiene_guardia_reciente("Pilar", date(2026, 3, 9))
+    assert indice.tiene_guardia_reciente("Pilar", date(2026, 3, 10))
+    assert not indice.tiene_guardia_reciente("Pilar", date(2026, 3, 11))
+    assert not indice.tiene_guardia_reciente("Isa", date(2026, 3, 9))
+
+
+def test_festivo_busca_alternativa_con_guardia_reciente():
+    """Un festivo en lunes no se asigna al técnico que acaba de hacer el fin de semana"""
+    tecnicos = ["Pilar", "Isa", "Romane"]
+    sabado = date(2026, 4, 4)
+    guardias_fin_semana = {sabado: "Pilar"}
+    indice = IndiceGuardias()
+    indice.agregar(sabado, date(2026, 4, 5), "Pilar")
+    
+    tecnico = asignar_tecnico_festivo(date(2026, 4, 6), guardias_fin_semana, indice, tecnicos)
+    
+    assert tecnico == "Isa"
+
+
+def test_generate_roster():
+    """Genera fines de semana en rotación y festivos ordenados cronológicamente"""
+    tecnicos = ["Pilar", "Isa", "Romane"]
+    festivos = {
+        date(2026, 3, 18): "TARDE",  # Miércoles
+        date(2026, 3, 19): "",       # Jueves
+        date(2026, 6, 1): "",        # Fuera de rango
+    }
+    
+    guardias = generate_roster(tecnicos, festivos, date(2026, 3, 1), date(2026, 3, 31))
+    
+    fines_semana = [g for g in guardias if g['tipo'] == 'fin_semana']
+    assert [g['fecha_inicio'] for g in fines_semana] == [
+        date(2026, 3, 7), date(2026, 3, 14), date(2026, 3, 21), date(2026, 3, 28)]
+    assert [g['tecnico'] for g in fines_semana] == ["Pilar", "Isa", "Romane", "Pilar"]
+    
+    festivos_asignados = [g for g in guardias if g['tipo'] == 'festivo']
+    assert festivos_asignados[0]['tecnico'] == SIN_ASIGNAR
+    assert festivos_asignados[0]['subject'] == "Guardia TARDE - ???"
+    assert festivos_asignados[1]['tecnico'] == "Romane"  # Fin de semana siguiente
+    
+    assert guardias == sorted(guardias, key=lambda g: g['fecha_inicio'])
+
+
+def test_generate_roster_sin_fin_de_semana():
+    """Un rango sin fines de semana es un error"""
+    try:
+        generate_roster(["Pilar"], {}, date(2026, 3, 2), date(2026, 3, 5))
+    except ValueError:
+        return
+    assert False, "Se esperaba ValueError"
+
+
+if __name__ == "__main__":
+    test_indice_guardias()
+    test_festivo_busca_alternativa_con_guardia_reciente()
+    test_generate_roster()
+    test_generate_roster_sin_fin_de_semana()
+    print("✅ Todas las pruebas pasaron correctamente")
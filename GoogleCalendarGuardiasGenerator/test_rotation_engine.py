@@ -0,0 +1,90 @@
+"""
+Pruebas del motor de rotación compartido (models.rotation_engine)
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from models.rotation_engine import (HAS_NUMPY, SIN_ASIGNAR, assign_blocks, assign_weekend_rotation,
+                                    auto_assign, compute_duty_blocks, iter_saturdays)
+
+
+def test_compute_duty_blocks():
+    """Fines de semana y festivos laborables se agrupan en bloques consecutivos"""
+    festivos = {
+        date(2026, 4, 3): "",   # Viernes antes de fin de semana
+        date(2026, 4, 6): "",   # Lunes después del mismo fin de semana
+        date(2026, 4, 11): "",  # Sábado: ya es fin de semana
+    }
+    
+    bloques = compute_duty_blocks(date(2026, 4, 1), date(2026, 4, 12), festivos)
+    
+    assert bloques == [
+        [date(2026, 4, 3), date(2026, 4, 4), date(2026, 4, 5), date(2026, 4, 6)],
+        [date(2026, 4, 11), date(2026, 4, 12)],
+    ]
+
+
+def test_assign_blocks():
+    """Bloques de 4+ días se dividen y no se repite técnico entre bloques"""
+    tecnicos = ["Pilar", "Isa", "Romane"]
+    bloques = [
+        [date(2026, 4, 3), date(2026, 4, 4), date(2026, 4, 5), date(2026, 4, 6)],
+        [date(2026, 4, 11), date(2026, 4, 12)],
+    ]
+    
+    asignaciones = assign_blocks(bloques, tecnicos, ultimo_tecnico="Romane")
+    
+    assert [asignaciones[d] for d in bloques[0]] == ["Pilar", "Pilar", "Isa", "Isa"]
+    assert [asignaciones[d] for d in bloques[1]] == ["Romane", "Romane"]
+
+
+def test_auto_assign_y_sabados():
+    """auto_assign cubre todos los días de guardia del rango"""
+    asignaciones, bloques = auto_assign(["Pilar", "Isa"], {}, date(2026, 3, 1), date(2026, 3, 31))
+    
+    assert len(bloques) == 5  # Domingo 1 + 4 fines de semana completos
+    assert len(asignaciones) == 9
+    assert list(iter_saturdays(date(2026, 3, 1), date(2026, 3, 31))) == [
+        date(2026, 3, 7), date(2026, 3, 14), date(2026, 3, 21), date(2026, 3, 28)]
+
+
+def test_assign_weekend_rotation():
+    """Modo del generador de consola: los festivos no alteran la rotación de fines de semana"""
+    festivos = {
+        date(2026, 4, 3): "",   # Viernes: técnico del fin de semana siguiente
+        date(2026, 4, 6): "",   # Lunes: el del fin de semana anterior tiene guardia reciente
+        date(2026, 4, 8): "",   # Miércoles: sin asignar
+    }
+    
+    fines_semana, asignados = assign_weekend_rotation(
+        ["Pilar", "Isa", "Romane"], festivos, date(2026, 4, 1), date(2026, 4, 11), indice_inicial=1)
+    
+    assert fines_semana == {date(2026, 4, 4): "Isa", date(2026, 4, 11): "Romane"}
+    assert asignados == {date(2026, 4, 3): "Isa", date(2026, 4, 6): "Romane",
+                         date(2026, 4, 8): SIN_ASIGNAR}
+
+
+@pytest.mark.skipif(not HAS_NUMPY, reason="NumPy no está instalado")
+def test_compute_duty_blocks_numpy_equivale_a_python():
+    """La versión NumPy devuelve exactamente los mismos bloques"""
+    rng = random.Random(7)
+    for _ in range(50):
+        start = date(2026, 1, 1) + timedelta(days=rng.randint(0, 365))
+        end = start + timedelta(days=rng.randint(-1, 800))
+        festivos = {start + timedelta(days=rng.randint(-30, 830)): "" for _ in range(rng.randint(0, 30))}
+        
+        assert compute_duty_blocks(start, end, festivos, use_numpy=True) == \
+            compute_duty_blocks(start, end, festivos)
+
+
+if __name__ == "__main__":
+    test_compute_duty_blocks()
+    test_assign_blocks()
+    test_auto_assign_y_sabados()
+    test_assign_weekend_rotation()
+    if HAS_NUMPY:
+        test_compute_duty_blocks_numpy_equivale_a_python()
+    print("✅ Todas las pruebas pasaron correctamente")
@@ -0,0 +1,182 @@
+"""
+Grid de un mes dibujado sobre un único tk.Canvas
+"""
+
+import tkinter as tk
+from datetime import date
+from typing import Optional, Sequence, Tuple
+import calendar as cal
+
+RENDERERS = ("widgets", "canvas")
+
+DIAS_SEMANA = ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom']
+
+
+class CanvasMonthGrid(tk.Canvas):
+    """
+    Calendario mensual dibujado con rectángulos y textos etiquetados.
+
+    Sustituye los Frame/Label de cada día por unos pocos items de Canvas. Cada
+    día se dibuja con la etiqueta "d<día>" para poder repintarlo por separado,
+    y la detección de drag-and-drop y clicks se hace por coordenadas.
+    """
+
+    def __init__(self, parent, cell_width: int = 70, cell_height: int = 60,
+                 header_height: int = 22, max_eventos: int = 2,
+                 day_font=("Arial", 9, "bold"), event_font=("Arial", 7), **kwargs):
+        """
+        Args:
+            parent: Widget padre
+            cell_width: Ancho de cada día en píxeles
+            cell_height: Alto de cada día en píxeles
+            header_height: Alto de la fila de encabezados
+            max_eventos: Máximo de eventos visibles por día
+            day_font: Fuente del número de día
+            event_font: Fuente de los eventos
+        """
+        kwargs.setdefault("bg", "white")
+        kwargs.setdefault("highlightthickness", 0)
+        super().__init__(parent, **kwargs)
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.header_height = header_height
+        self.max_eventos = max_eventos
+        self.day_font = day_font
+        self.event_font = event_font
+
+        self.year = None
+        self.month = None
+        self.matrix = []
+        self._firmas = {}  # {día: contenido dibujado}
+
+    def set_month(self, year: int, month: int):
+        """Prepara el grid vacío de un mes (no hace nada si ya es el actual)"""
+        if (year, month) == (self.year, self.month):
+            return
+        self.year = year
+        self.month = month
+        self.matrix = cal.monthcalendar(year, month)
+        self._firmas = {}
+        self.delete("all")
+
+        cw, ch, hh = self.cell_width, self.cell_height, self.header_height
+        self.config(width=7 * cw, height=hh + len(self.matrix) * ch)
+
+        for col, nombre in enumerate(DIAS_SEMANA):
+            color = "#e74c3c" if col >= 5 else "#34495e"
+            self.create_rectangle(col * cw + 1, 1, (col + 1) * cw - 1, hh - 1,
+                                  fill=color, outline=color)
+            self.create_text(col * cw + cw // 2, hh // 2, text=nombre,
+                             fill="white", font=("Arial", 9, "bold"))
+
+        for week_num, week in enumerate(self.matrix):
+            for col, day in enumerate(week):
+                if day == 0:
+                    x, y = self._origen(week_num, col)
+                    self.create_rectangle(x + 1, y + 1, x + cw - 1, y + ch - 1,
+                                          fill="#ecf0f1", outline="#ecf0f1")
+
+    def _origen(self, week_num: int, col: int) -> Tuple[int, int]:
+        """Esquina superior izquierda de una celda"""
+        return col * self.cell_width, self.header_height + week_num * self.cell_height
+
+    def _celda(self, day: int) -> Tuple[int, int]:
+        """(semana, columna) de un día del mes"""
+        for week_num, week in enumerate(self.matrix):
+            if day in week:
+                return week_num, week.index(day)
+        raise ValueError(f"El día {day} no pertenece a {self.month}/{self.year}")
+
+    def set_day(self, day: int, bg: str, eventos: Sequence[Tuple[str, str]] = (),
+                nota: str = "", placeholder: str = "") -> bool:
+        """
+        Dibuja un día si su contenido ha cambiado.
+
+        Args:
+            day: Día del mes
+            bg: Color de fondo
+            eventos: Eventos a mostrar como (texto, color)
+            nota: Texto pequeño junto al número de día (p. ej. festivo)
+            placeholder: Texto gris si el día no tiene eventos
+
+        Returns:
+            bool: True si el día se ha redibujado
+        """
+        firma = (bg, tuple(eventos), nota, placeholder)
+        if self._firmas.get(day) == firma:
+            return False
+        self._firmas[day] = firma
+
+        tag = f"d{day}"
+        self.delete(tag)
+        week_num, col = self._celda(day)
+        x, y = self._origen(week_num, col)
+        cw, ch = self.cell_width, self.cell_height
+        tags = ("dia", tag)
+
+        self.create_rectangle(x + 1, y + 1, x + cw - 1, y + ch - 1,
+                              fill=bg, outline="#bdc3c7", tags=tags)
+        self.create_text(x + 4, y + 3, text=str(day), anchor="nw",
+                         fill="#2c3e50", font=self.day_font, tags=tags)
+        if nota:
+            self.create_text(x + cw - 3, y + 3, text=nota, anchor="ne",
+                             fill="#856404", font=("Arial", 7), tags=tags)
+
+        alto_evento = max(12, (ch - 22) // max(1, self.max_eventos))
+        ey = y + 19
+        for texto, color in list(eventos)[:self.max_eventos]:
+            self.create_rectangle(x + 3, ey, x + cw - 3, ey + alto_evento - 2,
+                                  fill=color, outline=color, tags=tags + ("evento",))
+            self.create_text(x + cw // 2, ey + (alto_evento - 2) // 2, text=texto[:15],
+                             fill="white", font=self.event_font, tags=tags + ("evento",))
+            ey += alto_evento
+
+        if len(eventos) > self.max_eventos:
+            self.create_text(x + cw - 3, y + ch - 3, text=f"+{len(eventos) - self.max_eventos} más",
+                             anchor="se", fill="gray", font=("Arial", 6), tags=tags)
+        elif not eventos and placeholder:
+            self.create_text(x + cw // 2, y + ch // 2 + 6, text=placeholder, justify="center",
+                             fill="#999", font=("Arial", 9), tags=tags)
+        return True
+
+    def fecha_en(self, x_root: int, y_root: int) -> Optional[date]:
+        """
+        Fecha del día bajo unas coordenadas de pantalla.
+
+        Returns:
+            date o None si el punto no cae sobre un día del mes
+        """
+        if self.year is None:
+            return None
+        x = self.canvasx(x_root - self.winfo_rootx())
+        y = self.canvasy(y_root - self.winfo_rooty()) - self.header_height
+        if x < 0 or y < 0:
+            return None
+        week_num, col = int(y // self.cell_height), int(x // self.cell_width)
+        if week_num >= len(self.matrix) or col >= 7:
+            return None
+        day = self.matrix[week_num][col]
+        return date(self.year, self.month, day) if day else None
+
+    def evento_en(self, x_root: int, y_root: int) -> Optional[date]:
+        """Fecha del evento dibujado bajo unas coordenadas de pantalla, si lo hay"""
+        x = self.canvasx(x_root - self.winfo_rootx())
+        y = self.canvasy(y_root - self.winfo_rooty())
+        for item in self.find_overlapping(x, y, x, y):
+            if "evento" in self.gettags(item):
+                return self.fecha_en(x_root, y_root)
+        return None
+
+
+def fecha_bajo_puntero(widget, x_root: int, y_root: int) -> Optional[date]:
+    """
+    Fecha asociada al widget bajo el puntero, sea cual sea el renderer.
+
+    Los widgets de día llevan el atributo fecha_asignada; en un
+    CanvasMonthGrid la fecha se calcula a partir de las coordenadas.
+    """
+    if widget is None:
+        return None
+    if isinstance(widget, CanvasMonthGrid):
+        return widget.fecha_en(x_root, y_root)
+    return getattr(widget, 'fecha_asignada', None)
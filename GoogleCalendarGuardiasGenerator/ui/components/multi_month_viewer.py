@@ -6,12 +6,18 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
 import calendar as cal
+import logging
+from typing import Optional
+from ui.components.canvas_month import CanvasMonthGrid, RENDERERS, fecha_bajo_puntero
+
+logger = logging.getLogger(__name__)
 
 
 class MultiMonthViewer(tk.Frame):
     """Componente para mostrar vista de múltiples meses"""
     
-    def __init__(self, parent, calendar_manager, colors=None, num_months=7, parent_tab=None, **kwargs):
+    def __init__(self, parent, calendar_manager, colors=None, num_months=7, parent_tab=None,
+                 renderer="widgets", **kwargs):
         """
         Inicializa el visor multi-mes.
         
@@ -19,21 +25,34 @@ class MultiMonthViewer(tk.Frame):
             parent: Widget padre
             calendar_manager: Instancia de CalendarManager
             colors: Diccionario de colores por técnico {nombre: #hexcolor}
-            num_months: Número de meses a mostrar (default: 7)
+            num_months: Número de meses a mostrar (default: 7). Solo se
+                construyen los que entran en pantalla, así que admite
+                horizontes largos (24-36 meses)
             parent_tab: Referencia al tab padre para callbacks
+            renderer: "widgets" (Frame/Label por día) o "canvas" (un Canvas por mes)
         """
+        if renderer not in RENDERERS:
+            raise ValueError(f"Renderer desconocido: {renderer}")
         super().__init__(parent, **kwargs)
         self.calendar_manager = calendar_manager
         self.colors = colors or {}
         self.num_months = num_months
         self.current_offset = 0  # Empezar en el mes actual
         self.parent_tab = parent_tab
+        self.renderer = renderer
         self.dragging_tecnico = None
         
         # Variables para drag-and-drop
         self.dragging = None
         self.drag_label = None
         
+        # Virtualización: solo existen los paneles de los meses visibles
+        self.start_date = None
+        self.row_height = 400  # Alto de cada fila de 2 meses (se ajusta al medir)
+        self.visible_panels = {}  # {índice de mes: panel}
+        self.panel_pool = []  # Paneles liberados, listos para reutilizar
+        self._viewport_job = None
+        
         self._create_widgets()
         self.refresh()  # Cargar vista inicial
         
@@ -69,6 +88,16 @@ class MultiMonthViewer(tk.Frame):
                  command=lambda: self.navigate(12),
                  bg="#2c3e50", fg="white", font=("Arial", 9)).pack(side=tk.LEFT, padx=2)
         
+        # Horizonte visible
+        tk.Label(left_nav, text="Meses:", bg="#34495e", fg="white",
+                font=("Arial", 9)).pack(side=tk.LEFT, padx=(10, 2))
+        self.num_months_var = tk.StringVar(value=str(self.num_months))
+        horizonte = ttk.Combobox(left_nav, textvariable=self.num_months_var, width=4,
+                                 values=["7", "12", "24", "36"], state="readonly")
+        horizonte.pack(side=tk.LEFT)
+        horizonte.bind("<<ComboboxSelected>>",
+                       lambda e: self.set_num_months(int(self.num_months_var.get())))
+        
         # Frame derecho: botones de técnicos (si parent_tab existe)
         if self.parent_tab:
             right_nav = tk.Frame(nav_frame, bg="#34495e")
@@ -91,24 +120,17 @@ class MultiMonthViewer(tk.Frame):
         scroll_frame = tk.Frame(self, bg="#ecf0f1")
         scroll_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Canvas con scrollbar
+        # Canvas con scrollbar: los meses se colocan como ventanas del canvas
         self.canvas = tk.Canvas(scroll_frame, bg="#ecf0f1")
-        scrollbar = ttk.Scrollbar(scroll_frame, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas, bg="#ecf0f1")
-        
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
-        
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(scroll_frame, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yview)
+        self.canvas.bind("<Configure>", lambda e: self._layout())
         
         # Habilitar scroll con rueda del ratón
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
         
         self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self.scrollbar.pack(side="right", fill="y")
         
     def navigate(self, months_delta: int):
         """
@@ -120,6 +142,12 @@ class MultiMonthViewer(tk.Frame):
         self.current_offset += months_delta
         self.refresh()
         
+    def set_num_months(self, num_months: int):
+        """Cambia el número de meses del horizonte visible"""
+        self.num_months = num_months
+        self.canvas.yview_moveto(0)
+        self.refresh()
+        
     def reset_to_today(self):
         """Resetea la vista al mes actual"""
         self.current_offset = 0  # Mes actual
@@ -168,8 +196,8 @@ class MultiMonthViewer(tk.Frame):
         
         widget = self.winfo_toplevel().winfo_containing(event.x_root, event.y_root)
         
-        if widget and hasattr(widget, 'fecha_asignada'):
-            fecha_obj = widget.fecha_asignada
+        fecha_obj = fecha_bajo_puntero(widget, event.x_root, event.y_root)
+        if fecha_obj:
             fecha = fecha_obj.strftime('%Y-%m-%d')
             
             # Crear evento de guardia
@@ -184,18 +212,12 @@ class MultiMonthViewer(tk.Frame):
                 'fecha_edicion': datetime.now().isoformat()
             }
             
-            # Verificar si ya existe un evento y eliminarlo (sobrescribir)
-            year_month = fecha[:7]
-            day_str = fecha[8:10]
-            
-            if year_month in self.calendar_manager.data['meses']:
-                if day_str in self.calendar_manager.data['meses'][year_month]['dias']:
-                    # Limpiar eventos previos del día
-                    self.calendar_manager.data['meses'][year_month]['dias'][day_str]['eventos'] = []
+            # Eliminar eventos previos del día (sobrescribir)
+            self.calendar_manager.remove_events(fecha)
             
-            # Agregar nuevo evento
+            # Agregar nuevo evento (se persiste en segundo plano)
             self.calendar_manager.add_event(fecha, evento)
-            self.calendar_manager.save_data()
+            self.calendar_manager.request_save()
             
             # Actualizar status bar del padre si existe
             if self.parent_tab and hasattr(self.parent_tab, 'status_label'):
@@ -217,31 +239,28 @@ class MultiMonthViewer(tk.Frame):
             return
         
         fecha = datetime(year, month, day).strftime('%Y-%m-%d')
-        year_month = fecha[:7]
-        day_str = fecha[8:10]
         
         # Eliminar eventos del día
-        if year_month in self.calendar_manager.data['meses']:
-            if day_str in self.calendar_manager.data['meses'][year_month]['dias']:
-                self.calendar_manager.data['meses'][year_month]['dias'][day_str]['eventos'] = []
-                self.calendar_manager.save_data()
-                
-                # Actualizar status bar
-                if self.parent_tab and hasattr(self.parent_tab, 'status_label'):
-                    self.parent_tab.status_label.config(
-                        text=f"🗑️ Guardia eliminada del {fecha}",
-                        bg="#e74c3c", fg="white"
-                    )
-                
-                # Refrescar vista
-                self.refresh()
+        if self.calendar_manager.remove_events(fecha):
+            self.calendar_manager.request_save()
+            
+            # Actualizar status bar
+            if self.parent_tab and hasattr(self.parent_tab, 'status_label'):
+                self.parent_tab.status_label.config(
+                    text=f"🗑️ Guardia eliminada del {fecha}",
+                    bg="#e74c3c", fg="white"
+                )
+            
+            # Refrescar vista
+            self.refresh()
     
     def refresh(self):
-        """Refresca la visualización de meses"""
-        # Limpiar frame
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        """
+        Refresca la visualización de meses.
         
+        Solo se construyen (o reutilizan) los paneles de los meses visibles;
+        los datos de cada mes se piden a CalendarManager al mostrarlo.
+        """
         # Calcular fecha de inicio
         today = datetime.now()
         start_month = today.month + self.current_offset
@@ -255,46 +274,255 @@ class MultiMonthViewer(tk.Frame):
             start_month -= 12
             start_year += 1
         
-        start_date = datetime(start_year, start_month, 1)
-        
-        # Obtener datos de múltiples meses
-        months_data = self.calendar_manager.get_multi_month_view(start_date, self.num_months)
+        self.start_date = datetime(start_year, start_month, 1)
+        self._layout(reload=True)
+    
+    def refresh_months(self, meses) -> int:
+        """
+        Vuelve a cargar solo los meses visibles que han cambiado (p. ej. tras
+        una importación automática), sin recolocar el resto.
         
-        # Renderizar meses en grid (2 columnas para 7 meses)
-        for idx, month_data in enumerate(months_data):
-            row = idx // 2
-            col = idx % 2
+        Args:
+            meses: Meses modificados como cadenas YYYY-MM
             
-            month_frame = self._create_month_frame(month_data)
-            month_frame.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
+        Returns:
+            int: Número de celdas reconfiguradas
+        """
+        actualizadas = 0
+        for index, panel in self.visible_panels.items():
+            inicio = self._month_start(index)
+            if inicio.strftime('%Y-%m') in meses:
+                month_data = self.calendar_manager.get_multi_month_view(inicio, 1)[0]
+                actualizadas += panel.update(month_data)
+        return actualizadas
+    
+    def _month_start(self, index: int) -> datetime:
+        """Primer día del mes en la posición index del horizonte"""
+        year, month = divmod(self.start_date.month - 1 + index, 12)
+        return datetime(self.start_date.year + year, month + 1, 1)
+    
+    def _on_yview(self, first, last):
+        """Sincroniza la scrollbar y programa el renderizado de la zona visible"""
+        self.scrollbar.set(first, last)
+        if self._viewport_job is None:
+            self._viewport_job = self.after_idle(self._render_viewport)
+    
+    def _layout(self, reload: bool = False):
+        """Recalcula el área desplazable y recoloca los meses visibles"""
+        num_rows = (self.num_months + 1) // 2  # 2 columnas
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(),
+                                            num_rows * self.row_height))
+        self._render_viewport(reload=reload, relayout=True)
+    
+    def _render_viewport(self, reload: bool = False, relayout: bool = False):
+        """
+        Materializa los meses que intersectan la zona visible (más una fila
+        de margen) y devuelve al pool los que han salido de ella.
         
-        # Configurar expansión del grid
-        for i in range(2):
-            self.scrollable_frame.columnconfigure(i, weight=1)
+        Args:
+            reload: Volver a pedir los datos de los meses ya visibles
+            relayout: Recolocar los paneles aunque no hayan cambiado de mes
+        """
+        self._viewport_job = None
+        if self.start_date is None:
+            return
         
-    def _create_month_frame(self, month_data: dict) -> tk.Frame:
+        top = self.canvas.canvasy(0)
+        bottom = top + max(self.canvas.winfo_height(), self.row_height)
+        first_row = max(0, int(top // self.row_height) - 1)
+        last_row = int(bottom // self.row_height) + 1
+        needed = set(range(first_row * 2, min((last_row + 1) * 2, self.num_months)))
+        
+        # Liberar los meses que ya no se ven
+        for index in [i for i in self.visible_panels if i not in needed]:
+            panel = self.visible_panels.pop(index)
+            self.canvas.itemconfigure(panel.window, state="hidden")
+            self.panel_pool.append(panel)
+        
+        col_width = max(self.canvas.winfo_width() // 2, 1)
+        celdas_actualizadas = 0
+        nuevos = []
+        for index in sorted(needed):
+            panel = self.visible_panels.get(index)
+            if panel is None:
+                panel = self.panel_pool.pop() if self.panel_pool else self._new_panel()
+                self.visible_panels[index] = panel
+                nuevos.append(panel)
+            elif not (reload or relayout):
+                continue
+            
+            if panel in nuevos or reload:
+                # Cargar el mes bajo demanda
+                month_data = self.calendar_manager.get_multi_month_view(self._month_start(index), 1)[0]
+                celdas_actualizadas += panel.update(month_data)
+            
+            row, col = divmod(index, 2)
+            self.canvas.coords(panel.window, col * col_width + 10, row * self.row_height + 10)
+            # Ancho 0 = tamaño natural (el canvas aún no tiene tamaño)
+            ancho = col_width - 20 if col_width > 40 else 0
+            self.canvas.itemconfigure(panel.window, width=ancho, state="normal")
+        
+        if nuevos:
+            logger.debug(f"Vista multi-mes: {len(self.visible_panels)} meses visibles, "
+                         f"{celdas_actualizadas} celdas actualizadas")
+            # Ajustar el alto de fila al panel más alto medido
+            self.update_idletasks()
+            alto = max(p.frame.winfo_reqheight() for p in nuevos) + 20
+            if alto > self.row_height:
+                self.row_height = alto
+                self._layout()
+    
+    def _new_panel(self):
+        """Crea un panel de mes como ventana del canvas"""
+        panel_cls = _CanvasMonthPanel if self.renderer == "canvas" else _MonthPanel
+        panel = panel_cls(self, self.canvas)
+        panel.window = self.canvas.create_window(0, 0, window=panel.frame, anchor="nw")
+        return panel
+
+
+def _month_counter(month_data: dict) -> dict:
+    """
+    Calcula las estadísticas por técnico de un mes.
+    
+    Returns:
+        dict: {tecnico: {'dias': [día, ...], 'total': guardias}}
+    """
+    counter = {}
+    for day_str, day_data in month_data['dias'].items():
+        for evento in day_data.get('eventos', []):
+            tecnico = evento.get('tecnico', '')
+            if not tecnico:
+                continue
+            info = counter.setdefault(tecnico, {'dias': [], 'total': 0})
+            info['dias'].append(int(day_str))
+            
+            # Detectar si es guardia de TARDE (suma 0.5 en lugar de 1)
+            titulo = evento.get('titulo', '').upper()
+            info['total'] += 0.5 if 'TARDE' in titulo else 1
+    return counter
+
+
+class _DayCell:
+    """Celda de día reutilizable: sus widgets se crean una vez y se reconfiguran"""
+    
+    def __init__(self, viewer, parent, row: int, column: int):
+        self.viewer = viewer
+        self.row = row
+        self.column = column
+        self.fecha = None
+        self.firma = None  # Contenido mostrado actualmente
+        
+        self.frame = tk.Frame(parent, bg="#ecf0f1")
+        self.frame.grid(row=row, column=column, sticky="nsew", padx=1, pady=1)
+        self.day_label = tk.Label(self.frame, font=("Arial", 9, "bold"), fg="#2c3e50", cursor="hand2")
+        self.event_labels = []
+        for _ in range(2):  # Máximo 2 eventos visibles
+            label = tk.Label(self.frame, font=("Arial", 7), fg="white",
+                             relief=tk.RAISED, bd=1, cursor="hand2")
+            # Bind para borrar guardia con click (usa la fecha actual de la celda)
+            label.bind("<Button-1>", self._on_event_click)
+            self.event_labels.append(label)
+        self.more_label = tk.Label(self.frame, font=("Arial", 6), fg="gray")
+    
+    def _on_event_click(self, event):
+        if self.fecha:
+            self.viewer._delete_event(event, self.fecha.year, self.fecha.month, self.fecha.day)
+    
+    def update(self, fecha: Optional[datetime], eventos: list, visible: bool = True) -> bool:
         """
-        Crea frame para un mes individual.
+        Muestra la fecha y eventos dados si difieren de los actuales.
         
         Args:
-            month_data: Datos del mes desde CalendarManager
+            fecha: Día de la celda o None para una celda vacía
+            eventos: Eventos del día
+            visible: False si la semana no existe en el mes mostrado
             
         Returns:
-            Frame con la visualización del mes
+            bool: True si la celda se ha reconfigurado
         """
-        frame = tk.LabelFrame(self.scrollable_frame, 
-                             text=month_data['month_name'],
-                             font=("Arial", 11, "bold"),
-                             bg="white",
-                             relief=tk.RAISED,
-                             bd=2)
+        visibles = []
+        for evento in eventos[:2]:
+            # Mostrar el nombre del técnico si está disponible, sino el título
+            texto = evento.get('tecnico', evento.get('titulo', 'Evento'))[:15]
+            color = self.viewer.colors.get(evento.get('tecnico', ''), "#3498db")
+            visibles.append((texto, color))
+        firma = (visible, fecha, tuple(visibles), len(eventos))
+        if firma == self.firma:
+            return False
+        self.firma = firma
+        self.fecha = fecha
+        
+        if not visible:
+            self.frame.grid_remove()
+            return True
+        self.frame.grid()
+        
+        for widget in (self.day_label, self.more_label, *self.event_labels):
+            widget.pack_forget()
+        
+        widgets = (self.frame, self.day_label, *self.event_labels)
+        if fecha is None:
+            # Día vacío
+            self.frame.config(bg="#ecf0f1", relief=tk.FLAT, cursor="")
+            for widget in widgets:
+                widget.fecha_asignada = None
+            return True
+        
+        # Color de fondo según día
+        bg_color = "#ffe6e6" if self.column >= 5 else "white"
+        self.frame.config(bg=bg_color, relief=tk.RIDGE, bd=1, cursor="hand2")
+        # Asignar fecha a los widgets para drag-and-drop
+        for widget in widgets:
+            widget.fecha_asignada = fecha
+        
+        self.day_label.config(text=str(fecha.day), bg=bg_color)
+        self.day_label.pack(anchor="nw", padx=2, pady=2)
+        
+        for label, (texto, color) in zip(self.event_labels, visibles):
+            label.config(text=texto, bg=color)
+            label.pack(fill=tk.X, padx=2, pady=1)
+        
+        if len(eventos) > 2:
+            self.more_label.config(text=f"+{len(eventos)-2} más", bg=bg_color)
+            self.more_label.pack(pady=1)
+        return True
+
+
+class _MonthPanel:
+    """Panel de un mes (calendario + estadísticas) que se actualiza en el sitio"""
+    
+    MAX_SEMANAS = 6
+    
+    def __init__(self, viewer, parent):
+        self.viewer = viewer
+        self.firma_stats = None
+        self.window = None  # Item del canvas que contiene el panel
+        
+        self.frame = tk.LabelFrame(parent, font=("Arial", 11, "bold"),
+                                   bg="white", relief=tk.RAISED, bd=2)
         
         # Contenedor principal con dos secciones: calendario y estadísticas
-        main_container = tk.Frame(frame, bg="white")
+        main_container = tk.Frame(self.frame, bg="white")
         main_container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Grid de calendario (izquierda)
-        cal_grid = tk.Frame(main_container, bg="white")
+        self._create_grid(main_container)
+        
+        # Panel de estadísticas (derecha)
+        stats_panel = tk.Frame(main_container, bg="#ecf0f1", width=180, relief=tk.SUNKEN, bd=2)
+        stats_panel.pack(side=tk.RIGHT, fill=tk.Y, padx=(5, 0))
+        stats_panel.pack_propagate(False)
+        
+        # Título de estadísticas
+        tk.Label(stats_panel, text="Técnicos", font=("Arial", 10, "bold"),
+                bg="#34495e", fg="white", pady=5).pack(fill=tk.X)
+        
+        self.stats_body = tk.Frame(stats_panel, bg="#ecf0f1")
+        self.stats_body.pack(fill=tk.BOTH, expand=True)
+    
+    def _create_grid(self, parent):
+        """Crea las celdas reutilizables del calendario"""
+        cal_grid = tk.Frame(parent, bg="white")
         cal_grid.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
         
         # Encabezados de días
@@ -304,91 +532,63 @@ class MultiMonthViewer(tk.Frame):
             tk.Label(cal_grid, text=day_name, font=("Arial", 9, "bold"),
                     bg=bg_color, fg="white", width=8).grid(row=0, column=col, sticky="ew", padx=1, pady=1)
         
-        # Obtener días del mes
-        year = month_data['year']
-        month = month_data['month']
-        cal_matrix = cal.monthcalendar(year, month)
-        
-        # Renderizar días
-        for week_num, week in enumerate(cal_matrix):
-            for day_num, day in enumerate(week):
-                if day == 0:
-                    # Día vacío
-                    tk.Label(cal_grid, text="", bg="#ecf0f1").grid(
-                        row=week_num+1, column=day_num, sticky="nsew", padx=1, pady=1)
-                else:
-                    # Día con posibles eventos
-                    day_str = f"{day:02d}"
-                    eventos = month_data['dias'].get(day_str, {}).get('eventos', [])
-                    
-                    # Color de fondo según día
-                    bg_color = "#ffe6e6" if day_num >= 5 else "white"
-                    
-                    day_cell = tk.Frame(cal_grid, bg=bg_color, relief=tk.RIDGE, bd=1, cursor="hand2")
-                    day_cell.grid(row=week_num+1, column=day_num, sticky="nsew", padx=1, pady=1)
-                    
-                    # Asignar fecha al widget para drag-and-drop
-                    day_cell.fecha_asignada = datetime(year, month, day)
-                    
-                    # Número del día
-                    day_label = tk.Label(day_cell, text=str(day), font=("Arial", 9, "bold"),
-                            bg=bg_color, fg="#2c3e50", cursor="hand2")
-                    day_label.pack(anchor="nw", padx=2, pady=2)
-                    day_label.fecha_asignada = datetime(year, month, day)
-                    
-                    # Mostrar eventos
-                    if eventos:
-                        for evento in eventos[:2]:  # Máximo 2 eventos visibles
-                            # Mostrar el nombre del técnico si está disponible, sino el título
-                            texto = evento.get('tecnico', evento.get('titulo', 'Evento'))[:15]
-                            tecnico = evento.get('tecnico', '')
-                            color = self.colors.get(tecnico, "#3498db")
-                            event_label = tk.Label(day_cell, text=texto, 
-                                    font=("Arial", 7),
-                                    bg=color, fg="white",
-                                    relief=tk.RAISED, bd=1, cursor="hand2")
-                            event_label.pack(fill=tk.X, padx=2, pady=1)
-                            event_label.fecha_asignada = datetime(year, month, day)
-                            # Bind para borrar guardia con click
-                            event_label.bind("<Button-1>", lambda e, y=year, m=month, d=day: self._delete_event(e, y, m, d))
-                        
-                        if len(eventos) > 2:
-                            tk.Label(day_cell, text=f"+{len(eventos)-2} más", 
-                                    font=("Arial", 6), fg="gray").pack(pady=1)
+        self.cells = [[_DayCell(viewer, cal_grid, week + 1, col) for col in range(7)]
+                      for week in range(self.MAX_SEMANAS)]
         
         # Configurar expansión de columnas
         for i in range(7):
             cal_grid.columnconfigure(i, weight=1, minsize=70)
+    
+    def update(self, month_data: dict) -> int:
+        """
+        Muestra los datos de un mes reutilizando los widgets existentes.
         
-        # Panel de estadísticas (derecha)
-        stats_panel = tk.Frame(main_container, bg="#ecf0f1", width=180, relief=tk.SUNKEN, bd=2)
-        stats_panel.pack(side=tk.RIGHT, fill=tk.Y, padx=(5, 0))
-        stats_panel.pack_propagate(False)
+        Args:
+            month_data: Datos del mes desde CalendarManager
+            
+        Returns:
+            int: Número de celdas reconfiguradas
+        """
+        self.frame.config(text=month_data['month_name'])
+        actualizadas = self._update_grid(month_data)
+        self._update_stats(_month_counter(month_data))
+        return actualizadas
+    
+    def _update_grid(self, month_data: dict) -> int:
+        """Reconfigura las celdas de día que han cambiado"""
+        year = month_data['year']
+        month = month_data['month']
+        cal_matrix = cal.monthcalendar(year, month)
         
-        # Título de estadísticas
-        tk.Label(stats_panel, text="Técnicos", font=("Arial", 10, "bold"),
-                bg="#34495e", fg="white", pady=5).pack(fill=tk.X)
+        actualizadas = 0
+        for week_num, week_cells in enumerate(self.cells):
+            week = cal_matrix[week_num] if week_num < len(cal_matrix) else None
+            for day_num, cell in enumerate(week_cells):
+                if week is None:
+                    actualizadas += cell.update(None, [], visible=False)
+                elif week[day_num] == 0:
+                    actualizadas += cell.update(None, [])
+                else:
+                    day = week[day_num]
+                    eventos = month_data['dias'].get(f"{day:02d}", {}).get('eventos', [])
+                    actualizadas += cell.update(datetime(year, month, day), eventos)
+        return actualizadas
+    
+    def _update_stats(self, counter: dict):
+        """Reconstruye el panel de estadísticas solo si ha cambiado"""
+        colors = self.viewer.colors
+        firma = tuple((tecnico, tuple(sorted(info['dias'])), info['total'], colors.get(tecnico))
+                      for tecnico, info in sorted(counter.items()))
+        if firma == self.firma_stats:
+            return
+        self.firma_stats = firma
         
-        # Calcular estadísticas por técnico
-        counter = {}
-        for day_str, day_data in month_data['dias'].items():
-            for evento in day_data.get('eventos', []):
-                tecnico = evento.get('tecnico', '')
-                if tecnico and tecnico not in counter:
-                    counter[tecnico] = {'dias': [], 'total': 0}
-                
-                if tecnico:
-                    day_num = int(day_str)
-                    counter[tecnico]['dias'].append(day_num)
-                    
-                    # Detectar si es guardia de TARDE (suma 0.5 en lugar de 1)
-                    titulo = evento.get('titulo', '').upper()
-                    es_tarde = 'TARDE' in titulo
-                    counter[tecnico]['total'] += 0.5 if es_tarde else 1
+        for widget in self.stats_body.winfo_children():
+            widget.destroy()
         
         if counter:
             # Frame con scroll para estadísticas
-            stats_frame = tk.Frame(stats_panel, bg="white")
+            stats_frame = tk.Frame(self.stats_body, bg="white")
             stats_frame.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
             
             # Encabezados
@@ -404,7 +604,7 @@ class MultiMonthViewer(tk.Frame):
             
             # Filas de técnicos
             for i, (tecnico, info) in enumerate(sorted(counter.items())):
-                color = self.colors.get(tecnico, "#3498db")
+                color = colors.get(tecnico, "#3498db")
                 row_bg = "#ecf0f1" if i % 2 == 0 else "white"
                 
                 row = tk.Frame(stats_frame, bg=row_bg)
@@ -422,7 +622,35 @@ class MultiMonthViewer(tk.Frame):
                 tk.Label(row, text=total_str, font=("Arial", 7, "bold"),
                         bg=row_bg, fg="#2c3e50", width=4, anchor="center").pack(side=tk.LEFT)
         else:
-            tk.Label(stats_panel, text="Sin guardias", font=("Arial", 8, "italic"),
+            tk.Label(self.stats_body, text="Sin guardias", font=("Arial", 8, "italic"),
                     bg="white", fg="#999", pady=10).pack(fill=tk.BOTH, expand=True)
-        
-        return frame
+
+
+class _CanvasMonthPanel(_MonthPanel):
+    """Panel de mes cuyo calendario se dibuja en un único Canvas"""
+    
+    def _create_grid(self, parent):
+        self.canvas_grid = CanvasMonthGrid(parent, cursor="hand2")
+        self.canvas_grid.pack(side=tk.LEFT, anchor="n", padx=(0, 5))
+        # Click en un evento para borrar la guardia (detección por coordenadas)
+        self.canvas_grid.bind("<Button-1>", self._on_click)
+    
+    def _on_click(self, event):
+        fecha = self.canvas_grid.evento_en(event.x_root, event.y_root)
+        if fecha:
+            self.viewer._delete_event(event, fecha.year, fecha.month, fecha.day)
+    
+    def _update_grid(self, month_data: dict) -> int:
+        year = month_data['year']
+        month = month_data['month']
+        self.canvas_grid.set_month(year, month)
+        
+        actualizadas = 0
+        for day in range(1, cal.monthrange(year, month)[1] + 1):
+            eventos = month_data['dias'].get(f"{day:02d}", {}).get('eventos', [])
+            visibles = [(evento.get('tecnico', evento.get('titulo', 'Evento')),
+                         self.viewer.colors.get(evento.get('tecnico', ''), "#3498db"))
+                        for evento in eventos]
+            bg_color = "#ffe6e6" if datetime(year, month, day).weekday() >= 5 else "white"
+            actualizadas += self.canvas_grid.set_day(day, bg_color, visibles)
+        return actualizadas
@@ -6,17 +6,28 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta
 import calendar
-import csv
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
+from models.csv_export import FORMATO_DIA_COMPLETO, iter_assignment_events, write_csv
+from models.ics_export import write_ics
+from models.rotation_engine import auto_assign
 from utils.file_utils import load_tecnicos, load_festivos, get_technician_colors
+from ui.components.canvas_month import CanvasMonthGrid, RENDERERS, fecha_bajo_puntero
 
 
 class GeneratorTab(tk.Frame):
     """Pestaña para generar y asignar guardias"""
     
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, renderer="widgets", **kwargs):
+        """
+        Args:
+            parent: Widget padre
+            renderer: "widgets" (Frame/Label por día) o "canvas" (un único Canvas)
+        """
         super().__init__(parent, **kwargs)
+        if renderer not in RENDERERS:
+            raise ValueError(f"Renderer desconocido: {renderer}")
+        self.renderer = renderer
         
         # Cargar datos
         self.tecnicos = load_tecnicos()
@@ -30,6 +41,14 @@ class GeneratorTab(tk.Frame):
         self.year = 2026
         self.month = 3  # Marzo
         
+        # Vista: widgets del mes mostrado y cambios pendientes de pintar
+        self.day_cells = {}  # Días asignables: {fecha: {'bg': str, 'label' o 'nota'}}
+        self.month_canvas = None
+        self.stats_rows = {}  # {tecnico: {'dias': Label, 'total': Label}}
+        self._dirty_dates = set()
+        self._dirty_tecnicos = set()
+        self._redraw_job = None
+        
         self._create_widgets()
         self._draw_calendar()
     
@@ -223,17 +242,34 @@ class GeneratorTab(tk.Frame):
         tk.Button(actions, text="💾 Exportar CSV", command=self._export_csv,
                  bg="#2ecc71", fg="white", font=("Arial", 11, "bold"),
                  relief=tk.RAISED, bd=3, cursor="hand2", pady=8).pack(fill=tk.X, pady=3)
+        
+        tk.Button(actions, text="📅 Exportar ICS", command=self._export_ics,
+                 bg="#27ae60", fg="white", font=("Arial", 10, "bold"),
+                 relief=tk.RAISED, bd=3, cursor="hand2", pady=6).pack(fill=tk.X, pady=3)
     
     def _draw_calendar(self):
-        """Dibuja el calendario del mes actual"""
-        # Limpiar
-        for widget in self.calendar_frame.winfo_children():
-            widget.destroy()
+        """Dibuja el calendario del mes actual (redibujado completo)"""
+        # Un redibujado completo incluye cualquier cambio pendiente
+        if self._redraw_job:
+            self.after_cancel(self._redraw_job)
+            self._redraw_job = None
+        self._dirty_dates.clear()
+        self._dirty_tecnicos.clear()
         
         # Actualizar título
         months = ["", "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
                  "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"]
         self.month_label.config(text=f"{months[self.month]} {self.year}")
+        self.day_cells = {}
+        
+        if self.renderer == "canvas":
+            self._draw_calendar_canvas()
+            self._update_stats()
+            return
+        
+        # Limpiar
+        for widget in self.calendar_frame.winfo_children():
+            widget.destroy()
         
         # Encabezados
         days = ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"]
@@ -265,6 +301,46 @@ class GeneratorTab(tk.Frame):
         # Actualizar estadísticas
         self._update_stats()
     
+    def _draw_calendar_canvas(self):
+        """Dibuja el mes actual sobre un único Canvas (renderer "canvas")"""
+        if self.month_canvas is None:
+            self.month_canvas = CanvasMonthGrid(self.calendar_frame, cell_width=120, cell_height=80,
+                                                header_height=30, max_eventos=1,
+                                                day_font=("Arial", 11, "bold"),
+                                                event_font=("Arial", 10, "bold"))
+            self.month_canvas.pack(anchor="n")
+            # Doble click sobre una guardia para quitarla (detección por coordenadas)
+            self.month_canvas.bind("<Double-Button-1>", self._on_canvas_double_click)
+        
+        self.month_canvas.set_month(self.year, self.month)
+        for day in range(1, calendar.monthrange(self.year, self.month)[1] + 1):
+            fecha = datetime(self.year, self.month, day).date()
+            bg_color, nota, asignable = self._day_style(fecha)
+            if asignable:
+                self.day_cells[fecha] = {'bg': bg_color, 'nota': nota}
+                self._paint_day_cell(fecha)
+            else:
+                self.month_canvas.set_day(day, bg_color, nota=nota)
+    
+    def _on_canvas_double_click(self, event):
+        fecha = self.month_canvas.evento_en(event.x_root, event.y_root)
+        if fecha:
+            self._remove_assignment(fecha)
+    
+    def _day_style(self, fecha):
+        """
+        Aspecto de un día.
+        
+        Returns:
+            tuple: (color de fondo, texto del festivo, admite asignación)
+        """
+        is_weekend = fecha.weekday() >= 5
+        is_holiday = fecha in self.festivos
+        bg_color = "#ffe6e6" if is_weekend else ("#fff3cd" if is_holiday else "white")
+        nota = f"🎉{self.festivos[fecha] or 'Festivo'}" if is_holiday else ""
+        # Zona de asignación (solo fines de semana y festivos laborables)
+        return bg_color, nota, is_weekend or is_holiday
+    
     def _create_day_cell(self, row: int, col: int, day: int, fecha: datetime):
         """Crea una celda de día en el calendario"""
         is_weekend = col >= 5
@@ -296,25 +372,75 @@ class GeneratorTab(tk.Frame):
             drop_frame.fecha_asignada = fecha
             frame.fecha_asignada = fecha
             
-            if fecha in self.asignaciones:
-                tecnico = self.asignaciones[fecha]['tecnico']
-                color = self.asignaciones[fecha]['color']
-                lbl = tk.Label(drop_frame, text=tecnico, font=("Arial", 10, "bold"),
-                              bg=color, fg="white", relief=tk.RAISED, bd=2, pady=5)
-                lbl.pack(fill=tk.BOTH, expand=True)
-                lbl.bind("<Double-Button-1>", lambda e, f=fecha: self._remove_assignment(f))
-                lbl.fecha_asignada = fecha
-            else:
-                placeholder = tk.Label(drop_frame, text="Arrastra\naquí",
-                                      font=("Arial", 9), bg=bg_color, fg="#999")
-                placeholder.pack(fill=tk.BOTH, expand=True)
-                placeholder.fecha_asignada = fecha
+            # Un único label por celda: se reconfigura al cambiar la asignación
+            lbl = tk.Label(drop_frame)
+            lbl.pack(fill=tk.BOTH, expand=True)
+            lbl.fecha_asignada = fecha
+            self.day_cells[fecha] = {'label': lbl, 'bg': bg_color}
+            self._paint_day_cell(fecha)
             
             drop_frame.bind("<ButtonRelease-1>", lambda e, f=fecha: self._drop_technician(e, f))
             frame.bind("<ButtonRelease-1>", lambda e, f=fecha: self._drop_technician(e, f))
         
         frame.grid(row=row, column=col, sticky="nsew", padx=1, pady=1)
     
+    def _paint_day_cell(self, fecha):
+        """Pinta en su celda la asignación actual de una fecha"""
+        cell = self.day_cells[fecha]
+        
+        if self.renderer == "canvas":
+            datos = self.asignaciones.get(fecha)
+            eventos = [(datos['tecnico'], datos['color'])] if datos else []
+            self.month_canvas.set_day(fecha.day, cell['bg'], eventos,
+                                      nota=cell['nota'], placeholder="Arrastra\naquí")
+            return
+        
+        lbl = cell['label']
+        
+        if fecha in self.asignaciones:
+            datos = self.asignaciones[fecha]
+            lbl.config(text=datos['tecnico'], font=("Arial", 10, "bold"),
+                      bg=datos['color'], fg="white", relief=tk.RAISED, bd=2, pady=5)
+            lbl.bind("<Double-Button-1>", lambda e, f=fecha: self._remove_assignment(f))
+        else:
+            lbl.config(text="Arrastra\naquí", font=("Arial", 9),
+                      bg=cell['bg'], fg="#999", relief=tk.FLAT, bd=0, pady=0)
+            lbl.unbind("<Double-Button-1>")
+    
+    def _set_assignment(self, fecha, tecnico: Optional[str] = None, color: Optional[str] = None):
+        """
+        Asigna (o quita, si tecnico es None) el técnico de una fecha y marca
+        como sucias solo la celda y las filas de estadísticas afectadas.
+        """
+        anterior = self.asignaciones.get(fecha)
+        if tecnico is None:
+            if anterior is None:
+                return
+            del self.asignaciones[fecha]
+        else:
+            self.asignaciones[fecha] = {'tecnico': tecnico, 'color': color}
+            self._dirty_tecnicos.add(tecnico)
+        if anterior:
+            self._dirty_tecnicos.add(anterior['tecnico'])
+        self._dirty_dates.add(fecha)
+        
+        # Agrupar los cambios hasta que Tk quede ocioso
+        if self._redraw_job is None:
+            self._redraw_job = self.after_idle(self._flush_dirty)
+    
+    def _flush_dirty(self):
+        """Aplica a la vista los cambios marcados como sucios"""
+        self._redraw_job = None
+        fechas, self._dirty_dates = self._dirty_dates, set()
+        tecnicos, self._dirty_tecnicos = self._dirty_tecnicos, set()
+        
+        for fecha in fechas:
+            if fecha in self.day_cells:
+                self._paint_day_cell(fecha)
+        
+        if any(f.year == self.year and f.month == self.month for f in fechas):
+            self._patch_stats(tecnicos)
+    
     def _start_drag(self, event, tecnico: str, color: str):
         """Inicia arrastre de técnico"""
         self.dragging = {'tecnico': tecnico, 'color': color}
@@ -349,9 +475,9 @@ class GeneratorTab(tk.Frame):
         self.winfo_toplevel().unbind("<ButtonRelease-1>")
         
         widget = self.winfo_toplevel().winfo_containing(event.x_root, event.y_root)
+        fecha = fecha_bajo_puntero(widget, event.x_root, event.y_root)
         
-        if widget and hasattr(widget, 'fecha_asignada'):
-            fecha = widget.fecha_asignada
+        if fecha in self.day_cells:
             
             if fecha.weekday() >= 5 and fecha in self.festivos:
                 if not messagebox.askyesno("Confirmar",
@@ -359,12 +485,8 @@ class GeneratorTab(tk.Frame):
                     self.dragging = None
                     return
             
-            self.asignaciones[fecha] = {
-                'tecnico': self.dragging['tecnico'],
-                'color': self.dragging['color']
-            }
+            self._set_assignment(fecha, self.dragging['tecnico'], self.dragging['color'])
             self.dragging = None
-            self._draw_calendar()
         else:
             self.dragging = None
     
@@ -376,24 +498,14 @@ class GeneratorTab(tk.Frame):
                     f"Este festivo cae en fin de semana.\n¿Asignar guardia de fin de semana a {self.dragging['tecnico']}?"):
                     return
             
-            self.asignaciones[fecha] = {
-                'tecnico': self.dragging['tecnico'],
-                'color': self.dragging['color']
-            }
-            self._draw_calendar()
+            self._set_assignment(fecha, self.dragging['tecnico'], self.dragging['color'])
     
     def _remove_assignment(self, fecha: datetime):
         """Quita asignación de una fecha"""
-        if fecha in self.asignaciones:
-            del self.asignaciones[fecha]
-            self._draw_calendar()
+        self._set_assignment(fecha, None)
     
-    def _update_stats(self):
-        """Actualiza estadísticas de guardias del mes"""
-        for widget in self.stats_frame.winfo_children():
-            widget.destroy()
-        
-        # Contar guardias
+    def _count_month(self) -> Dict[str, dict]:
+        """Cuenta las guardias del mes mostrado: {tecnico: {'dias', 'total'}}"""
         counter = {}
         for fecha, datos in self.asignaciones.items():
             if fecha.year == self.year and fecha.month == self.month:
@@ -404,6 +516,41 @@ class GeneratorTab(tk.Frame):
                 es_tarde = fecha in self.festivos and "TARDE" in self.festivos[fecha].upper()
                 counter[tecnico]['dias'].append(fecha.day)
                 counter[tecnico]['total'] += 0.5 if es_tarde else 1
+        return counter
+    
+    @staticmethod
+    def _stats_texts(info: dict):
+        """Textos de días y total de una fila de estadísticas"""
+        dias_str = ",".join(map(str, sorted(info['dias'])))
+        total_str = str(info['total']) if info['total'] % 1 != 0 else str(int(info['total']))
+        return dias_str, total_str
+    
+    def _patch_stats(self, tecnicos):
+        """
+        Actualiza solo las filas de estadísticas de los técnicos dados.
+        
+        Si aparece o desaparece un técnico del mes, el orden de las filas
+        cambia y se reconstruye el panel completo.
+        """
+        counter = self._count_month()
+        if set(counter) != set(self.stats_rows):
+            self._update_stats()
+            return
+        
+        for tecnico in tecnicos:
+            if tecnico in self.stats_rows:
+                dias_str, total_str = self._stats_texts(counter[tecnico])
+                self.stats_rows[tecnico]['dias'].config(text=dias_str)
+                self.stats_rows[tecnico]['total'].config(text=total_str)
+    
+    def _update_stats(self):
+        """Actualiza estadísticas de guardias del mes"""
+        for widget in self.stats_frame.winfo_children():
+            widget.destroy()
+        self.stats_rows = {}
+        
+        # Contar guardias
+        counter = self._count_month()
         
         if not counter:
             tk.Label(self.stats_frame, text="Sin guardias este mes",
@@ -432,13 +579,15 @@ class GeneratorTab(tk.Frame):
             tk.Label(row, text=tecnico, font=("Arial", 9, "bold"),
                     bg=color, fg="white", width=10, anchor="w", padx=5).pack(side=tk.LEFT)
             
-            dias_str = ",".join(map(str, sorted(info['dias'])))
-            tk.Label(row, text=dias_str, font=("Arial", 9),
-                    bg=row_bg, fg="#2c3e50", anchor="w", padx=5).pack(side=tk.LEFT, expand=True, fill=tk.X)
+            dias_str, total_str = self._stats_texts(info)
+            dias_lbl = tk.Label(row, text=dias_str, font=("Arial", 9),
+                               bg=row_bg, fg="#2c3e50", anchor="w", padx=5)
+            dias_lbl.pack(side=tk.LEFT, expand=True, fill=tk.X)
             
-            total_str = str(info['total']) if info['total'] % 1 != 0 else str(int(info['total']))
-            tk.Label(row, text=total_str, font=("Arial", 9, "bold"),
-                    bg=row_bg, fg="#2c3e50", width=5, anchor="center").pack(side=tk.LEFT)
+            total_lbl = tk.Label(row, text=total_str, font=("Arial", 9, "bold"),
+                                bg=row_bg, fg="#2c3e50", width=5, anchor="center")
+            total_lbl.pack(side=tk.LEFT)
+            self.stats_rows[tecnico] = {'dias': dias_lbl, 'total': total_lbl}
     
     def _prev_month(self):
         """Navega al mes anterior"""
@@ -482,88 +631,12 @@ class GeneratorTab(tk.Frame):
             messagebox.showerror("Error", "La fecha de fin debe ser posterior a la fecha de inicio")
             return
         
-        self.asignaciones = {}
-        
-        # Identificar días de guardia
-        dias_guardia = set()
-        fecha = fecha_inicio
-        while fecha <= fecha_fin:
-            if fecha.weekday() in [5, 6]:
-                dias_guardia.add(fecha)
-            fecha += timedelta(days=1)
-        
-        for fecha_festivo in self.festivos.keys():
-            if fecha_inicio <= fecha_festivo <= fecha_fin and fecha_festivo.weekday() < 5:
-                dias_guardia.add(fecha_festivo)
-        
-        # Agrupar en bloques consecutivos
-        dias_ordenados = sorted(dias_guardia)
-        bloques = []
-        bloque_actual = []
-        
-        for dia in dias_ordenados:
-            if not bloque_actual:
-                bloque_actual = [dia]
-            else:
-                if (dia - bloque_actual[-1]).days == 1:
-                    bloque_actual.append(dia)
-                else:
-                    bloques.append(bloque_actual)
-                    bloque_actual = [dia]
-        
-        if bloque_actual:
-            bloques.append(bloque_actual)
-        
-        # Asignar técnicos
-        ultimo_tecnico = self.ultimo_tecnico_var.get()
-        if ultimo_tecnico in self.tecnicos:
-            indice_tecnico = (self.tecnicos.index(ultimo_tecnico) + 1) % len(self.tecnicos)
-        else:
-            indice_tecnico = 0
-        
-        ultimo_tecnico_asignado = None
-        
-        for bloque in bloques:
-            num_dias = len(bloque)
-            
-            tecnico_inicial = indice_tecnico
-            if ultimo_tecnico_asignado is not None:
-                while self.tecnicos[indice_tecnico] == ultimo_tecnico_asignado:
-                    indice_tecnico = (indice_tecnico + 1) % len(self.tecnicos)
-                    if indice_tecnico == tecnico_inicial:
-                        break
-            
-            if num_dias <= 2:
-                tecnico = self.tecnicos[indice_tecnico]
-                color = self.colors.get(tecnico, "#3498db")  # Color desde archivo
-                for dia in bloque:
-                    self.asignaciones[dia] = {'tecnico': tecnico, 'color': color}
-                ultimo_tecnico_asignado = tecnico
-                indice_tecnico = (indice_tecnico + 1) % len(self.tecnicos)
-            
-            elif num_dias == 3:
-                tecnico = self.tecnicos[indice_tecnico]
-                color = self.colors.get(tecnico, "#3498db")  # Color desde archivo
-                for dia in bloque:
-                    self.asignaciones[dia] = {'tecnico': tecnico, 'color': color}
-                ultimo_tecnico_asignado = tecnico
-                indice_tecnico = (indice_tecnico + 1) % len(self.tecnicos)
-            
-            else:
-                i = 0
-                while i < num_dias:
-                    if i > 0:
-                        indice_tecnico = (indice_tecnico + 1) % len(self.tecnicos)
-                    
-                    tecnico = self.tecnicos[indice_tecnico]
-                    color = self.colors.get(tecnico, "#3498db")  # Color desde archivo
-                    
-                    dias_asignar = min(2, num_dias - i)
-                    for j in range(dias_asignar):
-                        self.asignaciones[bloque[i + j]] = {'tecnico': tecnico, 'color': color}
-                    
-                    ultimo_tecnico_asignado = tecnico
-                    i += dias_asignar
+        asignaciones, bloques = auto_assign(self.tecnicos, self.festivos, fecha_inicio, fecha_fin,
+                                            self.ultimo_tecnico_var.get())
+        self.asignaciones = {
+            dia: {'tecnico': tecnico, 'color': self.colors.get(tecnico, "#3498db")}
+            for dia, tecnico in asignaciones.items()
+        }
         
         self._draw_calendar()
         messagebox.showinfo("Completado",
@@ -577,83 +650,46 @@ class GeneratorTab(tk.Frame):
             messagebox.showwarning("Advertencia", "No hay asignaciones para exportar")
             return
         
-        asignaciones_ordenadas = sorted(self.asignaciones.items(), key=lambda x: x[0])
+        csv_path, desktop_path = self._export_paths("guardias-support.csv")
         
-        eventos = []
-        i = 0
-        while i < len(asignaciones_ordenadas):
-            fecha, datos = asignaciones_ordenadas[i]
-            tecnico = datos['tecnico']
-            
-            if fecha.weekday() == 5:
-                fecha_domingo = fecha + timedelta(days=1)
-                if i + 1 < len(asignaciones_ordenadas):
-                    siguiente_fecha, siguiente_datos = asignaciones_ordenadas[i + 1]
-                    if siguiente_fecha == fecha_domingo and siguiente_datos['tecnico'] == tecnico:
-                        eventos.append({
-                            'fecha_inicio': fecha,
-                            'fecha_fin': fecha_domingo,
-                            'tecnico': tecnico,
-                            'subject': f"Guardia - {tecnico}"
-                        })
-                        i += 2
-                        continue
-            
-            anotacion = self.festivos.get(fecha, "")
-            subject = f"Guardia {anotacion} - {tecnico}" if anotacion else f"Guardia - {tecnico}"
-            
-            eventos.append({
-                'fecha_inicio': fecha,
-                'fecha_fin': fecha,
-                'tecnico': tecnico,
-                'subject': subject
-            })
-            i += 1
-        
-        # Crear carpeta csv si no existe
-        csv_dir = os.path.join(os.path.dirname(__file__), "..", "csv")
-        os.makedirs(csv_dir, exist_ok=True)
-        
-        # Rutas de archivos
-        nombre_archivo = "guardias-support.csv"
-        csv_path = os.path.abspath(os.path.join(csv_dir, nombre_archivo))
-        desktop_path = os.path.join(os.path.expanduser("~"), "Desktop", nombre_archivo)
-        
-        # Generar contenido CSV
-        csv_content = []
-        csv_content.append([
-            "Subject", "Start Date", "Start Time", "End Date", "End Time",
-            "All Day Event", "Description", "Location", "Private"
-        ])
-        
-        for evento in eventos:
-            # End Date debe ser el día siguiente a fecha_fin
-            end_date = evento['fecha_fin'] + timedelta(days=1)
-            
-            csv_content.append([
-                evento['subject'],
-                evento['fecha_inicio'].strftime("%Y-%m-%d"),
-                "00:00:00",
-                end_date.strftime("%Y-%m-%d"),
-                "00:00:00",
-                "True",
-                "",
-                "",
-                "False"
-            ])
-        
-        # Guardar en carpeta csv
-        with open(csv_path, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file, delimiter=',')
-            writer.writerows(csv_content)
-        
-        # Guardar copia en el escritorio
-        with open(desktop_path, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file, delimiter=',')
-            writer.writerows(csv_content)
+        # Una sola pasada: cada fila se formatea una vez; el escritorio recibe una copia
+        errores = {}
+        num_eventos = write_csv(iter_assignment_events(self.asignaciones, self.festivos),
+                                [csv_path, desktop_path], FORMATO_DIA_COMPLETO, errores)
         
         messagebox.showinfo("Éxito",
             f"✅ CSV exportado correctamente\n\n"
             f"📁 Carpeta proyecto: {csv_path}\n"
-            f"🖥️ Escritorio: {desktop_path}\n\n"
-            f"Eventos generados: {len(eventos)}")
+            f"{self._desktop_line(desktop_path, errores)}\n\n"
+            f"Eventos generados: {num_eventos}")
+    
+    def _export_ics(self):
+        """Exporta asignaciones a iCalendar, con series RRULE para las rotaciones regulares"""
+        if not self.asignaciones:
+            messagebox.showwarning("Advertencia", "No hay asignaciones para exportar")
+            return
+        
+        ics_path, desktop_path = self._export_paths("guardias-support.ics")
+        eventos = list(iter_assignment_events(self.asignaciones, self.festivos))
+        errores = {}
+        num_vevents = write_ics(eventos, [ics_path, desktop_path], errores=errores)
+        
+        messagebox.showinfo("Éxito",
+            f"✅ ICS exportado correctamente\n\n"
+            f"📁 Carpeta proyecto: {ics_path}\n"
+            f"{self._desktop_line(desktop_path, errores)}\n\n"
+            f"Guardias: {len(eventos)} en {num_vevents} eventos del calendario")
+    
+    @staticmethod
+    def _desktop_line(desktop_path: str, errores: dict) -> str:
+        """Línea del mensaje de exportación para la copia del escritorio"""
+        if desktop_path in errores:
+            return f"⚠️ Escritorio: no se pudo copiar ({errores[desktop_path]})"
+        return f"🖥️ Escritorio: {desktop_path}"
+    
+    def _export_paths(self, nombre_archivo: str):
+        """Rutas de exportación: carpeta csv del proyecto (se crea si no existe) y escritorio"""
+        csv_dir = os.path.join(os.path.dirname(__file__), "..", "csv")
+        os.makedirs(csv_dir, exist_ok=True)
+        return (os.path.abspath(os.path.join(csv_dir, nombre_archivo)),
+                os.path.join(os.path.expanduser("~"), "Desktop", nombre_archivo))
@@ -2,10 +2,15 @@
 Pestaña de visualización de calendarios históricos y futuros
 """
 
+import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 from models.calendar_manager import CalendarManager
+from models.folder_watcher import FolderWatcher
+from models.storage import CorruptDataError
 from ui.components.multi_month_viewer import MultiMonthViewer
 from utils.file_utils import get_technician_colors, load_tecnicos
 
@@ -13,8 +18,19 @@ from utils.file_utils import get_technician_colors, load_tecnicos
 class ViewerTab(tk.Frame):
     """Pestaña para visualizar calendarios históricos"""
     
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, renderer="widgets", watch_dir=None, process_min_files=0, **kwargs):
+        """
+        Args:
+            parent: Widget padre
+            renderer: "widgets" o "canvas" (ver MultiMonthViewer)
+            watch_dir: Carpeta cuyos CSV se importan automáticamente al
+                aparecer o cambiar (None = sin vigilancia)
+            process_min_files: Archivos seleccionados a partir de los que la
+                importación parsea en procesos (0 = siempre con hilos)
+        """
         super().__init__(parent, **kwargs)
+        self.renderer = renderer
+        self.process_min_files = process_min_files
         
         # Cargar colores de técnicos
         self.colors = get_technician_colors()
@@ -26,9 +42,27 @@ class ViewerTab(tk.Frame):
         self.selected_tecnico = None
         
         # Inicializar CalendarManager
-        self.calendar_manager = CalendarManager()
+        try:
+            self.calendar_manager = CalendarManager()
+        except CorruptDataError as e:
+            messagebox.showerror("Datos dañados", f"No se pueden cargar los calendarios:\n{e}")
+            raise
+        
+        # Importación en segundo plano
+        self.import_thread = None
+        self.import_cancel = threading.Event()
+        self.import_queue = queue.Queue()  # Mensajes del hilo de importación
+        self.import_lock = threading.Lock()  # Una importación a la vez (manual o automática)
         
         self._create_widgets()
+        
+        # Importación automática de la carpeta vigilada
+        self.watcher = None
+        self.watch_queue = queue.Queue()  # Resultados del hilo de vigilancia
+        if watch_dir:
+            self.watcher = FolderWatcher(watch_dir, self._auto_import)
+            self.watcher.start()
+            self.after(1000, self._poll_watcher)
     
     def _create_widgets(self):
         """Crea los widgets de la interfaz"""
@@ -56,9 +90,10 @@ class ViewerTab(tk.Frame):
         btn_frame.pack(pady=10)
         
         # Botón importar CSV
-        tk.Button(btn_frame, text="📁 Importar CSV", command=self._import_csv,
+        self.import_button = tk.Button(btn_frame, text="📁 Importar CSV(s)", command=self._import_csv,
                  bg="#3498db", fg="white", font=("Arial", 10, "bold"),
-                 relief=tk.RAISED, bd=3, cursor="hand2", padx=15, pady=5).pack(side=tk.LEFT, padx=5)
+                 relief=tk.RAISED, bd=3, cursor="hand2", padx=15, pady=5)
+        self.import_button.pack(side=tk.LEFT, padx=5)
         
         # Botón actualizar
         tk.Button(btn_frame, text="🔄 Actualizar", command=self._refresh_view,
@@ -76,7 +111,8 @@ class ViewerTab(tk.Frame):
             self.calendar_manager,
             colors=self.colors,
             num_months=7,
-            parent_tab=self  # Pasar referencia para callbacks
+            parent_tab=self,  # Pasar referencia para callbacks
+            renderer=self.renderer
         )
         self.multi_month_viewer.pack(fill=tk.BOTH, expand=True)
     
@@ -96,44 +132,175 @@ class ViewerTab(tk.Frame):
         status_bar.pack(fill=tk.X, side=tk.BOTTOM)
         status_bar.pack_propagate(False)
         
+        # Progreso de importación (visible solo mientras se importa)
+        self.progress_frame = tk.Frame(status_bar, bg="#2c3e50")
+        self.progress_bar = ttk.Progressbar(self.progress_frame, length=200, maximum=1.0)
+        self.progress_bar.pack(side=tk.LEFT, padx=5, pady=4)
+        self.cancel_button = tk.Button(self.progress_frame, text="✖ Cancelar", command=self._cancel_import,
+                                       bg="#e74c3c", fg="white", font=("Arial", 8, "bold"),
+                                       relief=tk.FLAT, cursor="hand2", padx=6)
+        self.cancel_button.pack(side=tk.LEFT, padx=5)
+        
         self.status_label = tk.Label(status_bar, text="Listo", 
                                      font=("Arial", 9), bg="#2c3e50", fg="white",
                                      anchor="w", padx=10)
-        self.status_label.pack(fill=tk.X)
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
         self._update_status()
     
     def _import_csv(self):
-        """Importa eventos desde un archivo CSV"""
-        filepath = filedialog.askopenfilename(
-            title="Seleccionar archivo CSV",
+        """Importa eventos desde uno o varios archivos CSV en segundo plano"""
+        if self.import_thread and self.import_thread.is_alive():
+            return
+        
+        filepaths = filedialog.askopenfilenames(
+            title="Seleccionar archivos CSV",
             filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
         )
         
-        if not filepath:
+        if not filepaths:
             return
         
+        self.import_cancel.clear()
+        self.import_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.progress_bar['value'] = 0
+        self.progress_frame.pack(side=tk.RIGHT, before=self.status_label)
+        self.status_label.config(text=f"⏳ Importando {len(filepaths)} archivo(s)...")
+        
+        self.import_thread = threading.Thread(target=self._import_worker, args=(list(filepaths),),
+                                              daemon=True)
+        self.import_thread.start()
+        self.after(100, self._poll_import)
+    
+    def _import_worker(self, filepaths):
+        """
+        Hilo de importación: no toca widgets, solo envía mensajes a la cola
+        ('progreso', fracción), ('fin', stats) o ('error', mensaje).
+        """
+        def progreso(procesados, total):
+            self.import_queue.put(('progreso', procesados / total if total else 1.0))
+        
         try:
-            stats = self.calendar_manager.import_csv(filepath)
-            
-            mensaje = f"✅ Importación completada\n\n"
-            mensaje += f"Total registros: {stats['total']}\n"
-            mensaje += f"Importados: {stats['importados']}\n"
-            mensaje += f"Duplicados: {stats['duplicados']}\n"
-            mensaje += f"Errores: {stats['errores']}"
-            
-            if stats['errores'] > 0 and stats['errores_detalle']:
-                mensaje += f"\n\nPrimeros errores:\n"
-                for err in stats['errores_detalle'][:3]:
-                    mensaje += f"- Fila {err.get('fila', '?')}: {err.get('error', 'Error desconocido')}\n"
-            
-            messagebox.showinfo("Importación completada", mensaje)
-            
-            # Actualizar vista
-            self._refresh_view()
-            
+            with self.import_lock:
+                stats = self.calendar_manager.import_many(filepaths, progress_callback=progreso,
+                                                          use_processes=self._use_processes(filepaths),
+                                                          cancel_event=self.import_cancel)
+            self.import_queue.put(('fin', stats))
         except Exception as e:
-            messagebox.showerror("Error", f"Error al importar CSV:\n{str(e)}")
+            self.import_queue.put(('error', str(e)))
+    
+    def _use_processes(self, filepaths) -> bool:
+        """
+        Importaciones masivas de histórico: parsear en procesos solo compensa
+        con muchos archivos y más de un núcleo (con uno, los procesos solo
+        añaden el coste de arrancarlos y de enviar los resultados)
+        """
+        return (self.process_min_files > 0 and len(filepaths) >= self.process_min_files
+                and (os.cpu_count() or 1) > 1)
+    
+    def _poll_import(self):
+        """Procesa en el hilo de Tk los mensajes del hilo de importación"""
+        try:
+            while True:
+                tipo, dato = self.import_queue.get_nowait()
+                if tipo == 'progreso':
+                    self.progress_bar['value'] = dato
+                elif tipo == 'fin':
+                    self._import_finished(dato)
+                    return
+                else:
+                    self._import_finished(None)
+                    messagebox.showerror("Error", f"Error al importar CSV:\n{dato}")
+                    return
+        except queue.Empty:
+            pass
+        self.after(100, self._poll_import)
+    
+    def _cancel_import(self):
+        """Pide al hilo de importación que se detenga tras el lote en curso"""
+        self.import_cancel.set()
+        self.cancel_button.config(state=tk.DISABLED)
+        self.status_label.config(text="⏳ Cancelando importación...")
+    
+    def stop_import(self, timeout: float = 10.0):
+        """Cancela la importación en curso y espera a que termine (al cerrar)"""
+        if self.import_thread and self.import_thread.is_alive():
+            self.import_cancel.set()
+            self.import_thread.join(timeout)
+    
+    def _auto_import(self, filepaths):
+        """
+        Hilo de vigilancia: importa los CSV nuevos o modificados de la carpeta
+        vigilada y envía las estadísticas a la cola (no toca widgets).
+        """
+        with self.import_lock:
+            stats = self.calendar_manager.import_many(filepaths)
+        self.watch_queue.put((filepaths, stats))
+    
+    def _poll_watcher(self):
+        """Aplica en el hilo de Tk los resultados de la importación automática"""
+        if self.watcher is None:
+            return
+        try:
+            while True:
+                filepaths, stats = self.watch_queue.get_nowait()
+                if not stats['meses'] and not stats['errores']:
+                    continue  # Archivos ya importados: nada que mostrar
+                
+                # Solo se redibujan los meses visibles afectados
+                self.multi_month_viewer.refresh_months(stats['meses'])
+                self._update_status()
+                nombres = ", ".join(os.path.basename(ruta) for ruta in filepaths)
+                texto = (f"📥 Importación automática de {nombres}: {stats['importados']} eventos nuevos, "
+                         f"{stats['diff']['eventos_eliminados']} eliminados")
+                if stats['errores']:
+                    texto += f", {stats['errores']} errores"
+                self.status_label.config(text=texto)
+        except queue.Empty:
+            pass
+        self.after(1000, self._poll_watcher)
+    
+    def stop_watcher(self):
+        """Detiene la vigilancia de la carpeta (al cerrar)"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+    
+    def _import_finished(self, stats):
+        """Restaura la interfaz, refresca la vista una vez y muestra el resumen"""
+        self.import_thread = None
+        self.progress_frame.pack_forget()
+        self.import_button.config(state=tk.NORMAL)
+        
+        # Actualizar vista
+        self.multi_month_viewer.refresh()
+        self._update_status()
+        
+        if stats is None:
+            return
+        
+        titulo = "Importación cancelada" if stats['cancelado'] else "Importación completada"
+        mensaje = f"{'⚠️' if stats['cancelado'] else '✅'} {titulo}\n\n"
+        mensaje += f"Archivos: {stats['archivos']} (ya importados: {stats['omitidos']})\n"
+        mensaje += f"Total registros: {stats['total']}\n"
+        mensaje += f"Importados: {stats['importados']}\n"
+        mensaje += f"Duplicados: {stats['duplicados']}\n"
+        mensaje += f"Errores: {stats['errores']}"
+        
+        diff = stats['diff']
+        if diff['eliminadas'] or diff['sin_cambios'] or diff['historico']:
+            mensaje += (f"\n\nReimportación incremental (filas): {diff['añadidas']} nuevas o cambiadas, "
+                        f"{diff['eliminadas']} eliminadas, {diff['sin_cambios']} sin cambios, "
+                        f"{diff['historico']} conservadas fuera del rango del CSV "
+                        f"({diff['eventos_eliminados']} eventos eliminados)")
+        
+        if stats['errores'] > 0 and stats['errores_detalle']:
+            mensaje += f"\n\nPrimeros errores:\n"
+            for err in stats['errores_detalle'][:3]:
+                mensaje += f"- {err.get('archivo', '?')} fila {err.get('fila', '?')}: {err.get('error', 'Error desconocido')}\n"
+        
+        messagebox.showinfo(titulo, mensaje)
     
     def _refresh_view(self):
         """Actualiza la visualización"""
@@ -0,0 +1,117 @@
+"""
+Escritura atómica de archivos con copias de seguridad rotativas
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Dict, Iterator, List, Sequence
+
+
+def backup_paths(filepath: str, backups: int) -> List[str]:
+    """
+    Rutas de las copias de seguridad de un archivo, de la más reciente a la
+    más antigua (archivo.1, archivo.2, ...).
+    """
+    return [f"{filepath}.{i}" for i in range(1, backups + 1)]
+
+
+def _fsync_dir(directory: str):
+    """Persiste la entrada de directorio tras un rename (solo POSIX)"""
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def rotate_backups(filepath: str, backups: int):
+    """
+    Desplaza las copias (archivo.1 -> archivo.2, ...) y guarda el archivo
+    actual como archivo.1 sin moverlo de su sitio.
+    """
+    if backups <= 0 or not os.path.exists(filepath):
+        return
+    rutas = backup_paths(filepath, backups)
+    for origen, destino in zip(reversed(rutas[:-1]), reversed(rutas[1:])):
+        if os.path.exists(origen):
+            os.replace(origen, destino)
+    if os.path.exists(rutas[0]):
+        os.remove(rutas[0])
+    try:
+        # Enlace duro: sin copiar datos y el original sigue en su sitio
+        os.link(filepath, rutas[0])
+    except OSError:
+        shutil.copy2(filepath, rutas[0])
+
+
+@contextmanager
+def atomic_write(filepath: str, mode: str = "w", encoding: str = "utf-8",
+                 backups: int = 0, create_dirs: bool = True) -> Iterator[IO]:
+    """
+    Abre un archivo temporal junto a filepath y lo sustituye de forma atómica
+    al salir del bloque sin errores.
+
+    El contenido se vuelca a disco (fsync) antes de os.replace, de modo que
+    un cierre inesperado deja siempre la versión anterior o la nueva
+    completas, nunca un archivo truncado.
+
+    Args:
+        filepath: Archivo de destino
+        mode: "w" (texto) o "wb" (binario)
+        encoding: Codificación en modo texto
+        backups: Número de copias anteriores a conservar (archivo.1, ...)
+        create_dirs: Crear la carpeta de destino si no existe
+
+    Yields:
+        Archivo temporal abierto para escritura
+    """
+    directory = os.path.dirname(os.path.abspath(filepath))
+    if create_dirs:
+        os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(filepath) + ".",
+                                    suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(filepath):
+            # mkstemp crea el archivo con permisos 0600: conservar los originales
+            shutil.copymode(filepath, tmp_path)
+        rotate_backups(filepath, backups)
+        os.replace(tmp_path, filepath)
+        _fsync_dir(directory)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def copy_atomic(origen: str, destinos: Sequence[str]) -> Dict[str, str]:
+    """
+    Copia un archivo ya escrito a otros destinos, cada uno de forma atómica e
+    independiente.
+
+    Pensado para copias secundarias (p. ej. el escritorio): un destino que
+    falla no impide los demás y no se crean carpetas que no existan.
+
+    Args:
+        origen: Archivo a copiar
+        destinos: Rutas de las copias
+
+    Returns:
+        dict: {ruta: mensaje de error} de los destinos que no se pudieron escribir
+    """
+    errores = {}
+    for destino in destinos:
+        try:
+            with open(origen, "rb") as fuente, \
+                    atomic_write(destino, mode="wb", create_dirs=False) as copia:
+                shutil.copyfileobj(fuente, copia)
+        except OSError as e:
+            errores[destino] = str(e)
+    return errores
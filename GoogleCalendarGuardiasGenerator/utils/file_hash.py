@@ -0,0 +1,41 @@
+"""
+Hash del contenido de archivos con lecturas grandes
+"""
+
+import hashlib
+import os
+from typing import Tuple
+
+BUFFER_SIZE = 1 << 20  # 1 MiB por lectura
+
+
+def file_digest(filepath: str, algorithm: str = "md5") -> str:
+    """
+    Calcula el hash hexadecimal del contenido de un archivo.
+
+    Usa hashlib.file_digest (Python 3.11+), que lee sin copias intermedias;
+    en versiones anteriores lee en bloques de BUFFER_SIZE.
+
+    Args:
+        filepath: Ruta al archivo
+        algorithm: Algoritmo de hashlib (md5 por compatibilidad con los
+            hashes ya registrados)
+    """
+    with open(filepath, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, algorithm).hexdigest()
+        h = hashlib.new(algorithm)
+        for chunk in iter(lambda: f.read(BUFFER_SIZE), b""):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+def file_signature(filepath: str) -> Tuple[int, int, int]:
+    """
+    Firma barata de un archivo: (tamaño, mtime en ns, inodo).
+
+    Si no cambia, se asume que el contenido tampoco y no hace falta volver a
+    calcular el hash.
+    """
+    st = os.stat(filepath)
+    return (st.st_size, st.st_mtime_ns, st.st_ino)